@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+
 from Phase1_Text.preprocess.clean import clean_text
 from Phase1_Text.preprocess.tokenizer import tokenize, remove_stopwords
 from Phase1_Text.algorithms.jaccard import jaccard_similarity
@@ -5,19 +7,39 @@ from Phase1_Text.algorithms.lcs import lcs_similarity
 from Phase1_Text.algorithms.cosine import cosine_sim
 from Phase1_Text.scoring.aggregate import aggregate_text_score
 
-def compare_texts(text1, text2):
-    # Preprocess
-    clean1 = clean_text(text1)
-    clean2 = clean_text(text2)
 
-    tokens1 = remove_stopwords(tokenize(clean1))
-    tokens2 = remove_stopwords(tokenize(clean2))
+def _stage(timer, name):
+    # timer: optional Phase3 StageTimer; no-op without one
+    return timer.stage(name) if timer is not None else nullcontext()
 
-    # Algorithms
-    j = jaccard_similarity(tokens1, tokens2)
-    l = lcs_similarity(tokens1, tokens2)
-    c = cosine_sim(clean1, clean2)
 
+def prepare_text(text, timer=None):
+    # Preprocess one document: everything the metrics need from it
+    with _stage(timer, "clean"):
+        clean = clean_text(text)
+    with _stage(timer, "tokenize"):
+        tokens = remove_stopwords(tokenize(clean))
+    return {
+        "clean":  clean,
+        "tokens": tokens,
+    }
+
+
+# Metric steps: each reads only the prepared fields it needs, so they can
+# run in any order (or in separate processes, see Phase3 stage executor)
+def jaccard_metric(prep1, prep2):
+    return jaccard_similarity(prep1["tokens"], prep2["tokens"])
+
+
+def lcs_metric(prep1, prep2):
+    return lcs_similarity(prep1["tokens"], prep2["tokens"])
+
+
+def cosine_metric(prep1, prep2):
+    return cosine_sim(prep1["clean"], prep2["clean"])
+
+
+def build_text_result(j, l, c):
     # Aggregate
     final = aggregate_text_score(j, l, c)
 
@@ -27,3 +49,19 @@ def compare_texts(text1, text2):
     "cosine": round(float(c), 4),
     "final_similarity": round(float(final), 4)
 }
+
+
+def compare_texts(text1, text2, timer=None):
+    prep1 = prepare_text(text1, timer)
+    prep2 = prepare_text(text2, timer)
+
+    # Algorithms
+    with _stage(timer, "jaccard"):
+        j = jaccard_metric(prep1, prep2)
+    with _stage(timer, "lcs"):
+        l = lcs_metric(prep1, prep2)
+    with _stage(timer, "cosine"):
+        c = cosine_metric(prep1, prep2)
+
+    with _stage(timer, "aggregate"):
+        return build_text_result(j, l, c)
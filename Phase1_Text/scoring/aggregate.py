@@ -1,12 +1,15 @@
+# these weights can be changed as per requirement
+TEXT_WEIGHTS = {"jaccard": 0.2, "lcs": 0.2, "cosine": 0.6}
+
+
 def aggregate_text_score(jaccard, lcs, cosine):
     """
     Weighted aggregation of similarity scores
     """
 
-    # these weights can be changed as per requirement
-    w_jaccard = 0.2
-    w_lcs = 0.2
-    w_cosine = 0.6
+    w_jaccard = TEXT_WEIGHTS["jaccard"]
+    w_lcs = TEXT_WEIGHTS["lcs"]
+    w_cosine = TEXT_WEIGHTS["cosine"]
 
     final_score = (
         w_jaccard * jaccard +
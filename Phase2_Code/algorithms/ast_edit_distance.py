@@ -1,16 +1,10 @@
-def ast_sequence_similarity(seq_a: list, seq_b: list) -> float:
-    """
-    Calculates structural similarity using sequence edit distance.
-    Runs in O(N*M) time. Highly effective for catching refactored code.
-    """
-    if not seq_a and not seq_b:
-        return 1.0
-    if not seq_a or not seq_b:
-        return 0.0
+from Phase2_Code.algorithms.sequence_planner import (
+    VARIANT_EXACT, VARIANT_BIT_PARALLEL,
+    plan_variant, band_width, banded_distance, symbol_masks, plan_info
+)
 
-    # Cap maximum sequence length to prevent RAM/CPU spikes on massive files
-    MAX_LEN = 8000
-    seq_a, seq_b = seq_a[:MAX_LEN], seq_b[:MAX_LEN]
+
+def _edit_distance_exact(seq_a: list, seq_b: list) -> int:
     n, m = len(seq_a), len(seq_b)
 
     # 1D array optimization for Edit Distance
@@ -24,9 +18,79 @@ def ast_sequence_similarity(seq_a: list, seq_b: list) -> float:
                 curr[j] = 1 + min(prev[j], curr[j-1], prev[j-1]) # Insert, Delete, Replace
         prev = curr
 
-    edit_distance = prev[m]
+    return prev[m]
+
+
+def _edit_distance_bit_parallel(seq_a: list, seq_b: list) -> int:
+    """
+    Myers / Hyyro bit-vector Levenshtein distance: the vertical deltas of a
+    DP column are two bit vectors (+1 / -1) over seq_a, updated per element
+    of seq_b; the distance is tracked in the last row. Exact.
+    """
+    if len(seq_a) > len(seq_b):
+        seq_a, seq_b = seq_b, seq_a
+    n = len(seq_a)
+    full = (1 << n) - 1
+    last = 1 << (n - 1)
+
+    masks = symbol_masks(seq_a).get
+    plus, minus, distance = full, 0, n
+    for item in seq_b:
+        eq = masks(item, 0)
+        xv = eq | minus
+        xh = (((eq & plus) + plus) ^ plus) | eq
+        h_plus = minus | (~(xh | plus) & full)
+        h_minus = plus & xh
+        if h_plus & last:
+            distance += 1
+        elif h_minus & last:
+            distance -= 1
+        # Shift in the top boundary row D[0][j] = j (always +1)
+        h_plus = ((h_plus << 1) | 1) & full
+        h_minus = (h_minus << 1) & full
+        plus = h_minus | (~(xv | h_plus) & full)
+        minus = h_plus & xv
+
+    return distance
+
+
+def ast_sequence_similarity_planned(seq_a: list, seq_b: list) -> tuple:
+    """
+    ast_sequence_similarity with the algorithm picked by input size
+    (sequence_planner). Returns (score, plan).
+    """
+    if not seq_a and not seq_b:
+        return 1.0, plan_info(VARIANT_EXACT)
+    if not seq_a or not seq_b:
+        return 0.0, plan_info(VARIANT_EXACT)
+
+    n, m = len(seq_a), len(seq_b)
     max_possible_distance = max(n, m)
-    
+
+    variant = plan_variant(n, m)
+    if variant == VARIANT_EXACT:
+        edit_distance = _edit_distance_exact(seq_a, seq_b)
+    elif variant == VARIANT_BIT_PARALLEL:
+        edit_distance = _edit_distance_bit_parallel(seq_a, seq_b)
+    else:
+        d = band_width(n, m)
+        edit_distance = banded_distance(seq_a, seq_b, d, substitution=True)
+        if edit_distance > d:
+            # The true distance is > d too: similarity is at most 1 - (d+1)/max
+            score = max(0.0, 1.0 - edit_distance / max_possible_distance)
+            upper = 1.0 - (d + 1) / max_possible_distance
+            return score, plan_info(variant, bounds=(score, upper))
+
     # Convert edit distance to a percentage similarity
     similarity = 1.0 - (edit_distance / max_possible_distance)
-    return max(0.0, similarity)
\ No newline at end of file
+    return max(0.0, similarity), plan_info(variant)
+
+
+def ast_sequence_similarity(seq_a: list, seq_b: list) -> float:
+    """
+    Calculates structural similarity using sequence edit distance.
+    Highly effective for catching refactored code. The whole of both
+    sequences is used; the algorithm is chosen by size (exact DP,
+    bit-parallel or banded, see sequence_planner).
+    """
+    return ast_sequence_similarity_planned(seq_a, seq_b)[0]
@@ -0,0 +1,25 @@
+from Phase2_Code.algorithms.ast_edit_distance import ast_sequence_similarity_planned
+from Phase2_Code.algorithms.characteristic_vectors import node_sequence
+
+
+def ast_similarity_planned(code1: str, code2: str, lang: str = "python") -> tuple:
+    """
+    Structural similarity of two files in the same language: edit distance
+    between their preorder node-type sequences (Python via `ast`, brace
+    languages via their block structure; see characteristic_vectors), so
+    renamed variables and reformatting don't matter.
+    Returns (score, plan), plan saying which edit-distance variant ran
+    (sequence_planner); (None, None) when either file has no structure to
+    compare: Python that doesn't parse, or a language without a structural
+    splitter (Ruby).
+    """
+    seq1 = node_sequence(code1, lang)
+    seq2 = node_sequence(code2, lang)
+    if not seq1 or not seq2:
+        return None, None
+    return ast_sequence_similarity_planned(seq1, seq2)
+
+
+def ast_similarity(code1: str, code2: str, lang: str = "python"):
+    """ast_similarity_planned without the plan: the score, or None."""
+    return ast_similarity_planned(code1, code2, lang)[0]
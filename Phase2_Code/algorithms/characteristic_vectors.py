@@ -0,0 +1,276 @@
+import ast
+import math
+import random
+from collections import Counter
+
+from Phase2_Code.algorithms.ast_edit_distance import ast_sequence_similarity
+from Phase2_Code.code_preprocess.clean_code import strip_comments
+from Phase2_Code.code_preprocess.code_tokenizer import tokenize_code_with_lines
+from Phase2_Code.code_preprocess.lexer_registry import get_lexer, resolve_language
+
+# Subtrees smaller than this are too common to be meaningful clones
+MIN_SUBTREE_NODES = 30
+
+# Only statement-level subtrees are indexed (Deckard's "significant" nodes);
+# indexing every expression node would multiply candidates for no gain.
+PY_SIGNIFICANT_NODES = (ast.stmt,)
+
+# LSH parameters: K hashes per table (precision), L tables (recall),
+# W bucket width in count-space units.
+LSH_TABLES = 6
+LSH_HASHES_PER_TABLE = 4
+LSH_BUCKET_WIDTH = 8.0
+
+# Inside a bucket, each subtree is only paired with this many neighbours
+# of similar size. Big buckets (generic shapes, or one snippet shared by a
+# whole class) would otherwise bring back quadratic behaviour.
+BUCKET_NEIGHBOURS = 20
+
+
+# -------------------------------------------------------------------------
+# 1. SUBTREE EXTRACTION
+# -------------------------------------------------------------------------
+# Each document becomes a preorder node-type sequence. A subtree is a
+# contiguous slice of it, so vectors and verification sequences are
+# cheap slices rather than re-walks of the tree.
+
+def _python_subtrees(code: str, min_nodes: int) -> tuple:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return [], []
+
+    # Iterative preorder walk (deep files would hit the recursion limit);
+    # a node's subtree is sequence[start:end] once its closing marker pops.
+    sequence = []
+    spans = []          # (start, end, start_line, end_line)
+    stack = [(tree, False)]
+    open_nodes = []
+
+    while stack:
+        node, closing = stack.pop()
+        if closing:
+            start, n = open_nodes.pop()
+            if isinstance(n, PY_SIGNIFICANT_NODES) and len(sequence) - start >= min_nodes:
+                spans.append((start, len(sequence), n.lineno, n.end_lineno))
+            continue
+
+        open_nodes.append((len(sequence), node))
+        sequence.append(type(node).__name__)
+        stack.append((node, True))
+        for child in reversed(list(ast.iter_child_nodes(node))):
+            stack.append((child, False))
+
+    return sequence, spans
+
+
+def _token_category(token: str, keywords: set) -> str:
+    if token in keywords:
+        return token
+    if token[0].isalpha() or token[0] == "_":
+        return "ID"
+    if token[0].isdigit():
+        return "NUM"
+    return token
+
+
+def _brace_subtrees(code: str, lang: str, min_nodes: int) -> tuple:
+    """
+    Token-derived structure for brace languages (Java, C++, ...): every '{...}' block plus its
+    header (tokens since the previous ';', '{' or '}') is one subtree.
+    Identifiers and numbers collapse to ID / NUM; keywords and operators
+    keep their own type.
+    """
+    keywords = get_lexer(lang)["keywords"]
+    tokens = tokenize_code_with_lines(strip_comments(code, lang=lang), lang=lang)
+    sequence = [_token_category(tok, keywords) for tok, _ in tokens]
+
+    spans = []
+    open_blocks = []       # header start index for each open '{'
+    boundary = 0           # first token after the last ';', '{' or '}'
+    for i, (tok, line) in enumerate(tokens):
+        if tok == "{":
+            open_blocks.append(boundary)
+            boundary = i + 1
+        elif tok == "}":
+            if open_blocks:
+                start = open_blocks.pop()
+                if i + 1 - start >= min_nodes:
+                    spans.append((start, i + 1, tokens[start][1], line))
+            boundary = i + 1
+        elif tok == ";":
+            boundary = i + 1
+
+    return sequence, spans
+
+
+def _structure(code: str, lang: str, min_nodes: int) -> tuple:
+    blocks = get_lexer(lang)["blocks"]
+    if blocks == "braces":
+        return _brace_subtrees(code, lang, min_nodes)
+    if blocks == "indent":
+        return _python_subtrees(code, min_nodes)
+    # No structural splitter for keyword-delimited blocks (Ruby) yet
+    return [], []
+
+
+def node_sequence(code: str, lang: str) -> list:
+    """
+    The whole document's preorder node-type sequence (as in extract_subtrees);
+    empty when the code doesn't parse or the language has no splitter.
+    """
+    return _structure(code, resolve_language(lang), MIN_SUBTREE_NODES)[0]
+
+
+def extract_subtrees(code: str, lang: str, min_nodes: int = MIN_SUBTREE_NODES) -> dict:
+    """
+    Returns {"lang", "sequence", "subtrees"} where each subtree is
+    {"start", "end", "start_line", "end_line", "vector"} and vector is a
+    sparse node-type count map (the characteristic vector).
+    """
+    lang = resolve_language(lang)
+    sequence, spans = _structure(code, lang, min_nodes)
+    subtrees = [
+        {
+            "start":      start,
+            "end":        end,
+            "start_line": start_line,
+            "end_line":   end_line,
+            "vector":     Counter(sequence[start:end]),
+        }
+        for start, end, start_line, end_line in spans
+    ]
+    return {"lang": lang, "sequence": sequence, "subtrees": subtrees}
+
+
+# -------------------------------------------------------------------------
+# 2. EUCLIDEAN LSH (p-stable projections)
+# -------------------------------------------------------------------------
+
+class EuclideanLSH:
+    """
+    h(v) = floor((a·v + b) / w) with Gaussian a. Vectors within a small
+    Euclidean distance collide in at least one of the L tables with high
+    probability. Projections are generated per node type from a fixed
+    seed, so the vocabulary never needs to be fixed up front and hashes
+    are identical across processes.
+    """
+
+    def __init__(
+        self,
+        num_tables: int = LSH_TABLES,
+        hashes_per_table: int = LSH_HASHES_PER_TABLE,
+        bucket_width: float = LSH_BUCKET_WIDTH,
+        seed: int = 1234,
+    ):
+        self.num_tables = num_tables
+        self.hashes_per_table = hashes_per_table
+        self.bucket_width = bucket_width
+        self.seed = seed
+        self._projections = {}    # node type -> [gaussian per (table, hash)]
+        rng = random.Random(seed)
+        self._offsets = [rng.uniform(0, bucket_width) for _ in range(num_tables * hashes_per_table)]
+
+    def _projection(self, node_type: str) -> list:
+        proj = self._projections.get(node_type)
+        if proj is None:
+            rng = random.Random(f"{self.seed}:{node_type}")
+            proj = [rng.gauss(0.0, 1.0) for _ in range(self.num_tables * self.hashes_per_table)]
+            self._projections[node_type] = proj
+        return proj
+
+    def keys(self, vector: Counter) -> list:
+        """One bucket key per table."""
+        dots = [0.0] * (self.num_tables * self.hashes_per_table)
+        for node_type, count in vector.items():
+            proj = self._projection(node_type)
+            for i in range(len(dots)):
+                dots[i] += proj[i] * count
+
+        w = self.bucket_width
+        hashed = [math.floor((d + b) / w) for d, b in zip(dots, self._offsets)]
+        k = self.hashes_per_table
+        return [(t,) + tuple(hashed[t * k:(t + 1) * k]) for t in range(self.num_tables)]
+
+
+# -------------------------------------------------------------------------
+# 3. CORPUS-WIDE CLONE PAIRS
+# -------------------------------------------------------------------------
+
+def find_clone_pairs(
+    documents: dict,
+    threshold: float = 0.8,
+    min_nodes: int = MIN_SUBTREE_NODES,
+    lsh: EuclideanLSH = None,
+) -> list:
+    """
+    Structural clone pairs across files.
+    documents: {doc_id: (code, lang)}.
+
+    Every subtree vector is hashed into LSH buckets (linear in total
+    subtree count); only subtrees sharing a bucket become candidates, and
+    only candidates are verified with ast_sequence_similarity.
+    """
+    lsh = lsh or EuclideanLSH()
+
+    parsed = {doc_id: extract_subtrees(code, lang, min_nodes) for doc_id, (code, lang) in documents.items()}
+
+    # 1. Bucket every subtree
+    entries = []
+    buckets = {}
+    for doc_id, doc in parsed.items():
+        for subtree in doc["subtrees"]:
+            entry_id = len(entries)
+            entries.append((doc_id, subtree))
+            for key in lsh.keys(subtree["vector"]):
+                buckets.setdefault((doc["lang"],) + key, []).append(entry_id)
+
+    # 2. Candidate pairs: same bucket, different files
+    candidates = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda e: entries[e][1]["end"] - entries[e][1]["start"])
+        for i, a in enumerate(members):
+            for b in members[i + 1:i + 1 + BUCKET_NEIGHBOURS]:
+                if entries[a][0] != entries[b][0]:
+                    candidates.add((a, b) if a < b else (b, a))
+
+    # 3. Verify candidates, biggest first, skipping pairs nested in a reported one
+    ordered = sorted(
+        candidates,
+        key=lambda p: -(entries[p[0]][1]["end"] - entries[p[0]][1]["start"])
+    )
+    pairs = []
+    reported = {}       # (doc_a, doc_b) -> [(sub_a, sub_b), ...]
+    for a, b in ordered:
+        # a < b, so doc_a is always the earlier document of the pair
+        (doc_a, sub_a), (doc_b, sub_b) = entries[a], entries[b]
+
+        size_a = sub_a["end"] - sub_a["start"]
+        size_b = sub_b["end"] - sub_b["start"]
+        # Edit-distance similarity can't exceed min/max size: skip early
+        if min(size_a, size_b) < threshold * max(size_a, size_b):
+            continue
+        done = reported.setdefault((doc_a, doc_b), [])
+        if any(_contains(ra, sub_a) and _contains(rb, sub_b) for ra, rb in done):
+            continue
+
+        seq_a = parsed[doc_a]["sequence"][sub_a["start"]:sub_a["end"]]
+        seq_b = parsed[doc_b]["sequence"][sub_b["start"]:sub_b["end"]]
+        score = 1.0 if seq_a == seq_b else ast_sequence_similarity(seq_a, seq_b)
+        if score >= threshold:
+            done.append((sub_a, sub_b))
+            pairs.append({
+                "doc_a":         doc_a,
+                "doc_b":         doc_b,
+                "score":         round(score * 100, 2),
+                "file_a_region": [sub_a["start_line"], sub_a["end_line"]],
+                "file_b_region": [sub_b["start_line"], sub_b["end_line"]],
+            })
+
+    return pairs
+
+
+def _contains(outer: dict, inner: dict) -> bool:
+    return outer["start"] <= inner["start"] and inner["end"] <= outer["end"]
@@ -1,15 +1,10 @@
-def lcs_similarity(list_a: list, list_b: list) -> float:
-    """
-    Calculates the Longest Common Subsequence between two lists.
-    Used for checking the relative order of tokens or control flow blocks.
-    """
-    if not list_a and not list_b:
-        return 1.0
-    if not list_a or not list_b:
-        return 0.0
+from Phase2_Code.algorithms.sequence_planner import (
+    VARIANT_EXACT, VARIANT_BIT_PARALLEL, VARIANT_BANDED,
+    plan_variant, band_width, banded_distance, symbol_masks, plan_info
+)
 
-    MAX_LEN = 8000
-    list_a, list_b = list_a[:MAX_LEN], list_b[:MAX_LEN]
+
+def _lcs_exact(list_a: list, list_b: list) -> int:
     n, m = len(list_a), len(list_b)
 
     # 1D array DP optimization to save RAM
@@ -24,10 +19,68 @@ def lcs_similarity(list_a: list, list_b: list) -> float:
                 curr[j] = max(prev[j], curr[j-1])
         prev = curr
 
-    lcs_length = prev[m]
-    
+    return prev[m]
+
+
+def _lcs_bit_parallel(list_a: list, list_b: list) -> int:
+    """
+    Allison-Dix / Hyyro bit-vector LCS: one row of the DP table is a bit
+    vector over the shorter list, updated with a few big-int operations
+    per element of the longer one. Exact.
+    """
+    if len(list_a) > len(list_b):
+        list_a, list_b = list_b, list_a
+    n = len(list_a)
+    full = (1 << n) - 1
+
+    masks = symbol_masks(list_a).get
+    row = full
+    for token in list_b:
+        matches = row & masks(token, 0)
+        row = ((row + matches) | (row - matches)) & full
+
+    # Zero bits mark the positions where the LCS grew
+    return n - row.bit_count()
+
+
+def lcs_similarity_planned(list_a: list, list_b: list) -> tuple:
+    """
+    lcs_similarity with the algorithm picked by input size (sequence_planner).
+    Returns (score, plan) where plan = {"variant", "approximate"[, "bounds"]}.
+    """
+    if not list_a and not list_b:
+        return 1.0, plan_info(VARIANT_EXACT)
+    if not list_a or not list_b:
+        return 0.0, plan_info(VARIANT_EXACT)
+
+    n, m = len(list_a), len(list_b)
     # We divide by the max length to ensure 10 copied lines out of 1000 
     # doesn't give a high global score.
     max_possible = max(n, m)
-    
-    return lcs_length / max_possible if max_possible > 0 else 0.0
\ No newline at end of file
+
+    variant = plan_variant(n, m)
+    if variant == VARIANT_EXACT:
+        return _lcs_exact(list_a, list_b) / max_possible, plan_info(variant)
+    if variant == VARIANT_BIT_PARALLEL:
+        return _lcs_bit_parallel(list_a, list_b) / max_possible, plan_info(variant)
+
+    # Banded: indel distance = n + m - 2 * LCS
+    d = band_width(n, m)
+    distance = banded_distance(list_a, list_b, d, substitution=False)
+    lcs_length = (n + m - distance) // 2
+    if distance <= d:
+        return lcs_length / max_possible, plan_info(VARIANT_BANDED)
+
+    # The true distance is > d too, which caps the LCS
+    upper = (n + m - d - 1) // 2
+    score = lcs_length / max_possible
+    return score, plan_info(VARIANT_BANDED, bounds=(score, upper / max_possible))
+
+
+def lcs_similarity(list_a: list, list_b: list) -> float:
+    """
+    Calculates the Longest Common Subsequence between two lists.
+    Used for checking the relative order of tokens or control flow blocks.
+    The whole of both lists is used; the algorithm is chosen by size.
+    """
+    return lcs_similarity_planned(list_a, list_b)[0]
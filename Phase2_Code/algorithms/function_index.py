@@ -0,0 +1,261 @@
+import ast
+from collections import Counter
+
+from Phase2_Code.code_preprocess.clean_code import clean_code, strip_comments
+from Phase2_Code.code_preprocess.code_tokenizer import (
+    tokenize_code, tokenize_code_with_lines, normalize_identifiers
+)
+from Phase2_Code.code_preprocess.lexer_registry import get_lexer, resolve_language
+from Phase2_Code.algorithms.rabin_karp import fingerprints
+
+# Functions shorter than this (getters, one-line wrappers) match everywhere
+# and only add noise, so they are not indexed.
+MIN_FUNCTION_TOKENS = 15
+
+# A '{' preceded by one of these is a block, never a function body
+CONTROL_KEYWORDS = {
+    "if", "for", "while", "switch", "catch", "synchronized", "return",
+    "sizeof", "new", "else", "do", "try", "decltype", "alignof"
+}
+
+# Tokens allowed between ')' and '{' of a function header:
+# qualifiers, 'throws A, B', trailing return types ('-> std::vector<int>')
+HEADER_SUFFIX_TOKENS = {
+    "const", "noexcept", "override", "final", "throws", "volatile",
+    "mutable", "&", "&&", "->", "::", ",", ".", "<", ">"
+}
+MAX_HEADER_SUFFIX = 12
+
+# A '{' whose header has one of these opens a type, whatever comes before
+# it ('@SuppressWarnings("x") public class Foo {' is not a function)
+TYPE_KEYWORDS = {"class", "interface", "enum", "struct", "union", "record"}
+
+
+# -------------------------------------------------------------------------
+# 1. SPLITTING FILES INTO FUNCTION UNITS
+# -------------------------------------------------------------------------
+
+def _make_unit(name: str, start_line: int, end_line: int, tokens: list) -> dict:
+    return {
+        "name":         name,
+        "start_line":   start_line,
+        "end_line":     end_line,
+        "size":         len(tokens),
+        "fingerprints": fingerprints(tokens),
+    }
+
+
+def split_python_functions(code: str) -> list:
+    """
+    Uses Python's ast to find top-level functions and methods (nested
+    functions stay part of their parent). Returns [] on syntax errors.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+
+    lines = code.splitlines()
+    units = []
+
+    def visit(body):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                segment = "\n".join(lines[node.lineno - 1:node.end_lineno])
+                tokens = normalize_identifiers(
+                    tokenize_code(clean_code(segment, lang="python"), lang="python"),
+                    lang="python"
+                )
+                units.append(_make_unit(node.name, node.lineno, node.end_lineno, tokens))
+            elif isinstance(node, ast.ClassDef):
+                visit(node.body)
+
+    visit(tree.body)
+    return units
+
+
+def _function_name_before(tokens: list, brace_idx: int):
+    """
+    Given the index of a '{', returns the index of the function name token
+    if the tokens before it look like a header: name ( ... ) [qualifiers] {
+    Returns None for control blocks, initialisers, classes, etc.
+    """
+    j = brace_idx - 1
+    skipped = 0
+    while j >= 0 and tokens[j][0] != ")":
+        tok = tokens[j][0]
+        if tok in TYPE_KEYWORDS:
+            return None
+        if tok not in HEADER_SUFFIX_TOKENS and not (tok[0].isalpha() or tok[0] == "_"):
+            return None
+        skipped += 1
+        if skipped > MAX_HEADER_SUFFIX:
+            return None
+        j -= 1
+    if j < 0:
+        return None
+
+    # Walk back to the matching '('
+    depth = 0
+    while j >= 0:
+        tok = tokens[j][0]
+        if tok == ")":
+            depth += 1
+        elif tok == "(":
+            depth -= 1
+            if depth == 0:
+                break
+        j -= 1
+    if j <= 0:
+        return None
+
+    name = tokens[j - 1][0]
+    if not (name[0].isalpha() or name[0] == "_") or name in CONTROL_KEYWORDS:
+        return None
+    # 'new Runnable() {' is an anonymous class, not a method
+    if j >= 2 and tokens[j - 2][0] == "new":
+        return None
+    # '@Name(...)' is an annotation, not a call header
+    if j >= 2 and tokens[j - 2][0] == "@":
+        return None
+    return j - 1
+
+
+def split_brace_functions(code: str, lang: str) -> list:
+    """
+    Brace-language (Java, C++, ...) splitter based on brace structure of the token stream.
+    A unit spans the function name line to its matching '}'. Functions
+    nested inside a unit (lambdas, local classes) stay part of it.
+    """
+    tokens = tokenize_code_with_lines(strip_comments(code, lang=lang), lang=lang)
+
+    units = []
+    depth = 0
+    current = None   # (name_idx, body_idx, depth at which the body opened)
+
+    for i, (tok, line) in enumerate(tokens):
+        if tok == "{":
+            if current is None:
+                name_idx = _function_name_before(tokens, i)
+                if name_idx is not None:
+                    current = (name_idx, i, depth)
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if current is not None and depth == current[2]:
+                name_idx, body_idx, _ = current
+                # Fingerprint the body only: qualifiers and 'throws' lists in the
+                # header would shift the var1, var2... numbering of the whole unit
+                unit_tokens = normalize_identifiers([t for t, _ in tokens[body_idx:i + 1]], lang=lang)
+                name, start_line = tokens[name_idx]
+                units.append(_make_unit(name, start_line, line, unit_tokens))
+                current = None
+
+    return units
+
+
+def split_functions(code: str, lang: str, min_tokens: int = MIN_FUNCTION_TOKENS) -> list:
+    """
+    Dispatcher: breaks a file into function units, each with its own
+    winnowing fingerprint set. Units under min_tokens are dropped.
+    """
+    if not lang:
+        raise ValueError("Language must be specified for function splitting.")
+
+    lang = resolve_language(lang)
+    blocks = get_lexer(lang)["blocks"]
+    if blocks == "braces":
+        units = split_brace_functions(code, lang)
+    elif blocks == "indent":
+        units = split_python_functions(code)
+    else:
+        # No splitter for keyword-delimited blocks (Ruby) yet
+        units = []
+
+    return [u for u in units if u["size"] >= min_tokens]
+
+
+# -------------------------------------------------------------------------
+# 2. INVERTED FINGERPRINT INDEX
+# -------------------------------------------------------------------------
+
+class FunctionIndex:
+    """
+    Inverted index: fingerprint hash -> ids of the units containing it.
+    Matching a unit only touches units that share at least one
+    fingerprint, instead of scoring every unit against every other.
+    """
+
+    def __init__(self):
+        self.units = []       # unit id -> (doc_id, unit)
+        self.postings = {}    # fingerprint -> [unit id, ...]
+
+    def add(self, doc_id, units: list) -> None:
+        for unit in units:
+            unit_id = len(self.units)
+            self.units.append((doc_id, unit))
+            for fp in unit["fingerprints"]:
+                self.postings.setdefault(fp, []).append(unit_id)
+
+    def query(self, unit: dict, threshold: float = 0.5, exclude_doc=None) -> list:
+        """
+        Returns [(score, doc_id, other_unit), ...] for indexed units whose
+        fingerprint Jaccard with `unit` is at least threshold, best first.
+        """
+        shared = Counter()
+        for fp in unit["fingerprints"]:
+            for unit_id in self.postings.get(fp, ()):
+                shared[unit_id] += 1
+
+        hits = []
+        size = len(unit["fingerprints"])
+        for unit_id, common in shared.items():
+            doc_id, other = self.units[unit_id]
+            if exclude_doc is not None and doc_id == exclude_doc:
+                continue
+            score = common / (size + len(other["fingerprints"]) - common)
+            if score >= threshold:
+                hits.append((score, doc_id, other))
+
+        hits.sort(key=lambda h: h[0], reverse=True)
+        return hits
+
+
+# -------------------------------------------------------------------------
+# 3. PAIRWISE FUNCTION MATCHES
+# -------------------------------------------------------------------------
+
+def compare_functions(
+    code1: str,
+    code2: str,
+    lang1: str,
+    lang2: str,
+    threshold: float = 0.5,
+    max_matches: int = 20,
+) -> list:
+    """
+    Function-to-function matches between two files, found via index
+    lookups. Catches a few copied functions inside an otherwise original
+    project, which whole-file scores dilute.
+    """
+    units1 = split_functions(code1, lang1)
+    units2 = split_functions(code2, lang2)
+    if not units1 or not units2:
+        return []
+
+    index = FunctionIndex()
+    index.add(2, units2)
+
+    matches = []
+    for unit in units1:
+        for score, _, other in index.query(unit, threshold=threshold):
+            matches.append({
+                "score":           round(score * 100, 2),
+                "file_a_function": unit["name"],
+                "file_a_region":   [unit["start_line"], unit["end_line"]],
+                "file_b_function": other["name"],
+                "file_b_region":   [other["start_line"], other["end_line"]],
+            })
+
+    matches.sort(key=lambda m: m["score"], reverse=True)
+    return matches[:max_matches]
@@ -30,6 +30,16 @@ def winnowing(hashes: list, window_size: int):
         
     return fingerprints
 
+def fingerprints(tokens: list, k: int = 3, window_size: int = 4) -> set:
+    """
+    Winnowing fingerprint set of a token list (k-gram hash -> window minimum).
+    Returns an empty set for lists shorter than k.
+    """
+    if len(tokens) < k:
+        return set()
+    hashes = [hash_kgram(kg) for kg in get_kgrams(tokens, k)]
+    return winnowing(hashes, window_size)
+
 def similarity_score(tokens1: list, tokens2: list, k: int = 3, window_size: int = 4) -> float:
     """
     Calculates Jaccard similarity using Winnowing, with safety nets for tiny files.
@@ -46,17 +56,9 @@ def similarity_score(tokens1: list, tokens2: list, k: int = 3, window_size: int
         union = len(set1 | set2)
         return intersection / union if union > 0 else 0.0
 
-    # 1. Generate k-grams
-    kgrams_a = get_kgrams(tokens1, k)
-    kgrams_b = get_kgrams(tokens2, k)
-
-    # 2. Hash k-grams
-    hashes_a = [hash_kgram(kg) for kg in kgrams_a]
-    hashes_b = [hash_kgram(kg) for kg in kgrams_b]
-
-    # 3. Create Fingerprints
-    fp_a = winnowing(hashes_a, window_size)
-    fp_b = winnowing(hashes_b, window_size)
+    # 1-3. k-grams -> hashes -> winnowed fingerprints
+    fp_a = fingerprints(tokens1, k, window_size)
+    fp_b = fingerprints(tokens2, k, window_size)
 
     # 4. Calculate Jaccard Similarity
     intersection = len(fp_a.intersection(fp_b))
@@ -1,24 +1,107 @@
+import logging
+import threading
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "jinaai/jina-embeddings-v2-base-code"
+
 
 class SemanticEmbedder:
-    def __init__(self):
+    def __init__(self, model_name: str = MODEL_NAME, local_files_only: bool = True):
         # 1. We load the model once into RAM.
-        self.model = SentenceTransformer("jinaai/jina-embeddings-v2-base-code", trust_remote_code=True)
+        # Imported here so that importing this module never pulls in torch.
+        # local_files_only: never download weights from inside a request/task.
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(
+            model_name,
+            trust_remote_code=True,
+            local_files_only=local_files_only,
+        )
 
     def encode_batch(self, code_snippets: List[str]) -> np.ndarray:
         # 2. We take a list of 50 student codes, and the AI turns them into 50 vectors (matrices).
         if not code_snippets:
             return np.array([])
         embeddings = self.model.encode(code_snippets)
-        
+
         # 3. We normalize them mathematically. (This replaces what FAISS used to do).
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        norms[norms == 0] = 1e-10 
+        norms[norms == 0] = 1e-10
         return embeddings / norms
 
     def calculate_similarity(self, vector_a: np.ndarray, vector_b: np.ndarray) -> float:
         # 4. We calculate the exact percentage similarity between two files.
         sim = np.dot(vector_a, vector_b)
-        return float(np.clip(sim, 0.0, 1.0))
\ No newline at end of file
+        return float(np.clip(sim, 0.0, 1.0))
+
+
+# -------------------------------------------------------------------------
+# PER-PROCESS SINGLETON
+# -------------------------------------------------------------------------
+
+_embedder = None
+_embedder_lock = threading.Lock()
+_load_failed = False
+_model_load_ms = None
+
+
+def get_embedder() -> Optional[SemanticEmbedder]:
+    """
+    Returns the process-wide embedder, loading the model on first use.
+    Returns None if sentence-transformers or the model files are not
+    available locally, so callers can skip the metric instead of failing.
+    """
+    global _embedder, _load_failed, _model_load_ms
+
+    if _embedder is not None or _load_failed:
+        return _embedder
+
+    with _embedder_lock:
+        # Another thread may have finished loading while we waited
+        if _embedder is None and not _load_failed:
+            start = time.perf_counter()
+            try:
+                _embedder = SemanticEmbedder()
+            except Exception as e:
+                _load_failed = True
+                logger.warning("Semantic model unavailable, metric disabled: %s", e)
+            _model_load_ms = round((time.perf_counter() - start) * 1000, 2)
+            if _embedder is not None:
+                logger.info("Loaded semantic model %s in %.0fms", MODEL_NAME, _model_load_ms)
+
+    return _embedder
+
+
+def warm_up() -> dict:
+    """
+    Loads the model and runs one tiny encode so the first real call
+    doesn't pay for lazy initialisation inside the model.
+    """
+    embedder = get_embedder()
+    if embedder is not None:
+        embedder.encode_batch(["def f(x):\n    return x"])
+    return {"available": embedder is not None, "model_load_ms": _model_load_ms}
+
+
+def semantic_similarity(code1: str, code2: str) -> tuple:
+    """
+    Embedding similarity between two raw code strings.
+    Returns (score, stats). score is None when the model is unavailable.
+    stats holds the per-call latency and the (one-off) model load time.
+    """
+    start = time.perf_counter()
+    embedder = get_embedder()
+
+    score = None
+    if embedder is not None:
+        vectors = embedder.encode_batch([code1, code2])
+        score = embedder.calculate_similarity(vectors[0], vectors[1])
+
+    stats = {
+        "latency_ms":    round((time.perf_counter() - start) * 1000, 2),
+        "model_load_ms": _model_load_ms,
+    }
+    return score, stats
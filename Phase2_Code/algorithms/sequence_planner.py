@@ -0,0 +1,106 @@
+# Size-aware choice of algorithm for the quadratic sequence metrics (token
+# LCS, AST edit distance), replacing the old hard MAX_LEN cut that ignored
+# everything past token 8000:
+#   exact         classic DP table, for small inputs
+#   bit_parallel  bit-vector DP (Python big ints as bit vectors): exact,
+#                 ~64x fewer steps than the table
+#   banded        DP restricted to a diagonal band: exact when the true
+#                 distance fits in the band, otherwise approximate with bounds
+
+VARIANT_EXACT = "exact"
+VARIANT_BIT_PARALLEL = "bit_parallel"
+VARIANT_BANDED = "banded"
+
+# Up to this many DP cells (n * m) the plain table is cheap enough
+EXACT_MAX_CELLS = 250_000
+
+# Bit-parallel cost is ~ longer length * (shorter length / 64) machine words.
+# 5e8 words is a few seconds for LCS (e.g. two files of ~200k tokens).
+BIT_PARALLEL_MAX_WORDS = 500_000_000
+
+# Cell budget of the banded DP for inputs beyond the bit-parallel budget
+BANDED_MAX_CELLS = 4_000_000
+
+
+def plan_variant(n: int, m: int) -> str:
+    """Picks the variant for sequences of length n and m."""
+    if n * m <= EXACT_MAX_CELLS:
+        return VARIANT_EXACT
+    short, long_ = min(n, m), max(n, m)
+    if long_ * (short // 64 + 1) <= BIT_PARALLEL_MAX_WORDS:
+        return VARIANT_BIT_PARALLEL
+    # The band must cover the length difference to reach the end at all;
+    # otherwise exactness is worth the extra time
+    if band_width(n, m) > long_ - short:
+        return VARIANT_BANDED
+    return VARIANT_BIT_PARALLEL
+
+
+def band_width(n: int, m: int) -> int:
+    """Half-width d of the band |i - j| <= d that fits BANDED_MAX_CELLS."""
+    return BANDED_MAX_CELLS // (2 * max(min(n, m), 1))
+
+
+def symbol_masks(seq: list) -> dict:
+    """
+    {symbol: int} with bit i set where seq[i] == symbol. Built from a byte
+    buffer per symbol: OR-ing 1 << i into a big int would copy it every time.
+    """
+    positions = {}
+    for i, symbol in enumerate(seq):
+        positions.setdefault(symbol, []).append(i)
+
+    nbytes = len(seq) // 8 + 1
+    masks = {}
+    for symbol, indexes in positions.items():
+        buf = bytearray(nbytes)
+        for i in indexes:
+            buf[i >> 3] |= 1 << (i & 7)
+        masks[symbol] = int.from_bytes(buf, "little")
+    return masks
+
+
+def banded_distance(seq_a: list, seq_b: list, d: int, substitution: bool) -> int:
+    """
+    Edit distance restricted to cells with |i - j| <= d. With substitution
+    False only insertions/deletions count (n + m - 2 * LCS). The result is
+    never below the true distance, and equals it whenever that is <= d (a
+    path of cost <= d can't leave the band).
+    """
+    n, m = len(seq_a), len(seq_b)
+    inf = n + m + 1
+    width = 2 * d + 1
+
+    # Row i is stored by offset k = j - i + d
+    prev = [k - d if 0 <= k - d <= m else inf for k in range(width)]
+    for i in range(1, n + 1):
+        curr = [inf] * width
+        a = seq_a[i - 1]
+        for k in range(max(0, d - i), min(width, m - i + d + 1)):
+            j = i + k - d
+            if j == 0:
+                curr[k] = i
+                continue
+            if a == seq_b[j - 1]:
+                best = prev[k]
+            else:
+                best = prev[k] + 1 if substitution else inf
+            if k + 1 < width and prev[k + 1] + 1 < best:
+                best = prev[k + 1] + 1
+            if k > 0 and curr[k - 1] + 1 < best:
+                best = curr[k - 1] + 1
+            curr[k] = best
+        prev = curr
+
+    return prev[m - n + d] if abs(m - n) <= d else inf
+
+
+def plan_info(variant: str, bounds: tuple = None) -> dict:
+    """
+    Report entry for one metric: which variant ran, whether its score is
+    approximate and, if so, the interval the true score lies in.
+    """
+    info = {"variant": variant, "approximate": bounds is not None}
+    if bounds is not None:
+        info["bounds"] = [round(bounds[0], 4), round(bounds[1], 4)]
+    return info
@@ -0,0 +1,171 @@
+import os
+import struct
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+
+from Phase2_Code.code_preprocess.clean_code import strip_comments, clean_code
+from Phase2_Code.code_preprocess.code_tokenizer import tokenize_code
+
+# Template k-grams are taken over RAW tokens (before var1/var2 renaming):
+# starter code is pasted verbatim, and renaming depends on the whole file
+# so normalized k-grams of the same scaffold differ between submissions.
+TEMPLATE_K = 5
+
+# Lines shorter than this ('}', 'else:', 'return 0;') are too generic to
+# be treated as template lines.
+MIN_TEMPLATE_LINE_CHARS = 10
+
+# A function region counts as starter code when this share of its
+# (non-trivial) lines are template lines.
+TEMPLATE_REGION_RATIO = 0.8
+
+_MAGIC = b"TPLF"
+_VERSION = 1
+
+
+def _stable_hash(value: str) -> int:
+    """
+    32-bit CRC: stable across processes (unlike hash()) and C-speed.
+    With a few thousand template hashes, a false match on a submission
+    k-gram has probability ~1e-6, which is negligible for scoring.
+    """
+    return zlib.crc32(value.encode("utf-8"))
+
+
+def _kgram_hashes(tokens: list, k: int) -> list:
+    # '\x00' separator: ["ab", "c"] and ["a", "bc"] must not collide
+    return [_stable_hash("\x00".join(tokens[i:i + k])) for i in range(len(tokens) - k + 1)]
+
+
+class TemplateFilter:
+    """
+    Precomputed fingerprints of instructor starter code for one assignment:
+    a set of raw-token k-gram hashes and a set of normalized line hashes.
+    Serialises to a compact byte artefact (packed uint32 arrays) that can be
+    stored once and cached by every worker.
+    """
+
+    def __init__(self, kgram_hashes, line_hashes, k: int = TEMPLATE_K):
+        self.kgram_hashes = frozenset(kgram_hashes)
+        self.line_hashes = frozenset(line_hashes)
+        self.k = k
+
+    # ---------- Building ----------
+    @classmethod
+    def from_sources(cls, sources: list, k: int = TEMPLATE_K):
+        """
+        sources: list of (code, lang) tuples — one per template file.
+        """
+        kgram_hashes = set()
+        line_hashes = set()
+
+        for code, lang in sources:
+            for line in strip_comments(code, lang=lang).splitlines():
+                line = " ".join(line.split())
+                if len(line) >= MIN_TEMPLATE_LINE_CHARS:
+                    line_hashes.add(_stable_hash(line))
+
+            tokens = tokenize_code(clean_code(code, lang=lang), lang=lang)
+            kgram_hashes.update(_kgram_hashes(tokens, k))
+
+        return cls(kgram_hashes, line_hashes, k)
+
+    # ---------- Applying ----------
+    def remove_template_lines(self, code: str, lang: str) -> tuple:
+        """
+        Strips comments and blanks every line that also appears in the
+        template. Newlines are kept so line numbers stay valid.
+        Returns (code, flags): flags[i] is True for a removed line, False for
+        a kept one and None for lines too short to judge.
+        """
+        lines = strip_comments(code, lang=lang).split("\n")
+        flags = []
+        for i, line in enumerate(lines):
+            norm = " ".join(line.split())
+            if len(norm) < MIN_TEMPLATE_LINE_CHARS:
+                flags.append(None)
+            elif _stable_hash(norm) in self.line_hashes:
+                lines[i] = ""
+                flags.append(True)
+            else:
+                flags.append(False)
+        return "\n".join(lines), flags
+
+    def mask_template_tokens(self, tokens: list) -> list:
+        """
+        Drops every raw token covered by a k-gram that occurs in the
+        template, so template fingerprints never reach winnowing or LCS.
+        """
+        k = self.k
+        if len(tokens) < k or not self.kgram_hashes:
+            return tokens
+
+        template = self.kgram_hashes
+        keep = [True] * len(tokens)
+        covered_until = -1
+        for i, h in enumerate(_kgram_hashes(tokens, k)):
+            if h in template:
+                for j in range(max(i, covered_until + 1), i + k):
+                    keep[j] = False
+                covered_until = i + k - 1
+
+        return [t for t, kept in zip(tokens, keep) if kept]
+
+    # ---------- Serialisation ----------
+    def to_bytes(self) -> bytes:
+        kgrams = array("I", sorted(self.kgram_hashes))
+        lines = array("I", sorted(self.line_hashes))
+        if sys.byteorder == "big":   # artefact is always little-endian
+            kgrams.byteswap()
+            lines.byteswap()
+        return (
+            _MAGIC + struct.pack("<BBII", _VERSION, self.k, len(kgrams), len(lines))
+            + kgrams.tobytes() + lines.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        if data[:4] != _MAGIC:
+            raise ValueError("Not a template filter artefact.")
+        version, k, n_kgrams, n_lines = struct.unpack_from("<BBII", data, 4)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported template filter version {version}.")
+
+        offset = 4 + struct.calcsize("<BBII")
+        values = array("I")
+        values.frombytes(data[offset:offset + 4 * (n_kgrams + n_lines)])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return cls(values[:n_kgrams], values[n_kgrams:], k)
+
+    def save(self, path: str) -> None:
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+
+def is_template_region(flags: list, start_line: int, end_line: int) -> bool:
+    """
+    True if most judged lines in [start_line, end_line] (1-based) were
+    template lines, according to remove_template_lines flags.
+    """
+    judged = [f for f in flags[start_line - 1:end_line] if f is not None]
+    return bool(judged) and sum(judged) >= TEMPLATE_REGION_RATIO * len(judged)
+
+
+@lru_cache(maxsize=32)
+def _load_cached(path: str, mtime_ns: int) -> TemplateFilter:
+    with open(path, "rb") as f:
+        return TemplateFilter.from_bytes(f.read())
+
+
+def load_template_filter(path: str) -> TemplateFilter:
+    """
+    Loads a saved artefact once per process; a rebuilt file (new mtime)
+    is picked up automatically.
+    """
+    return _load_cached(path, os.stat(path).st_mtime_ns)
@@ -0,0 +1,42 @@
+import dis
+import types
+
+# Bookkeeping opcodes that carry no program structure: interpreter
+# prologue, inline-cache slots, padding and argument extension.
+SKIPPED_OPCODES = {"RESUME", "CACHE", "NOP", "EXTENDED_ARG"}
+_SKIPPED_CODES = frozenset(dis.opmap[name] for name in SKIPPED_OPCODES if name in dis.opmap)
+
+
+def _walk_code(code_obj: types.CodeType, out: list) -> None:
+    """
+    Appends the opcode names of code_obj, then of every nested code object
+    (functions, classes, comprehensions, lambdas) in constant-table order.
+    """
+    # Wordcode: every instruction is (opcode, arg) bytes. Reading co_code
+    # directly is ~50x faster than dis.get_instructions, which builds an
+    # Instruction object (with argument resolution) per opcode.
+    names = dis.opname
+    out.extend(names[op] for op in code_obj.co_code[::2] if op not in _SKIPPED_CODES)
+
+    for const in code_obj.co_consts:
+        if isinstance(const, types.CodeType):
+            _walk_code(const, out)
+
+
+def bytecode_opcodes(code: str) -> list:
+    """
+    Compiles Python source and returns its opcode-name stream.
+    Argument names, constants and line tables are dropped, so formatting,
+    comments, renamed variables and some syntactic sugar all disappear.
+    Returns None when the source doesn't compile (the metric is then skipped).
+
+    The code is only compiled, never executed.
+    """
+    try:
+        code_obj = compile(code, "<submission>", "exec", dont_inherit=True)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+
+    opcodes = []
+    _walk_code(code_obj, opcodes)
+    return opcodes
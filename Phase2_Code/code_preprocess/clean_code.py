@@ -1,5 +1,8 @@
 import re
 
+from Phase2_Code.code_preprocess.lexer_registry import LEXERS, resolve_language
+
+
 def normalize_whitespace(code: str) -> str:
     """
     Shared function to normalize whitespace:
@@ -8,18 +11,153 @@ def normalize_whitespace(code: str) -> str:
     return re.sub(r"\s+", " ", code).strip()
 
 
+# -------------------------------------------------------------------------
+# SINGLE-PASS COMMENT SCANNER
+# -------------------------------------------------------------------------
+# Each language's comment/string syntax (the "comments" entry of its
+# lexer_registry table) is compiled into ONE regex whose alternatives
+# start with different characters, so the regex engine acts as a state
+# machine: each character is consumed once and nothing backtracks — even
+# on unterminated docstrings or block comments. Code and string literals
+# are consumed together as a single "keep" run, so Python-level work is
+# per comment, not per literal.
+#
+#   line:      line-comment openers (comment runs to the newline)
+#   block:     (open, close) block-comment pairs
+#   strings:   quote sequences; '#' or '//' inside a literal is kept
+#   multiline: single-char quotes whose literals may span lines (JS '`')
+#   verbatim:  quotes with no escape sequences, may span lines (Go '`');
+#              a prefixed one (C# '@"') escapes its quote by doubling it
+#   drop:      quotes whose literals are removed like comments (docstrings)
+#   raw:       C++11 raw strings R"delim( ... )delim"
+
+# Unterminated raw strings run to EOF, like every other construct
+_CPP_RAW_STRING = r'R"(?P<delim>[^()\\\s]{0,16})\((?:.*?\)(?P=delim)"|.*\Z)'
+
+_scanners = {}
+
+
+def _literal_pattern(quote: str, longer: list, multiline: bool = False, verbatim: bool = False) -> str:
+    """
+    One string literal, opening quote included. Each character has exactly
+    one way to match (plain run, escape pair, or a quote char that doesn't
+    close). Single-char quotes stop at a newline unless multiline; verbatim
+    literals have no escapes, except that a prefixed verbatim quote (C#
+    '@"') closes on its last char and reads a doubled one as a literal quote.
+    Anything unterminated runs to EOF. `longer` are quotes this one is a
+    prefix of (a single double-quote vs a triple one), which must not match here.
+    """
+    q = re.escape(quote[0])
+    opener = re.escape(quote)
+    if longer:
+        opener += "(?!" + "|".join(re.escape(l[len(quote):]) for l in longer) + ")"
+
+    if verbatim and quote[0] != quote[-1]:
+        q = re.escape(quote[-1])
+        return rf"{opener}(?:[^{q}]+|{q}{q})*(?:{q}|\Z)"
+    if verbatim and len(quote) == 1:
+        return rf"{opener}[^{q}]*(?:{q}|\Z)"
+    if verbatim:
+        return rf"{opener}(?:[^{q}]+|{q}(?!{q}{{{len(quote) - 1}}}))*(?:{q}{{{len(quote)}}}|\Z)"
+    if len(quote) == 1 and multiline:
+        return rf"{opener}(?:[^{q}\\]+|\\.?)*(?:{q}|\Z)"
+    if len(quote) == 1:
+        return rf"{opener}(?:[^{q}\\\n]+|\\.?)*(?:{q}|(?=\n)|\Z)"
+    return rf"{opener}(?:[^{q}\\]+|\\.?|{q}(?!{q}{{{len(quote) - 1}}}))*(?:{opener}|\Z)"
+
+
+def _get_scanner(lang: str):
+    """Compiles (and caches) the scanner regex for one registry language."""
+    scanner = _scanners.get(lang)
+    if scanner is not None:
+        return scanner
+
+    spec = LEXERS[lang]["comments"]
+    kept = list(spec["strings"]) + list(spec["multiline"]) + list(spec["verbatim"])
+    quotes = kept + list(spec["drop"])
+    removed = list(spec["line"]) + [b[0] for b in spec["block"]] + list(spec["drop"])
+    firsts = {m[0] for m in removed + quotes} | ({"R"} if spec["raw"] else set())
+
+    def literal(q):
+        longer = [l for l in quotes if len(l) > len(q) and l.startswith(q)]
+        return _literal_pattern(
+            q, longer, multiline=q in spec["multiline"], verbatim=q in spec["verbatim"]
+        )
+
+    keep = ["[^" + "".join(re.escape(c) for c in sorted(firsts)) + "]+"]
+    keep += [literal(q) for q in sorted(kept, key=len, reverse=True)]
+    if spec["raw"]:
+        keep.append(_CPP_RAW_STRING)
+    # A marker's first char on its own ('/' in 'a / b', 'R' in 'Rect')
+    for c in sorted(firsts):
+        rests = [m[1:] for m in removed if m[0] == c]
+        if "" not in rests and c not in kept:
+            keep.append(re.escape(c) + ("(?!" + "|".join(map(re.escape, rests)) + ")" if rests else ""))
+
+    parts = [f"(?P<keep>(?:{'|'.join(keep)})+)"]
+    if spec["line"]:
+        parts.append("(?P<line>(?:" + "|".join(map(re.escape, spec["line"])) + ")[^\n]*)")
+    if spec["block"]:
+        parts.append("(?P<block>" + "|".join(
+            rf"{re.escape(o)}(?:.*?{re.escape(c)}|.*\Z)" for o, c in spec["block"]
+        ) + ")")
+    if spec["drop"]:
+        parts.append("(?P<drop>" + "|".join(literal(q) for q in spec["drop"]) + ")")
+
+    scanner = re.compile("|".join(parts), re.DOTALL)
+    _scanners[lang] = scanner
+    return scanner
+
+
+def _scan_replacement(match) -> str:
+    kind = match.lastgroup
+    if kind == "keep":
+        return match.group(0)
+    if kind == "line":
+        return ""                                  # the newline itself is kept
+    return "\n" * match.group(0).count("\n")      # block comment / docstring
+
+
+def _scan_comments(code: str, lang: str) -> str:
+    return _get_scanner(lang).sub(_scan_replacement, code)
+
+
+def strip_python_comments(code: str) -> str:
+    """
+    Removes \"\"\" and \'\'\' docstrings and # comments, keeping line breaks.
+    A '#' inside a string literal is left alone.
+    """
+    return _scan_comments(code, "python")
+
+
+def strip_c_style_comments(code: str, lang: str = "java") -> str:
+    """
+    Removes /* */ and // comments (Java, C++, and the other C-family
+    registry languages), keeping line breaks.
+    Does NOT touch '#', so C++ preprocessor lines stay intact, and
+    leaves '//' inside string, char and (C++) raw string literals.
+    """
+    return _scan_comments(code, resolve_language(lang))
+
+
+def strip_comments(code: str, lang: str) -> str:
+    """
+    Removes comments but keeps every newline, so tokens can still be
+    mapped back to source lines (used by function-level matching).
+    """
+    if not lang:
+        raise ValueError("Language must be specified for cleaning.")
+
+    return _scan_comments(code, resolve_language(lang))
+
+
 def clean_python(code: str) -> str:
     """
     Cleaning rules specific to Python:
     - Removes # single-line comments
     - Removes \"\"\" and ''' multi-line docstrings
     """
-    # Remove multi-line comments (Docstrings)
-    code = re.sub(r'"""[\s\S]*?"""', "", code)
-    code = re.sub(r"'''[\s\S]*?'''", "", code)    
-    # Remove single-line comments (Hash)
-    code = re.sub(r"#.*?$", "", code, flags=re.MULTILINE)    
-    return normalize_whitespace(code)
+    return normalize_whitespace(strip_python_comments(code))
 
 
 def clean_java(code: str) -> str:
@@ -28,11 +166,7 @@ def clean_java(code: str) -> str:
     - Removes // single-line comments
     - Removes /* */ multi-line comments
     """
-    # Remove multi-line comments
-    code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)    
-    # Remove single-line comments (Double slash)
-    code = re.sub(r"//.*?$", "", code, flags=re.MULTILINE)    
-    return normalize_whitespace(code)
+    return normalize_whitespace(strip_c_style_comments(code))
 
 
 def clean_cpp(code: str) -> str:
@@ -42,21 +176,17 @@ def clean_cpp(code: str) -> str:
     - Removes /* */ multi-line comments
     - CRITICAL: Does NOT remove '#' so headers like #include <iostream> stay intact.
     """
-    # Remove multi-line comments
-    code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)    
-    # Remove single-line comments (Double slash)
-    code = re.sub(r"//.*?$", "", code, flags=re.MULTILINE)    
-    return normalize_whitespace(code)
+    return normalize_whitespace(strip_c_style_comments(code, lang="cpp"))
 
 
 def clean_code(code: str, lang: str) -> str:
     """
-    Dispatcher function. 
+    Dispatcher function.
     'lang' is REQUIRED. No default value.
     """
     if not lang:
         raise ValueError("Language must be specified for cleaning.")
-        
+
     lang = lang.lower()
 
     if lang == "java":
@@ -66,6 +196,6 @@ def clean_code(code: str, lang: str) -> str:
     elif lang in ["python", "py"]:
         return clean_python(code)
     else:
-        # Safety fallback: If we don't know the language, 
-        # assume Python (or return raw code if you prefer).
-        return clean_python(code)
+        # Any other registry language uses its own comment syntax;
+        # unknown languages fall back to Python rules.
+        return normalize_whitespace(strip_comments(code, lang=lang))
@@ -1,55 +1,24 @@
 import re
 
 # -------------------------------------------------------------------------
-# 1. COMPREHENSIVE KEYWORD LISTS
+# 1. KEYWORD LISTS + TOKEN PATTERNS (from the lexer registry)
 # -------------------------------------------------------------------------
 
-# Python 3 Keywords
-PY_KEYWORDS = {
-    "False", "None", "True", "and", "as", "assert", "async", "await",
-    "break", "class", "continue", "def", "del", "elif", "else", "except",
-    "finally", "for", "from", "global", "if", "import", "in", "is", "lambda",
-    "nonlocal", "not", "or", "pass", "raise", "return", "try", "while",
-    "with", "yield", "print", "range", "self", "len", "str", "int", "float",
-    "list", "dict", "set", "tuple", "super", "__init__"
-}
-
-# Java Keywords (Standard + Contextual)
-JAVA_KEYWORDS = {
-    "abstract", "assert", "boolean", "break", "byte", "case", "catch", "char",
-    "class", "const", "continue", "default", "do", "double", "else", "enum",
-    "extends", "final", "finally", "float", "for", "goto", "if", "implements",
-    "import", "instanceof", "int", "interface", "long", "native", "new",
-    "package", "private", "protected", "public", "return", "short", "static",
-    "strictfp", "super", "switch", "synchronized", "this", "throw", "throws",
-    "transient", "try", "void", "volatile", "while", "true", "false", "null",
-    "var", "String", "System", "out", "println", "main", "Override"
-}
-
-# C++ Keywords (C++17/20 Standards)
-CPP_KEYWORDS = {
-    "alignas", "alignof", "and", "and_eq", "asm", "auto", "bitand", "bitor",
-    "bool", "break", "case", "catch", "char", "char8_t", "char16_t", "char32_t",
-    "class", "compl", "concept", "const", "const_cast", "consteval", "constexpr",
-    "constinit", "continue", "co_await", "co_return", "co_yield", "decltype",
-    "default", "delete", "do", "double", "dynamic_cast", "else", "enum",
-    "explicit", "export", "extern", "false", "float", "for", "friend", "goto",
-    "if", "inline", "int", "long", "mutable", "namespace", "new", "noexcept",
-    "not", "not_eq", "nullptr", "operator", "or", "or_eq", "private",
-    "protected", "public", "register", "reinterpret_cast", "requires", "return",
-    "short", "signed", "sizeof", "static", "static_assert", "static_cast",
-    "struct", "switch", "template", "this", "thread_local", "throw", "true",
-    "try", "typedef", "typeid", "typename", "union", "unsigned", "using",
-    "virtual", "void", "volatile", "wchar_t", "while", "xor", "xor_eq",
-    "include", "define", "ifdef", "endif", "std", "cout", "cin", "endl", "vector", "string"
-}
-
-# Map for easy lookup
-LANG_KEYWORDS = {
-    "python": PY_KEYWORDS,
-    "java": JAVA_KEYWORDS,
-    "cpp": CPP_KEYWORDS
-}
+from Phase2_Code.code_preprocess.lexer_registry import (
+    PY_KEYWORDS, JAVA_KEYWORDS, CPP_KEYWORDS, LANG_KEYWORDS, LEXERS,
+    resolve_language, token_pattern, token_regex
+)
+
+# Regex captures: Identifiers, Numbers, Comparison Ops, Brackets, Math/Logic Ops
+PY_TOKEN_PATTERN = token_pattern("python")
+
+# Standard Java operators + Annotations (@)
+JAVA_TOKEN_PATTERN = token_pattern("java")
+
+# '::' and '->' are single tokens rather than ':', ':', '-', '>'
+CPP_TOKEN_PATTERN = token_pattern("cpp")
+
+TOKEN_PATTERNS = {lang: token_pattern(lang) for lang in LEXERS}
 
 
 # -------------------------------------------------------------------------
@@ -62,10 +31,7 @@ def tokenize_python(code: str) -> list:
     - Standard operators
     - Ignores specific C++ operators like '::' or '->'
     """
-    # Regex captures: Identifiers, Numbers, Comparison Ops, Brackets, Math/Logic Ops
-    # Added: [ ] % ! & | ^
-    pattern = r"[A-Za-z_][A-Za-z0-9_]*|\d+|==|!=|<=|>=|[+\-*/=(){}.;,<>[\]%!&|^]"
-    return re.findall(pattern, code)
+    return token_regex("python").findall(code)
 
 
 def tokenize_java(code: str) -> list:
@@ -73,9 +39,7 @@ def tokenize_java(code: str) -> list:
     Java Tokenizer:
     - Similar to Python but handles annotations (@Interface) if needed in future
     """
-    # Standard Java operators + Annotations (@)
-    pattern = r"[A-Za-z_][A-Za-z0-9_]*|\d+|==|!=|<=|>=|&&|\|\||[+\-*/=(){}.;,<>[\]%!&|^@]"
-    return re.findall(pattern, code)
+    return token_regex("java").findall(code)
 
 
 def tokenize_cpp(code: str) -> list:
@@ -85,10 +49,7 @@ def tokenize_cpp(code: str) -> list:
     - Captures pointer access '->'
     - Captures preprocessor directives '#'
     """
-    # We explicitly add '::' and '->' to the regex so they are treated as single tokens
-    # rather than split into ':', ':', '-', '>'
-    pattern = r"::|->|[A-Za-z_][A-Za-z0-9_]*|\d+|==|!=|<=|>=|&&|\|\||[+\-*/=(){}.;,<>[\]%!&|^#]"
-    return re.findall(pattern, code)
+    return token_regex("cpp").findall(code)
 
 
 def tokenize_code(code: str, lang: str) -> list:    
@@ -107,8 +68,30 @@ def tokenize_code(code: str, lang: str) -> list:
     elif lang in ["python", "py"]:
         return tokenize_python(code)
     else:
-        # Fallback to Python-style if unknown
-        return tokenize_python(code)
+        # Registry languages get their own compiled lexer;
+        # unknown ones fall back to Python-style
+        return token_regex(resolve_language(lang)).findall(code)
+
+
+def tokenize_code_with_lines(code: str, lang: str) -> list:
+    """
+    Same tokens as tokenize_code, paired with their 1-based line number:
+    [(token, line), ...]. Expects code whose newlines are intact
+    (see strip_comments), not the whitespace-collapsed clean_code output.
+    """
+    if not lang:
+        raise ValueError("Language must be specified for tokenization.")
+
+    pattern = token_regex(resolve_language(lang))
+
+    tokens = []
+    line = 1
+    last = 0
+    for match in pattern.finditer(code):
+        line += code.count("\n", last, match.start())
+        last = match.start()
+        tokens.append((match.group(0), line))
+    return tokens
 
 
 # -------------------------------------------------------------------------
@@ -123,17 +106,9 @@ def normalize_identifiers(tokens: list, lang: str) -> list:
     if not lang:
         raise ValueError("Language must be specified for normalization.")
         
-    lang = lang.lower()
-    # STRICT CHECK: If language is not supported, we should not guess keywords.
-    if lang not in LANG_KEYWORDS:
-        # Fallback to Python keywords is DANGEROUS for C++/Java.
-        # But if the lang is 'unknown', we might just skip normalization 
-        # to avoid destroying the code.
-        # However, since we auto-detected 'cpp'/'java'/'python', we are safe.
-        # If 'unknown', we default to Python keywords as a best-effort.
-        keywords = PY_KEYWORDS
-    else:
-        keywords = LANG_KEYWORDS[lang]
+    # Every registry language has its own keyword set; aliases ('js', 'c#')
+    # resolve to it. If 'unknown', we default to Python keywords as a best-effort.
+    keywords = LANG_KEYWORDS[resolve_language(lang)]
 
     identifier_map = {}
     normalized_tokens = []
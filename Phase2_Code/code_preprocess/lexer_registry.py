@@ -0,0 +1,299 @@
+import re
+from functools import lru_cache
+
+# -------------------------------------------------------------------------
+# DECLARATIVE LEXER REGISTRY
+# -------------------------------------------------------------------------
+# One table entry per language. clean_code compiles "comments" into its
+# single-pass scanner, code_tokenizer compiles "operators" into the token
+# regex, and "keywords" drive identifier normalization. Adding a language
+# means adding an entry here — nothing else.
+#
+#   extensions: uploaded-file extensions that map to this language
+#   blocks:     'braces' (C family), 'indent' (Python) or 'keywords' (Ruby)
+#   comments:   comment / string syntax, keys described in clean_code.py
+#   operators:  operator / punctuation tokens; multi-char ones win over
+#               their single-char prefixes
+#   keywords:   tokens kept as-is by normalize_identifiers
+
+IDENTIFIER_PATTERN = r"[A-Za-z_][A-Za-z0-9_]*"
+NUMBER_PATTERN = r"\d+"
+
+DEFAULT_LANGUAGE = "python"
+
+LANGUAGE_ALIASES = {
+    "py":     "python",
+    "c++":    "cpp",
+    "js":     "javascript",
+    "ts":     "typescript",
+    "cs":     "csharp",
+    "c#":     "csharp",
+    "golang": "go",
+    "rb":     "ruby",
+}
+
+
+# ---------- Keyword sets ----------
+
+# Python 3 Keywords
+PY_KEYWORDS = {
+    "False", "None", "True", "and", "as", "assert", "async", "await",
+    "break", "class", "continue", "def", "del", "elif", "else", "except",
+    "finally", "for", "from", "global", "if", "import", "in", "is", "lambda",
+    "nonlocal", "not", "or", "pass", "raise", "return", "try", "while",
+    "with", "yield", "print", "range", "self", "len", "str", "int", "float",
+    "list", "dict", "set", "tuple", "super", "__init__"
+}
+
+# Java Keywords (Standard + Contextual)
+JAVA_KEYWORDS = {
+    "abstract", "assert", "boolean", "break", "byte", "case", "catch", "char",
+    "class", "const", "continue", "default", "do", "double", "else", "enum",
+    "extends", "final", "finally", "float", "for", "goto", "if", "implements",
+    "import", "instanceof", "int", "interface", "long", "native", "new",
+    "package", "private", "protected", "public", "return", "short", "static",
+    "strictfp", "super", "switch", "synchronized", "this", "throw", "throws",
+    "transient", "try", "void", "volatile", "while", "true", "false", "null",
+    "var", "String", "System", "out", "println", "main", "Override"
+}
+
+# C++ Keywords (C++17/20 Standards)
+CPP_KEYWORDS = {
+    "alignas", "alignof", "and", "and_eq", "asm", "auto", "bitand", "bitor",
+    "bool", "break", "case", "catch", "char", "char8_t", "char16_t", "char32_t",
+    "class", "compl", "concept", "const", "const_cast", "consteval", "constexpr",
+    "constinit", "continue", "co_await", "co_return", "co_yield", "decltype",
+    "default", "delete", "do", "double", "dynamic_cast", "else", "enum",
+    "explicit", "export", "extern", "false", "float", "for", "friend", "goto",
+    "if", "inline", "int", "long", "mutable", "namespace", "new", "noexcept",
+    "not", "not_eq", "nullptr", "operator", "or", "or_eq", "private",
+    "protected", "public", "register", "reinterpret_cast", "requires", "return",
+    "short", "signed", "sizeof", "static", "static_assert", "static_cast",
+    "struct", "switch", "template", "this", "thread_local", "throw", "true",
+    "try", "typedef", "typeid", "typename", "union", "unsigned", "using",
+    "virtual", "void", "volatile", "wchar_t", "while", "xor", "xor_eq",
+    "include", "define", "ifdef", "endif", "std", "cout", "cin", "endl", "vector", "string"
+}
+
+# C Keywords (C11) + common stdio/stdlib names
+C_KEYWORDS = {
+    "auto", "break", "case", "char", "const", "continue", "default", "do",
+    "double", "else", "enum", "extern", "float", "for", "goto", "if", "inline",
+    "int", "long", "register", "restrict", "return", "short", "signed",
+    "sizeof", "static", "struct", "switch", "typedef", "union", "unsigned",
+    "void", "volatile", "while", "_Bool", "_Complex", "_Alignas", "_Alignof",
+    "_Atomic", "_Static_assert", "_Noreturn", "_Thread_local", "NULL",
+    "include", "define", "ifdef", "ifndef", "endif", "main", "printf", "scanf",
+    "malloc", "free", "size_t"
+}
+
+# JavaScript Keywords (ES2022) + common globals
+JS_KEYWORDS = {
+    "await", "break", "case", "catch", "class", "const", "continue", "debugger",
+    "default", "delete", "do", "else", "export", "extends", "false", "finally",
+    "for", "function", "if", "import", "in", "instanceof", "let", "new", "null",
+    "return", "static", "super", "switch", "this", "throw", "true", "try",
+    "typeof", "undefined", "var", "void", "while", "with", "yield", "async",
+    "of", "console", "log", "length", "require", "module", "exports"
+}
+
+# TypeScript = JavaScript + type-level keywords
+TS_KEYWORDS = JS_KEYWORDS | {
+    "abstract", "any", "as", "boolean", "declare", "enum", "implements",
+    "interface", "keyof", "namespace", "never", "number", "private",
+    "protected", "public", "readonly", "string", "type", "unknown", "void"
+}
+
+# C# Keywords + common BCL names
+CS_KEYWORDS = {
+    "abstract", "as", "base", "bool", "break", "byte", "case", "catch", "char",
+    "checked", "class", "const", "continue", "decimal", "default", "delegate",
+    "do", "double", "else", "enum", "event", "explicit", "extern", "false",
+    "finally", "fixed", "float", "for", "foreach", "goto", "if", "implicit",
+    "in", "int", "interface", "internal", "is", "lock", "long", "namespace",
+    "new", "null", "object", "operator", "out", "override", "params",
+    "private", "protected", "public", "readonly", "ref", "return", "sbyte",
+    "sealed", "short", "sizeof", "static", "string", "struct", "switch",
+    "this", "throw", "true", "try", "typeof", "uint", "ulong", "unchecked",
+    "unsafe", "ushort", "using", "var", "virtual", "void", "volatile", "while",
+    "async", "await", "get", "set", "Console", "WriteLine", "Main", "String", "List"
+}
+
+# Go Keywords + predeclared identifiers
+GO_KEYWORDS = {
+    "break", "case", "chan", "const", "continue", "default", "defer", "else",
+    "fallthrough", "for", "func", "go", "goto", "if", "import", "interface",
+    "map", "package", "range", "return", "select", "struct", "switch", "type",
+    "var", "bool", "byte", "error", "float64", "int", "int64", "string",
+    "rune", "nil", "true", "false", "make", "new", "len", "cap", "append",
+    "fmt", "Println", "Printf", "main"
+}
+
+# Ruby Keywords + common Kernel methods
+RUBY_KEYWORDS = {
+    "BEGIN", "END", "alias", "and", "begin", "break", "case", "class", "def",
+    "defined", "do", "else", "elsif", "end", "ensure", "false", "for", "if",
+    "in", "module", "next", "nil", "not", "or", "redo", "rescue", "retry",
+    "return", "self", "super", "then", "true", "undef", "unless", "until",
+    "when", "while", "yield", "puts", "print", "require", "attr_accessor",
+    "each", "new", "initialize"
+}
+
+
+# ---------- Shared tables ----------
+
+_C_FAMILY_COMMENTS = {
+    "line":      ("//",),
+    "block":     (("/*", "*/"),),
+    "strings":   ('"', "'"),
+    "multiline": (),
+    "verbatim":  (),
+    "drop":      (),
+    "raw":       False,
+}
+
+# The python / java / cpp operator tables reproduce the original
+# hand-written token regexes exactly, so existing scores don't move.
+_BASE_SINGLE_OPERATORS = tuple("+-*/=(){}.;,<>[]%!&|^")
+_BASE_COMPARISONS = ("==", "!=", "<=", ">=")
+
+_C_FAMILY_OPERATORS = (
+    "==", "!=", "<=", ">=", "&&", "||", "++", "--", "+=", "-=", "*=", "/=",
+    "%=", "<<", ">>", "->", "::", "?", ":", "~"
+) + _BASE_SINGLE_OPERATORS
+
+
+LEXERS = {
+    "python": {
+        "extensions": (".py",),
+        "blocks":     "indent",
+        "comments": {
+            "line":      ("#",),
+            "block":     (),
+            "strings":   ("'", '"'),
+            "multiline": (),
+            "verbatim":  (),
+            "drop":      ('"""', "'''"),
+            "raw":       False,
+        },
+        "operators":  _BASE_COMPARISONS + _BASE_SINGLE_OPERATORS,
+        "keywords":   PY_KEYWORDS,
+    },
+    "java": {
+        "extensions": (".java",),
+        "blocks":     "braces",
+        "comments":   dict(_C_FAMILY_COMMENTS, strings=('"""', '"', "'")),   # '"""' = Java 15 text block
+        "operators":  _BASE_COMPARISONS + ("&&", "||") + _BASE_SINGLE_OPERATORS + ("@",),
+        "keywords":   JAVA_KEYWORDS,
+    },
+    "cpp": {
+        "extensions": (".cpp", ".cc", ".cxx", ".hpp", ".hh", ".h"),
+        "blocks":     "braces",
+        "comments":   dict(_C_FAMILY_COMMENTS, raw=True),
+        "operators":  ("::", "->") + _BASE_COMPARISONS + ("&&", "||") + _BASE_SINGLE_OPERATORS + ("#",),
+        "keywords":   CPP_KEYWORDS,
+    },
+    "c": {
+        "extensions": (".c",),
+        "blocks":     "braces",
+        "comments":   _C_FAMILY_COMMENTS,
+        "operators":  _C_FAMILY_OPERATORS + ("#",),
+        "keywords":   C_KEYWORDS,
+    },
+    "javascript": {
+        "extensions": (".js", ".mjs", ".cjs", ".jsx"),
+        "blocks":     "braces",
+        "comments":   dict(_C_FAMILY_COMMENTS, multiline=("`",)),
+        "operators":  ("===", "!==", "=>", "??", "?.", "**") + _C_FAMILY_OPERATORS,
+        "keywords":   JS_KEYWORDS,
+    },
+    "typescript": {
+        "extensions": (".ts", ".tsx"),
+        "blocks":     "braces",
+        "comments":   dict(_C_FAMILY_COMMENTS, multiline=("`",)),
+        "operators":  ("===", "!==", "=>", "??", "?.", "**", "@") + _C_FAMILY_OPERATORS,
+        "keywords":   TS_KEYWORDS,
+    },
+    "csharp": {
+        "extensions": (".cs",),
+        "blocks":     "braces",
+        # '@"' / '@$"' verbatim strings ('""' is the only escape), '"""' C# 11 raw string literal
+        "comments":   dict(_C_FAMILY_COMMENTS, verbatim=('@"', '@$"', '"""')),
+        "operators":  ("=>", "??", "?.", "#") + _C_FAMILY_OPERATORS,
+        "keywords":   CS_KEYWORDS,
+    },
+    "go": {
+        "extensions": (".go",),
+        "blocks":     "braces",
+        "comments":   dict(_C_FAMILY_COMMENTS, verbatim=("`",)),        # raw string, no escapes
+        "operators":  (":=", "<-", "...") + _C_FAMILY_OPERATORS,
+        "keywords":   GO_KEYWORDS,
+    },
+    "ruby": {
+        "extensions": (".rb",),
+        "blocks":     "keywords",
+        "comments": {
+            "line":      ("#",),
+            "block":     (("=begin", "=end"),),
+            "strings":   ("'", '"'),
+            "multiline": (),
+            "verbatim":  (),
+            "drop":      (),
+            "raw":       False,
+        },
+        "operators":  ("**", "<=>", "===", "=~", "..", "::", "=>", "&&", "||",
+                       "<<", ">>", "+=", "-=", "||=", "?", ":", "@", "$", "~")
+                      + _BASE_COMPARISONS + _BASE_SINGLE_OPERATORS,
+        "keywords":   RUBY_KEYWORDS,
+    },
+}
+
+EXTENSION_LANGUAGES = {
+    ext: lang for lang, lexer in LEXERS.items() for ext in lexer["extensions"]
+}
+
+LANG_KEYWORDS = {lang: lexer["keywords"] for lang, lexer in LEXERS.items()}
+
+
+# -------------------------------------------------------------------------
+# LOOKUP + COMPILATION (cached: each table is compiled once per process)
+# -------------------------------------------------------------------------
+
+def resolve_language(lang: str) -> str:
+    """
+    Canonical registry name for a language name or alias ('py', 'c#', ...).
+    Unknown languages fall back to DEFAULT_LANGUAGE, as before.
+    """
+    lang = (lang or "").lower()
+    lang = LANGUAGE_ALIASES.get(lang, lang)
+    return lang if lang in LEXERS else DEFAULT_LANGUAGE
+
+
+def get_lexer(lang: str) -> dict:
+    return LEXERS[resolve_language(lang)]
+
+
+def language_for_extension(ext: str):
+    """'.rb' -> 'ruby'; None for extensions no lexer claims."""
+    return EXTENSION_LANGUAGES.get((ext or "").lower())
+
+
+@lru_cache(maxsize=None)
+def token_pattern(lang: str) -> str:
+    """
+    Identifiers | numbers | multi-char operators (longest first) | a
+    character class of single-char operators.
+    """
+    operators = get_lexer(lang)["operators"]
+    multi = sorted({op for op in operators if len(op) > 1}, key=lambda op: (-len(op), op))
+    single = "".join(re.escape(op) for op in operators if len(op) == 1)
+
+    parts = [IDENTIFIER_PATTERN, NUMBER_PATTERN] + [re.escape(op) for op in multi]
+    if single:
+        parts.append(f"[{single}]")
+    return "|".join(parts)
+
+
+@lru_cache(maxsize=None)
+def token_regex(lang: str):
+    return re.compile(token_pattern(lang))
@@ -1,50 +1,239 @@
 import logging
+from contextlib import nullcontext
 
 from Phase2_Code.code_preprocess.clean_code import clean_code
 from Phase2_Code.code_preprocess.code_tokenizer import tokenize_code, normalize_identifiers
+from Phase2_Code.code_preprocess.bytecode import bytecode_opcodes
+from Phase2_Code.code_preprocess.lexer_registry import resolve_language
 from Phase2_Code.algorithms.rabin_karp import similarity_score as winnowing_similarity
-from Phase2_Code.algorithms.code_lcs import lcs_similarity
-from Phase2_Code.algorithms.ast_similarity import ast_similarity
+from Phase2_Code.algorithms.code_lcs import lcs_similarity, lcs_similarity_planned
+from Phase2_Code.algorithms.ast_similarity import ast_similarity_planned
+from Phase2_Code.algorithms.semantic_embedding import semantic_similarity
+from Phase2_Code.algorithms.function_index import compare_functions
+from Phase2_Code.algorithms.template_filter import is_template_region
 from Phase2_Code.scoring.code_aggregate import aggregate_code_score
 
 logger = logging.getLogger(__name__)
 
 
-def compare_code(code1: str, code2: str, lang1: str, lang2: str) -> dict:
+def _stage(timer, name):
+    # timer: optional Phase3 StageTimer; no-op without one
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def _prepare_tokens(code: str, lang: str, template_filter=None, timer=None) -> tuple:
     """
-    Full pipeline: clean → tokenize → normalize → score → aggregate.
-    lang1 and lang2 must be 'python', 'java', or 'cpp'.
+    clean → tokenize → (template removal) → normalize for one file.
+    Returns (normalized_tokens, template_line_flags, template_tokens_masked,
+    filtered_code); the last three are None / 0 / None without a template filter.
     """
+    flags = None
+    filtered = None
+    if template_filter is not None:
+        with _stage(timer, "template"):
+            code, flags = template_filter.remove_template_lines(code, lang)
+        filtered = code
 
-    # 1. CLEANING (language-aware)
-    clean1 = clean_code(code1, lang=lang1)
-    clean2 = clean_code(code2, lang=lang2)
+    with _stage(timer, "clean"):
+        cleaned = clean_code(code, lang=lang)
+    with _stage(timer, "tokenize"):
+        raw_tokens = tokenize_code(cleaned, lang=lang)
 
-    # 2. TOKENIZATION + IDENTIFIER NORMALIZATION
-    tokens1 = normalize_identifiers(tokenize_code(clean1, lang=lang1), lang=lang1)
-    tokens2 = normalize_identifiers(tokenize_code(clean2, lang=lang2), lang=lang2)
+    masked = 0
+    if template_filter is not None:
+        with _stage(timer, "template"):
+            kept = template_filter.mask_template_tokens(raw_tokens)
+        masked = len(raw_tokens) - len(kept)
+        raw_tokens = kept
 
-    # 3. TOKEN-BASED SCORES
-    w_score = winnowing_similarity(tokens1, tokens2)
-    l_score = lcs_similarity(tokens1, tokens2)
+    with _stage(timer, "normalize"):
+        return normalize_identifiers(raw_tokens, lang=lang), flags, masked, filtered
 
-    # 4. AST SCORE — only valid for same-language comparisons
-    if lang1.lower() == lang2.lower():
-        try:
-            a_score = ast_similarity(code1, code2, lang1.lower())
-        except Exception as e:
-            logger.warning("AST calculation failed for lang=%s: %s", lang1, e)
-            a_score = 0.0
-    else:
-        # Cross-language: AST is structurally incompatible
-        a_score = None
 
-    # 5. AGGREGATION
-    final_score = aggregate_code_score(w_score, l_score, a_score)
+def bytecode_similarity(code1: str, code2: str):
+    """
+    Winnowing and LCS over compiled opcode streams, averaged.
+    Returns None if either file doesn't compile.
+    """
+    ops1 = bytecode_opcodes(code1)
+    ops2 = bytecode_opcodes(code2)
+    if ops1 is None or ops2 is None:
+        return None
+    return (winnowing_similarity(ops1, ops2) + lcs_similarity(ops1, ops2)) / 2
+
 
+def prepare_code(code: str, lang: str, template_filter=None, timer=None) -> dict:
+    """
+    Per-file preparation shared by every metric: the raw code, its language
+    (canonical name, so 'py' and 'python' compare equal), the normalized
+    token stream (after template exclusion, if any) and, with a template
+    filter, the code with template lines blanked ("filtered_code").
+    timer (Phase3 StageTimer) records the template / clean / tokenize /
+    normalize stages.
+    """
+    tokens, flags, masked, filtered = _prepare_tokens(code, lang, template_filter, timer)
     return {
+        "code":            code,
+        "lang":            resolve_language(lang),
+        "tokens":          tokens,
+        "template_flags":  flags,
+        "template_masked": masked,
+        "filtered_code":   filtered,
+    }
+
+
+# -------------------------------------------------------------------------
+# METRIC STEPS
+# -------------------------------------------------------------------------
+# Each takes the two prepared files and reads only the fields it needs, so
+# the steps are independent and can run in any order or process.
+
+def winnowing_metric(prep1: dict, prep2: dict) -> float:
+    return winnowing_similarity(prep1["tokens"], prep2["tokens"])
+
+
+def lcs_metric(prep1: dict, prep2: dict) -> tuple:
+    """(score, plan): plan says which LCS variant ran and if it is approximate."""
+    return lcs_similarity_planned(prep1["tokens"], prep2["tokens"])
+
+
+def ast_metric(prep1: dict, prep2: dict) -> tuple:
+    """
+    (score, plan) like lcs_metric. Only valid for same-language comparisons:
+    (None, None) across languages, and when a file has no structure to
+    compare (see ast_similarity).
+    Deliberately sees the unfiltered code: blanking template lines leaves
+    bodies without their headers, which no longer parse. Starter functions
+    are excluded at function level instead (function_matches_metric).
+    """
+    if prep1["lang"] != prep2["lang"]:
+        # Cross-language: AST is structurally incompatible
+        return None, None
+    try:
+        return ast_similarity_planned(prep1["code"], prep2["code"], prep1["lang"])
+    except Exception as e:
+        logger.warning("AST calculation failed for lang=%s: %s", prep1["lang"], e)
+        return 0.0, None
+
+
+def bytecode_metric(prep1: dict, prep2: dict):
+    """
+    Python pairs only, reported alongside, not aggregated. Unfiltered code,
+    like ast_metric: a file with blanked template lines may not compile.
+    """
+    if prep1["lang"] == "python" and prep2["lang"] == "python":
+        return bytecode_similarity(prep1["code"], prep2["code"])
+    return None
+
+
+def semantic_metric(prep1: dict, prep2: dict) -> tuple:
+    """
+    (score, stats); (None, None) if the model is missing or fails.
+    Embeds the code without its template lines, when a filter was given.
+    """
+    code1 = prep1["code"] if prep1["filtered_code"] is None else prep1["filtered_code"]
+    code2 = prep2["code"] if prep2["filtered_code"] is None else prep2["filtered_code"]
+    try:
+        return semantic_similarity(code1, code2)
+    except Exception as e:
+        logger.warning("Semantic similarity failed: %s", e)
+        return None, None
+
+
+def function_matches_metric(prep1: dict, prep2: dict) -> list:
+    """Function-level matches, reported alongside, not aggregated."""
+    function_matches = compare_functions(prep1["code"], prep2["code"], prep1["lang"], prep2["lang"])
+    flags1, flags2 = prep1["template_flags"], prep2["template_flags"]
+    if flags1 is not None and flags2 is not None:
+        # Both students kept the same starter function: not a finding
+        function_matches = [
+            m for m in function_matches
+            if not (is_template_region(flags1, *m["file_a_region"])
+                    and is_template_region(flags2, *m["file_b_region"]))
+        ]
+    return function_matches
+
+
+def build_code_result(metrics: dict, prep1: dict, prep2: dict) -> dict:
+    """
+    Aggregates the metric outputs into the compare_code result.
+    metrics: {"winnowing", "lcs" and "ast" as (score, plan) tuples, "bytecode",
+    "function_matches", and optionally "semantic" as a (score, stats) tuple}.
+    """
+    w_score = metrics["winnowing"]
+    l_score, l_plan = metrics["lcs"]
+    a_score, a_plan = metrics["ast"]
+    b_score = metrics["bytecode"]
+    s_score, s_stats = metrics.get("semantic") or (None, None)
+
+    final_score = aggregate_code_score(w_score, l_score, a_score, s_score)
+
+    result = {
         "winnowing":            round(w_score, 4),
         "lcs":                  round(l_score, 4),
         "ast":                  None if a_score is None else round(a_score, 4),
-        "final_code_similarity": final_score
-    }
\ No newline at end of file
+        "semantic":             None if s_score is None else round(s_score, 4),
+        "bytecode":             None if b_score is None else round(b_score, 4),
+        "final_code_similarity": final_score,
+        "function_matches":     metrics["function_matches"],
+        # Which size-dependent variant each sequence metric used (sequence_planner)
+        "algorithm_plan":       {"lcs": l_plan}
+    }
+    if a_plan is not None:
+        result["algorithm_plan"]["ast"] = a_plan
+    if s_stats is not None:
+        result["semantic_stats"] = s_stats
+
+    flags1, flags2 = prep1["template_flags"], prep2["template_flags"]
+    if flags1 is not None and flags2 is not None:
+        result["template_excluded"] = {
+            "lines":  [sum(f is True for f in flags1), sum(f is True for f in flags2)],
+            "tokens": [prep1["template_masked"], prep2["template_masked"]],
+        }
+
+    return result
+
+
+def compare_code(
+    code1: str,
+    code2: str,
+    lang1: str,
+    lang2: str,
+    use_semantic: bool = False,
+    template_filter=None,
+    timer=None
+) -> dict:
+    """
+    Full pipeline: clean → tokenize → normalize → score → aggregate.
+    lang1 and lang2 are lexer_registry languages ('python', 'java', 'cpp',
+    'c', 'javascript', 'typescript', 'csharp', 'go', 'ruby').
+    use_semantic enables the embedding metric (model is loaded lazily, once per process).
+    template_filter (TemplateFilter) removes instructor starter code before
+    the token-based and semantic scores, so shared scaffolding doesn't
+    inflate them; AST and bytecode parse the whole file (see ast_metric).
+    timer (Phase3 StageTimer) records per-stage time when given.
+    """
+
+    # 1-2. CLEANING + TOKENIZATION + IDENTIFIER NORMALIZATION (language-aware)
+    prep1 = prepare_code(code1, lang1, template_filter, timer)
+    prep2 = prepare_code(code2, lang2, template_filter, timer)
+
+    # 3-7. METRICS (serial here; Phase3's stage executor can parallelise them)
+    steps = [
+        ("winnowing",        winnowing_metric),
+        ("lcs",              lcs_metric),
+        ("ast",              ast_metric),
+        ("bytecode",         bytecode_metric),
+        ("function_matches", function_matches_metric),
+    ]
+    if use_semantic:
+        steps.append(("semantic", semantic_metric))
+
+    metrics = {}
+    for name, step in steps:
+        with _stage(timer, name):
+            metrics[name] = step(prep1, prep2)
+
+    # 8. AGGREGATION
+    with _stage(timer, "aggregate"):
+        return build_code_result(metrics, prep1, prep2)
@@ -1,29 +1,59 @@
+# Same-language pairs
+SAME_LANGUAGE_WEIGHTS = {
+    "winnowing": 0.4,   # strongest signal (copied fragments)
+    "lcs": 0.3,         # structural similarity
+    "ast": 0.3,         # logic similarity
+}
+
+# Cross-language pairs: AST is unreliable across languages,
+# rely more on LCS (algorithmic similarity)
+CROSS_LANGUAGE_WEIGHTS = {"lcs": 0.8, "winnowing": 0.2}
+
+# Optional embedding metric, blended on top of either
+SEMANTIC_WEIGHT = 0.2
+
+
 def aggregate_code_score(
     winnowing_score,
     lcs_score,
-    ast_score
+    ast_score,
+    semantic_score=None
 ):
     """
     Weighted aggregation of code plagiarism scores
     AST may be None for cross-language comparisons.
+    semantic_score is None unless the optional embedding metric ran.
     """
 
     # ---------- Cross-language case ----------
     if ast_score is None:
-        # AST is unreliable across languages
-        # Rely more on LCS (algorithmic similarity)
-        return round(0.8 * lcs_score + 0.2 * winnowing_score, 4)
-    
+        w = CROSS_LANGUAGE_WEIGHTS
+        final_score = w["lcs"] * lcs_score + w["winnowing"] * winnowing_score
 
     # ---------- Same-language case ----------
-    w_winnowing = 0.4   # strongest signal (copied fragments)
-    w_lcs = 0.3         # structural similarity
-    w_ast = 0.3         # logic similarity
+    else:
+        w = SAME_LANGUAGE_WEIGHTS
+        final_score = (
+            w["winnowing"] * winnowing_score +
+            w["lcs"] * lcs_score +
+            w["ast"] * ast_score
+        )
 
-    final_score = (
-        w_winnowing * winnowing_score +
-        w_lcs * lcs_score +
-        w_ast * ast_score
-    )
+    # ---------- Optional semantic signal ----------
+    # Blended on top so scores are unchanged when the metric is disabled
+    if semantic_score is not None:
+        final_score = (1 - SEMANTIC_WEIGHT) * final_score + SEMANTIC_WEIGHT * semantic_score
 
     return round(final_score, 4)
+
+
+def code_score_weights(same_language: bool, use_semantic: bool = False) -> dict:
+    """
+    Effective weight of each metric in aggregate_code_score, e.g. to
+    re-weight a result over the subset of metrics that are available.
+    """
+    weights = dict(SAME_LANGUAGE_WEIGHTS if same_language else CROSS_LANGUAGE_WEIGHTS)
+    if use_semantic:
+        weights = {name: (1 - SEMANTIC_WEIGHT) * w for name, w in weights.items()}
+        weights["semantic"] = SEMANTIC_WEIGHT
+    return weights
@@ -24,3 +24,8 @@ for i in range(10):
 print("Same Logic:", ast_similarity(code1, code2))       # Expect high
 print("Different Operation:", ast_similarity(code1, code3))  # Medium
 print("Different Structure:", ast_similarity(code1, code4))  # Low
+
+java1 = "class A { int add(int a, int b) { return a + b; } }"
+java2 = "class B { int sum(int x, int y) { int r = x + y; return r; } }"
+print("Java Same Logic:", ast_similarity(java1, java2, "java"))  # Brace structure, renamed
+print("Syntax Error:", ast_similarity(code1, "def add(:", "python"))  # Expect None
@@ -0,0 +1,48 @@
+import time
+
+from code_preprocess.bytecode import bytecode_opcodes
+from code_preprocess.clean_code import clean_code
+from code_preprocess.code_tokenizer import tokenize_code, normalize_identifiers
+from algorithms.rabin_karp import similarity_score
+from algorithms.code_lcs import lcs_similarity
+
+original = """
+def average(values):
+    total = 0
+    for v in values:
+        total += v
+    return total / len(values)
+"""
+
+# Renamed, reformatted, commented, augmented assignment spelled out
+disguised = '''
+def   mean( xs ):   # compute the mean
+    """Docstring added to look different."""
+    acc = 0
+    for   item   in xs:
+        acc = acc + item
+    return acc / len( xs )
+'''
+
+ops1 = bytecode_opcodes(original)
+ops2 = bytecode_opcodes(disguised)
+print("OPCODES:", ops1)
+print("WINNOWING:", similarity_score(ops1, ops2))
+print("LCS:", lcs_similarity(ops1, ops2))
+print("BROKEN SOURCE:", bytecode_opcodes("def f(:\n    pass"))  # Expect None
+
+# ---------- Benchmark: bytecode extraction vs regex tokenizer path ----------
+source = original * 2000    # ~200 KB
+runs = 5
+
+start = time.perf_counter()
+for _ in range(runs):
+    bytecode_opcodes(source)
+bytecode_ms = (time.perf_counter() - start) * 1000 / runs
+
+start = time.perf_counter()
+for _ in range(runs):
+    normalize_identifiers(tokenize_code(clean_code(source, lang="python"), lang="python"), lang="python")
+regex_ms = (time.perf_counter() - start) * 1000 / runs
+
+print(f"BYTECODE PATH: {bytecode_ms:.1f} ms | REGEX TOKENIZER PATH: {regex_ms:.1f} ms ({len(source)} chars)")
@@ -0,0 +1,67 @@
+from algorithms.characteristic_vectors import extract_subtrees, find_clone_pairs
+
+# Same loop structure with renamed variables and a reordered helper call
+py1 = """
+def report(rows):
+    total = 0
+    for row in rows:
+        if row["qty"] > 0 and row["price"] > 0:
+            total += row["qty"] * row["price"]
+        else:
+            print("skipping", row)
+    return round(total, 2)
+"""
+
+py2 = """
+import math
+
+def unrelated(a, b):
+    return math.hypot(a, b)
+
+def summarize(items):
+    acc = 0
+    for it in items:
+        if it["qty"] > 0 and it["price"] > 0:
+            acc += it["qty"] * it["price"]
+        else:
+            print("bad item", it)
+    return round(acc, 2)
+"""
+
+py3 = """
+class Stack:
+    def __init__(self):
+        self.items = []
+
+    def push(self, x):
+        self.items.append(x)
+"""
+
+cpp1 = """
+int count_positive(const std::vector<int>& v) {
+    int n = 0;
+    for (int i = 0; i < v.size(); i++) {
+        if (v[i] > 0) { n = n + 1; }
+    }
+    return n;
+}
+"""
+
+cpp2 = """
+// renamed copy
+int positives(const std::vector<int>& data) {
+    int c = 0;
+    for (int k = 0; k < data.size(); k++) {
+        if (data[k] > 0) { c = c + 1; }
+    }
+    return c;
+}
+"""
+
+print("PY SUBTREES:", [(s["start_line"], s["end_line"]) for s in extract_subtrees(py1, "python")["subtrees"]])
+print("CPP SUBTREES:", [(s["start_line"], s["end_line"]) for s in extract_subtrees(cpp1, "cpp", min_nodes=10)["subtrees"]])
+
+docs = {"a.py": (py1, "python"), "b.py": (py2, "python"), "c.py": (py3, "python"),
+        "a.cpp": (cpp1, "cpp"), "b.cpp": (cpp2, "cpp")}
+for pair in find_clone_pairs(docs):
+    print("CLONE:", pair)  # Expect a.py <-> b.py (report/summarize) and a.cpp <-> b.cpp
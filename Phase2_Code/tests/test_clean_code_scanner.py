@@ -0,0 +1,31 @@
+import time
+
+from code_preprocess.clean_code import strip_comments, clean_code
+
+# ---------- Correctness: comment markers inside literals survive ----------
+py = 'url = "http://x.org/#top"  # real comment\n"""doc\nstring"""\nx = 1\n'
+java = 'String s = "// not a comment"; /* block\n comment */ char c = \'"\'; // tail\n'
+cpp = 'auto r = R"(/* raw */)"; // tail\n#include <vector>\n'
+cs = 'var dir = @"C:\\dir\\"; // tail\nvar q = @"say ""//hi"""; /* block */\n'
+
+print("PYTHON:", repr(strip_comments(py, "python")))   # Expect '#top' kept, 3 newlines before x
+print("JAVA:", repr(strip_comments(java, "java")))     # Expect string and char kept, 1 newline kept
+print("CPP:", repr(strip_comments(cpp, "cpp")))        # Expect raw string and #include kept
+print("C#:", repr(strip_comments(cs, "csharp")))       # Expect both verbatim strings kept, both comments gone
+print("CLEANED:", clean_code(py, lang="python"))
+
+# ---------- Benchmark: 1 MB adversarial inputs ----------
+MB = 1024 * 1024
+cases = {
+    "unterminated docstring": ("python", '"""' + "x = 1\n" * (MB // 6)),
+    "unterminated block":     ("java", "/*" + "int a;\n" * (MB // 7)),
+    "dense string literals":  ("python", "s = 'a#b' + \"c#d\"  # e\n" * (MB // 24)),
+    "dense // in strings":    ("cpp", 'f("//", \'/\'); // c\n' * (MB // 20)),
+    "escaped quotes":         ("java", '"' + '\\"' * (MB // 2)),
+}
+
+for name, (lang, code) in cases.items():
+    start = time.perf_counter()
+    strip_comments(code, lang)
+    ms = (time.perf_counter() - start) * 1000
+    print(f"{name:24s} {lang:6s} {len(code) / MB:.2f} MB  {ms:7.1f} ms")
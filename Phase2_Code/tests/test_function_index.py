@@ -0,0 +1,67 @@
+from algorithms.function_index import split_functions, compare_functions
+
+# Original project with one function copied from elsewhere
+java1 = """
+public class Report {
+    public static int total(int[] values) {
+        int acc = 0;
+        for (int i = 0; i < values.length; i++) { acc += values[i]; }
+        if (acc > 100) { return 100; }
+        return acc;
+    }
+    public void print(String title) {
+        System.out.println("== " + title + " ==");
+        System.out.println(total(new int[] {1, 2, 3}));
+    }
+}
+"""
+
+# Copied function, renamed, with a throws clause added
+java2 = """
+class Stats {
+    static int sum(int[] arr) throws Exception {
+        int s = 0;
+        for (int k = 0; k < arr.length; k++) { s += arr[k]; }
+        if (s > 100) { return 100; }
+        return s;
+    }
+}
+"""
+
+py1 = """
+def mean(xs):
+    total = 0
+    for x in xs:
+        total += x
+    return total / len(xs)
+"""
+
+py2 = """
+class Helper:
+    def average(self, values):
+        s = 0
+        for v in values:
+            s += v
+        return s / len(values)
+"""
+
+print("JAVA UNITS:", [(u["name"], u["start_line"], u["end_line"]) for u in split_functions(java1, "java")])
+print("JAVA MATCHES:", compare_functions(java1, java2, "java", "java"))  # Expect total <-> sum
+print("PYTHON MATCHES:", compare_functions(py1, py2, "python", "python"))  # Expect mean <-> average
+
+# Annotated class: the annotation's parentheses are not a function header
+java3 = """
+@SuppressWarnings("unchecked")
+public class Totals {
+    @Override
+    public int total(int[] values) {
+        int acc = 0;
+        for (int i = 0; i < values.length; i++) { acc += values[i]; }
+        if (acc > 100) { return 100; }
+        return acc;
+    }
+}
+"""
+units = [(u["name"], u["start_line"], u["end_line"]) for u in split_functions(java3, "java")]
+print("ANNOTATED CLASS UNITS:", units)  # Expect only total, lines 5-10
+assert units == [("total", 5, 10)]
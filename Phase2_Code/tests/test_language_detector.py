@@ -0,0 +1,39 @@
+from utils.language_detector import detect_language, detect_language_with_confidence
+
+java = "public class A { public static void main(String[] args) { System.out.println(1); } }"
+cpp = "#include <iostream>\nusing namespace std;\nint main() { std::cout << 1; }"
+ambiguous = "x = 1\ny = x + 2\n"
+
+print("JAVA:", detect_language_with_confidence(java))            # Expect ('java', high)
+print("CPP:", detect_language_with_confidence(cpp))              # Expect ('cpp', high)
+print("AMBIGUOUS:", detect_language_with_confidence(ambiguous))  # Expect ('python', 0.0)
+print("AMBIGUOUS + .java NAME:", detect_language(ambiguous, "Main.java"))  # Expect java
+print("CONFIDENT + .py NAME:", detect_language(cpp, "main.py"))             # Expect cpp
+
+# Only the head and tail of a big file are scanned
+big = cpp + "\n" + "// filler line\n" * 100000
+print("BIG FILE:", detect_language_with_confidence(big))
+
+# A Java main is not a C++ signal ("void main" used to match inside it)
+program = "public class Main {\n    public static void main(String[] args) {\n        System.out.println(1);\n    }\n}\n"
+print("JAVA MAIN:", detect_language_with_confidence(program))  # Expect ('java', 0.75)
+
+# Signals repeated all over the file count once each
+head = java + "\n" + "String s = Integer.toString(1); // ArrayList HashMap\n" * 200
+print("REPEATED SIGNALS:", detect_language_with_confidence(head))  # Expect ('java', 0.875)
+
+# ---------- Benchmark: submission-sized files ----------
+import time
+
+py_line = "def f(self, x):\n    return len(str(x)) + 1  # helper\n"
+cases = {
+    "8 KB python":     py_line * (8192 // len(py_line)),
+    "16 KB python":    py_line * (16384 // len(py_line)),
+    "16 KB ambiguous": "x = y + 1\n" * (16384 // 10),
+    "1 MB java":       program * (1024 * 1024 // len(program)),
+}
+for name, code in cases.items():
+    start = time.perf_counter()
+    for _ in range(100):
+        detect_language_with_confidence(code)
+    print(f"{name:16s} {(time.perf_counter() - start) * 10000:7.1f} us")
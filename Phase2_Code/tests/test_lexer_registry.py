@@ -0,0 +1,20 @@
+from code_preprocess.lexer_registry import LEXERS, language_for_extension, resolve_language
+from code_preprocess.clean_code import clean_code
+from code_preprocess.code_tokenizer import tokenize_code, normalize_identifiers
+
+samples = {
+    "c":          'int main() { printf("%d // x", a && b); /* note */ return 0; }',
+    "javascript": "const f = (a) => a ?? `tmpl // ${a}`; // arrow",
+    "typescript": "let n: number = x?.y ?? 0; // optional chaining",
+    "csharp":     'Console.WriteLine(list.Count >= 2 ? "ok" : "no"); // ternary',
+    "go":         "x := <-ch // receive\nfmt.Println(`raw // text`)",
+    "ruby":       "=begin\ndoc\n=end\nputs x <=> y # spaceship",
+}
+
+for lang, code in samples.items():
+    tokens = tokenize_code(clean_code(code, lang=lang), lang=lang)
+    print(f"{lang.upper()}:", normalize_identifiers(tokens, lang=lang))
+
+print("EXTENSIONS:", [language_for_extension(e) for e in (".c", ".js", ".ts", ".cs", ".go", ".rb", ".txt")])
+print("ALIASES:", [resolve_language(a) for a in ("py", "c#", "JS", "unknown")])  # unknown -> python
+print("REGISTERED:", sorted(LEXERS))
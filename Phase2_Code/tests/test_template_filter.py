@@ -0,0 +1,46 @@
+from algorithms.template_filter import TemplateFilter
+from code_preprocess.code_tokenizer import tokenize_code
+
+# Starter code handed out with the assignment
+template = """
+import sys
+
+def read_grid(path):
+    with open(path) as f:
+        return [list(map(int, line.split())) for line in f]
+"""
+
+submission = template + """
+def solve(grid):
+    best = 0
+    for row in grid:
+        best = max(best, sum(row))
+    return best
+"""
+
+tf = TemplateFilter.from_sources([(template, "python")])
+restored = TemplateFilter.from_bytes(tf.to_bytes())
+
+code, flags = restored.remove_template_lines(submission, "python")
+tokens = tokenize_code(submission, "python")
+
+print("ARTEFACT BYTES:", len(tf.to_bytes()))
+print("TEMPLATE LINES REMOVED:", sum(f is True for f in flags))  # Expect 4
+print("TOKENS BEFORE MASK:", len(tokens))
+print("TOKENS AFTER MASK:", len(restored.mask_template_tokens(tokens)))  # Expect only solve() left
+
+# Semantic embeds the filtered code; AST and bytecode deliberately parse the whole file
+import engine.code_similarity_engine as engine
+
+prep = engine.prepare_code(submission, "python", restored)
+print("FILTERED CODE KEEPS TEMPLATE:", "read_grid" in prep["filtered_code"])  # Expect False
+print("BYTECODE ON WHOLE FILE:", engine.bytecode_metric(prep, prep))  # Expect 1.0
+
+seen = []
+engine.ast_similarity_planned = lambda code1, code2, lang: (seen.extend([code1, code2]), (1.0, None))[1]
+engine.semantic_similarity = lambda code1, code2: (seen.extend([code1, code2]), (None, None))[1]
+engine.ast_metric(prep, prep)
+print("AST SEES TEMPLATE:", all("read_grid" in code for code in seen))  # Expect True
+seen.clear()
+engine.semantic_metric(prep, prep)
+print("SEMANTIC SEES TEMPLATE:", any("read_grid" in code for code in seen))  # Expect False
@@ -1,49 +1,72 @@
-def detect_language(code: str) -> str:
+import os
+
+from Phase2_Code.code_preprocess.lexer_registry import language_for_extension
+
+# ---- Python indicators (case-insensitive) ----
+PYTHON_SIGNALS = [
+    "def ", "import ", "self", "elif ", "pass",
+    "print(", "range(", "__init__", "str(", "len(", "yield "
+]
+
+# ---- C++ indicators (case-insensitive) ----
+CPP_SIGNALS = [
+    "#include", "std::", "using namespace", "->", "::",
+    "cout", "cin", "nullptr", "template",
+    "auto ", "vector<", "struct ", "virtual",
+    "int main"
+]
+
+# ---- Java indicators ----
+# Checked against original code (case-sensitive) because Java relies
+# on capitalisation to distinguish types e.g. String vs string,
+# Integer vs integer, System vs system.
+JAVA_SIGNALS = [
+    "public class", "public int", "static void main", "System.out",
+    "Math.", ".charAt", "implements", "extends", "package ", "throws ",
+    "String ", "boolean ", "ArrayList", "HashMap", "List<",
+    "@Override", "Integer", "interface "
+]
+
+# Language signals live in imports, headers and class declarations at the
+# top, and in main() at the bottom: scanning only the two ends of a big
+# file keeps detection cost bounded.
+SAMPLE_HEAD = 8192
+SAMPLE_TAIL = 8192
+
+DETECTABLE_LANGUAGES = ("python", "cpp", "java")
+
+# Below this confidence, the upload's file extension (if any) wins
+MIN_CONFIDENCE = 0.5
+
+
+def _sample(code: str) -> str:
+    if len(code) <= SAMPLE_HEAD + SAMPLE_TAIL:
+        return code
+    return code[:SAMPLE_HEAD] + "\n" + code[-SAMPLE_TAIL:]
+
+
+def _confidence(best: int, second: int) -> float:
+    return round((best - second) / (best + 1), 4)
+
+
+def detect_language_with_confidence(code: str) -> tuple:
     """
     Heuristic-based language detection for Python, C++, Java.
-    All signal matching is case-insensitive EXCEPT Java-specific
-    signals that rely on capitalisation (e.g. 'String' vs 'string',
-    'System.out', '@Override') — those are checked against the
-    original code to avoid false positives.
-    Returns: 'python', 'cpp', or 'java'
+    Each distinct signal counts once; Python and C++ signals match
+    case-insensitively, Java signals case-sensitively (against the
+    original text).
+    Returns (language, confidence) with confidence in [0, 1): 0 when no
+    signal matched (language defaults to 'python') or on a tie.
     """
-    code_lower = code.lower()
-
-    # ---- Python indicators (case-insensitive) ----
-    python_signals = [
-        "def ", "import ", "self", "elif ", "pass",
-        "print(", "range(", "__init__", "str(", "len(", "yield "
-    ]
-
-    # ---- C++ indicators (case-insensitive) ----
-    cpp_signals = [
-        "#include", "std::", "using namespace", "->", "::",
-        "cout", "cin", "nullptr", "template",
-        "auto ", "vector<", "struct ", "virtual",
-        "int main", "void main"
-    ]
-
-    # ---- Java indicators ----
-    # Checked against original code (case-sensitive) because Java relies
-    # on capitalisation to distinguish types e.g. String vs string,
-    # Integer vs integer, System vs system.
-    java_signals = [
-        "public class", "public int", "static void main", "System.out",
-        "Math.", ".charAt", "implements", "extends", "package ", "throws ",
-        "String ", "boolean ", "ArrayList", "HashMap", "List<",
-        "@Override", "Integer", "interface "
-    ]
-
-    # Python and C++ scored on lowercased code for robustness
-    python_score = sum(1 for s in python_signals if s in code_lower)
-    cpp_score    = sum(1 for s in cpp_signals    if s in code_lower)
-    # Java scored on original code to preserve case-sensitive signals
-    java_score   = sum(1 for s in java_signals   if s in code)
+    # One C-level substring search per signal over the sample: faster on
+    # submission-sized files than any single pass driven from Python
+    sample = _sample(code)
+    lowered = sample.lower()
 
     scores = {
-        "python": python_score,
-        "cpp":    cpp_score,
-        "java":   java_score
+        "python": sum(1 for s in PYTHON_SIGNALS if s in lowered),
+        "cpp":    sum(1 for s in CPP_SIGNALS    if s in lowered),
+        "java":   sum(1 for s in JAVA_SIGNALS   if s in sample),
     }
 
     # Pick the language with the highest signal count
@@ -51,6 +74,34 @@ def detect_language(code: str) -> str:
 
     # Fallback: if no signals matched at all, default to python
     if scores[detected] == 0:
-        return "python"
+        return "python", 0.0
+
+    second = max(v for lang, v in scores.items() if lang != detected)
+    return detected, _confidence(scores[detected], second)
+
+
+def language_from_filename(filename: str):
+    """Maps an uploaded filename's extension to a language, or None."""
+    if not filename:
+        return None
+    return language_for_extension(os.path.splitext(filename)[1])
+
+
+def detect_language(code: str, filename: str = None) -> str:
+    """
+    Returns: 'python', 'cpp', or 'java' from content alone.
+    When the content is ambiguous (confidence below MIN_CONFIDENCE) and a
+    filename with a known extension is given, the extension decides.
+    Extensions of languages without content signals (c, go, ruby, ... in
+    lexer_registry) always decide.
+    """
+    by_extension = language_from_filename(filename)
+    # Content signals only know python / cpp / java: for anything else the
+    # extension is the only evidence there is
+    if by_extension is not None and by_extension not in DETECTABLE_LANGUAGES:
+        return by_extension
 
-    return detected
\ No newline at end of file
+    detected, confidence = detect_language_with_confidence(code)
+    if confidence < MIN_CONFIDENCE:
+        return by_extension or detected
+    return detected
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+
+from Phase3_Unified.engine.result_cache import ALGORITHM_VERSION, mirror_result
+
+# One SQLite file holds the whole cache:
+#   files     path -> (mtime_ns, size, sha256): a file whose stat is unchanged
+#             is not read again
+#   prepared  (sha256, mode, extension, version) -> pickled prepared document
+#   pair_results  (document key, document key, mode, semantic, version) ->
+#             analysis result (JSON), in canonical pair order. A document key
+#             is content hash plus extension: the extension picks the language
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    sha256   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prepared (
+    sha256    TEXT NOT NULL,
+    mode      TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    version   TEXT NOT NULL,
+    data      BLOB NOT NULL,
+    PRIMARY KEY (sha256, mode, extension, version)
+);
+CREATE TABLE IF NOT EXISTS pair_results (
+    first    TEXT NOT NULL,
+    second   TEXT NOT NULL,
+    mode     TEXT NOT NULL,
+    semantic INTEGER NOT NULL,
+    version  TEXT NOT NULL,
+    result   TEXT NOT NULL,
+    PRIMARY KEY (first, second, mode, semantic, version)
+);
+CREATE INDEX IF NOT EXISTS pair_results_second ON pair_results (second);
+DROP TABLE IF EXISTS results;
+"""
+
+
+class ArtefactStore:
+    """
+    On-disk cache of per-file prepared documents and per-pair results for
+    incremental batch runs. Everything is keyed by content hash and
+    extension (plus ALGORITHM_VERSION), so renamed files hit, edited files
+    miss, and a new engine version never reuses old artefacts.
+
+    Prepared documents are pickled: the cache file is trusted local state,
+    like a build directory — never load one from elsewhere.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    # ---------- Files ----------
+    def file_digest(self, path: str) -> tuple:
+        """
+        (sha256, changed) for one file. The file is only read when its
+        mtime or size differs from the last run; changed is True when its
+        content hash is new for this path.
+        """
+        st = os.stat(path)
+        row = self.conn.execute(
+            "SELECT mtime_ns, size, sha256 FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None and row[0] == st.st_mtime_ns and row[1] == st.st_size:
+            return row[2], False
+
+        with open(path, "rb") as f:
+            sha = hashlib.sha256(f.read()).hexdigest()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+            (path, st.st_mtime_ns, st.st_size, sha)
+        )
+        return sha, row is None or row[2] != sha
+
+    # ---------- Prepared documents ----------
+    def get_prepared(self, sha: str, mode: str, extension: str):
+        row = self.conn.execute(
+            "SELECT data FROM prepared WHERE sha256 = ? AND mode = ? AND extension = ? AND version = ?",
+            (sha, mode, extension, ALGORITHM_VERSION)
+        ).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def put_prepared(self, sha: str, mode: str, extension: str, prepared: dict) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO prepared (sha256, mode, extension, version, data) VALUES (?, ?, ?, ?, ?)",
+            (sha, mode, extension, ALGORITHM_VERSION, pickle.dumps(prepared, pickle.HIGHEST_PROTOCOL))
+        )
+
+    # ---------- Pair results ----------
+    @staticmethod
+    def document_key(sha: str, extension: str) -> str:
+        """One file's content as analysed: the same bytes as .c and .cpp differ."""
+        return f"{sha}{extension}"
+
+    @staticmethod
+    def pair_key(doc_a: str, doc_b: str) -> tuple:
+        """(first, second, swapped): one entry per unordered pair, as in result_cache."""
+        swapped = doc_a > doc_b
+        return (doc_b, doc_a, True) if swapped else (doc_a, doc_b, False)
+
+    def get_result(self, doc_a: str, doc_b: str, mode: str, use_semantic: bool):
+        first, second, swapped = self.pair_key(doc_a, doc_b)
+        row = self.conn.execute(
+            "SELECT result FROM pair_results WHERE first = ? AND second = ? AND mode = ? "
+            "AND semantic = ? AND version = ?",
+            (first, second, mode, bool(use_semantic), ALGORITHM_VERSION)
+        ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        return mirror_result(result) if swapped else result
+
+    def put_result(self, doc_a: str, doc_b: str, mode: str, use_semantic: bool, result: dict) -> None:
+        first, second, swapped = self.pair_key(doc_a, doc_b)
+        stored = mirror_result(result) if swapped else result
+        stored = {k: v for k, v in stored.items() if k not in ("doc_a", "doc_b", "timings", "cache")}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pair_results (first, second, mode, semantic, version, result) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (first, second, mode, bool(use_semantic), ALGORITHM_VERSION, json.dumps(stored))
+        )
+
+    def iter_results(self, doc_keys, mode: str, use_semantic: bool):
+        """
+        (first, second, result) for every cached pair of the given document
+        keys, in canonical order, from one query instead of a lookup per pair.
+        """
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_documents (key TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM current_documents")
+        self.conn.executemany("INSERT INTO current_documents (key) VALUES (?)", ((k,) for k in doc_keys))
+        rows = self.conn.execute(
+            "SELECT first, second, result FROM pair_results "
+            "WHERE mode = ? AND semantic = ? AND version = ? "
+            "AND first IN (SELECT key FROM current_documents) "
+            "AND second IN (SELECT key FROM current_documents)",
+            (mode, bool(use_semantic), ALGORITHM_VERSION)
+        )
+        for first, second, result in rows:
+            yield first, second, json.loads(result)
+
+    def partners(self, doc_key: str, mode: str, use_semantic: bool) -> set:
+        """Document keys with a cached result paired with doc_key."""
+        params = (doc_key, mode, bool(use_semantic), ALGORITHM_VERSION)
+        rows = self.conn.execute(
+            "SELECT second FROM pair_results WHERE first = ? AND mode = ? AND semantic = ? AND version = ? "
+            "UNION SELECT first FROM pair_results WHERE second = ? AND mode = ? AND semantic = ? AND version = ?",
+            params + params
+        )
+        return {row[0] for row in rows}
@@ -0,0 +1,216 @@
+import heapq
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from Phase1_Text.engine.text_similarity import prepare_text
+from Phase2_Code.utils.language_detector import detect_language
+from Phase2_Code.code_preprocess.lexer_registry import resolve_language
+from Phase2_Code.engine.code_similarity_engine import prepare_code
+from Phase3_Unified.engine.metric_registry import COST_MODEL, get_metrics
+from Phase3_Unified.engine.stage_executor import (
+    MAX_WORKERS, PARALLEL_MIN_CHARS, can_use_process_pool
+)
+from Phase3_Unified.engine.unified_analyzer import build_text_response, build_code_response
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on pairs per pool task: small enough that the expensive
+# pairs at the front of the queue spread over all workers, large enough
+# that hundreds of tiny pairs don't each pay a round trip.
+MAX_CHUNK_PAIRS = 32
+
+# Set in each batch worker by _init_batch_worker
+_worker_state = None
+
+
+def prepare_documents(documents: dict, mode: str, languages: dict = None, filenames: dict = None,
+                      template_filter=None) -> dict:
+    """
+    {doc_id: prepared document} (see prepare_text / prepare_code): every
+    document is cleaned/tokenized exactly once per batch.
+    """
+    languages = languages or {}
+    filenames = filenames or {}
+    prepared = {}
+    for doc_id, content in documents.items():
+        if mode == "text":
+            prepared[doc_id] = prepare_text(content)
+        else:
+            lang = languages.get(doc_id)
+            lang = resolve_language(lang) if lang else detect_language(content, filenames.get(doc_id))
+            prepared[doc_id] = prepare_code(content, lang, template_filter)
+    return prepared
+
+
+def _estimated_cost(prep1: dict, prep2: dict) -> int:
+    # The token LCS table dominates a comparison: n * m cells
+    return max(len(prep1["tokens"]), 1) * max(len(prep2["tokens"]), 1)
+
+
+def _chunks(pairs: list, num_workers: int) -> list:
+    size = max(1, min(MAX_CHUNK_PAIRS, len(pairs) // (num_workers * 4)))
+    return [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+
+def _run_pair(mode: str, metrics: list, prep1: dict, prep2: dict) -> dict:
+    return {metric.name: metric.func(prep1, prep2) for metric in metrics}
+
+
+def _init_batch_worker(mode: str, prepared: dict, options: dict) -> None:
+    # Prepared documents are pickled once per worker, not once per pair
+    global _worker_state
+    metrics = [m for m in get_metrics(mode, **options) if m.cost != COST_MODEL]
+    _worker_state = (mode, prepared, metrics)
+
+
+def _run_chunk(chunk: list) -> list:
+    mode, prepared, metrics = _worker_state
+    return [
+        (doc_a, doc_b, _run_pair(mode, metrics, prepared[doc_a], prepared[doc_b]))
+        for doc_a, doc_b in chunk
+    ]
+
+
+def _pool_results(chunks: list, mode: str, prepared: dict, options: dict, workers: int):
+    """
+    Yields (doc_a, doc_b, metrics) per pair as chunks complete. If the pool
+    breaks, the chunks that didn't come back are run inline.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_batch_worker,
+        initargs=(mode, prepared, options)
+    )
+    pending = {}
+    try:
+        pending = {pool.submit(_run_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(pending):
+            try:
+                chunk_results = future.result()
+            except BrokenProcessPool as e:
+                logger.warning("Batch worker pool broke, finishing inline: %s", e)
+                break
+            del pending[future]
+            yield from chunk_results
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if pending:
+        metrics = [m for m in get_metrics(mode, **options) if m.cost != COST_MODEL]
+        for chunk in pending.values():
+            for doc_a, doc_b in chunk:
+                yield doc_a, doc_b, _run_pair(mode, metrics, prepared[doc_a], prepared[doc_b])
+
+
+def _iter_results(documents: dict, pairs, mode: str, languages: dict, filenames: dict,
+                  use_semantic: bool, template_filter, workers: int, prepared: dict):
+    missing = {doc_id: content for doc_id, content in documents.items() if doc_id not in prepared}
+    prepared = {**prepared, **prepare_documents(missing, mode, languages, filenames, template_filter)}
+
+    if pairs is None:
+        pairs = itertools.combinations(documents, 2)
+    pairs = [(a, b) for a, b in pairs if a != b]
+
+    # Largest pairs first: the long tail of small pairs then fills in
+    # around them instead of one big pair finishing last on its own
+    pairs.sort(key=lambda p: _estimated_cost(prepared[p[0]], prepared[p[1]]), reverse=True)
+
+    options = {"use_semantic": use_semantic} if mode == "code" else {}
+    all_metrics   = get_metrics(mode, **options)
+    # Model metrics need the model loaded in this process: run them here
+    model_metrics = [m for m in all_metrics if m.cost == COST_MODEL]
+    pool_metrics  = [m for m in all_metrics if m.cost != COST_MODEL]
+
+    total_size = sum(len(content) for content in documents.values())
+    if workers > 1 and len(pairs) > 1 and total_size >= PARALLEL_MIN_CHARS and can_use_process_pool():
+        results = _pool_results(_chunks(pairs, workers), mode, prepared, options, workers)
+    else:
+        results = (
+            (a, b, _run_pair(mode, pool_metrics, prepared[a], prepared[b])) for a, b in pairs
+        )
+
+    for doc_a, doc_b, metrics in results:
+        prep1, prep2 = prepared[doc_a], prepared[doc_b]
+        metrics.update(_run_pair(mode, model_metrics, prep1, prep2))
+
+        if mode == "text":
+            response = build_text_response(metrics)
+        else:
+            response = build_code_response(metrics, prep1, prep2)
+        yield {"doc_a": doc_a, "doc_b": doc_b, **response}
+
+
+def top_k_per_document(results, k: int) -> list:
+    """
+    Keeps a pair if it is among the k most similar pairs of either of its
+    documents. Returned most similar first.
+    """
+    best = {}   # doc_id -> min-heap of (score, seq, result)
+    for seq, result in enumerate(results):
+        entry = (result["final_similarity"], seq, result)
+        for doc_id in (result["doc_a"], result["doc_b"]):
+            heap = best.setdefault(doc_id, [])
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    kept = {seq: (score, result) for heap in best.values() for score, seq, result in heap}
+    ordered = sorted(kept.items(), key=lambda item: (-item[1][0], item[0]))
+    return [result for _, (_, result) in ordered]
+
+
+def analyze_many(
+    documents:       dict,
+    pairs            = None,
+    mode:            str = "code",
+    languages:       dict = None,
+    filenames:       dict = None,
+    use_semantic:    bool = False,
+    template_filter  = None,
+    top_k:           int = None,
+    workers:         int = None,
+    prepared:        dict = None
+):
+    """
+    Batch version of analyze_submission for class-wide checks.
+
+    Args:
+        documents:       {doc_id: raw text or source code}
+        pairs:           Optional. Iterable of (doc_id, doc_id) to compare.
+                         If None, every unordered pair is compared.
+        mode:            'text' or 'code'
+        languages:       Optional. {doc_id: language} overrides (code mode);
+                         other documents are auto-detected.
+        filenames:       Optional. {doc_id: uploaded filename}, used by detection.
+        use_semantic:    Optional. Code mode only — adds the embedding metric.
+        template_filter: Optional. Code mode only — TemplateFilter for starter code.
+        top_k:           Optional. Keep only the k most similar pairs of each
+                         document (a pair is kept if it is in either top k).
+        workers:         Optional. Process pool size (default: stage_executor.MAX_WORKERS;
+                         1 runs everything in this process).
+        prepared:        Optional. {doc_id: prepared document} from an earlier
+                         prepare_documents call (e.g. an on-disk artefact cache);
+                         those documents are not prepared again.
+
+    Each document is prepared once. On large batches, pairs are spread over
+    a process pool in chunks, most expensive first.
+
+    Returns:
+        Generator of analyze_submission results with two extra keys, doc_a
+        and doc_b, yielded as they complete (in completion order). With
+        top_k, all pairs are scored first and the kept ones are yielded,
+        most similar first.
+    """
+    if mode not in ("text", "code"):
+        raise ValueError(f"Invalid mode '{mode}'. Must be 'text' or 'code'.")
+
+    results = _iter_results(
+        documents, pairs, mode, languages or {}, filenames or {}, use_semantic, template_filter,
+        workers or MAX_WORKERS, prepared or {}
+    )
+    if top_k is None:
+        return results
+    return iter(top_k_per_document(results, top_k))
@@ -0,0 +1,69 @@
+from Phase1_Text.engine.text_similarity import jaccard_metric, lcs_metric as text_lcs_metric, cosine_metric
+from Phase2_Code.engine.code_similarity_engine import (
+    winnowing_metric, lcs_metric as code_lcs_metric, ast_metric, bytecode_metric,
+    semantic_metric, function_matches_metric
+)
+
+# ---- Cost classes ----
+# light: cheap set/arithmetic work, always run inline
+# heavy: CPU-bound (DP tables, hashing, parsing); may go to a process pool
+# model: needs a model loaded in THIS process (embeddings); always inline
+COST_LIGHT = "light"
+COST_HEAVY = "heavy"
+COST_MODEL = "model"
+
+
+class Metric:
+    """
+    One similarity metric: func(prep1, prep2) over prepared documents.
+    inputs names the prepared fields func reads — only those are shipped
+    to a worker process. enabled(options) decides whether it runs at all.
+    """
+
+    def __init__(self, name: str, func, inputs: tuple, cost: str = COST_LIGHT, enabled=None):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.cost = cost
+        self.enabled = enabled
+
+    def select(self, prep: dict) -> dict:
+        return {key: prep[key] for key in self.inputs}
+
+    def is_enabled(self, options: dict) -> bool:
+        return self.enabled is None or bool(self.enabled(options))
+
+
+METRICS = {"text": {}, "code": {}}
+
+
+def register_metric(mode: str, metric: Metric) -> None:
+    METRICS[mode][metric.name] = metric
+
+
+def get_metric(mode: str, name: str) -> Metric:
+    return METRICS[mode][name]
+
+
+def get_metrics(mode: str, **options) -> list:
+    """Metrics to run for one comparison, given analyzer options (use_semantic, ...)."""
+    return [m for m in METRICS[mode].values() if m.is_enabled(options)]
+
+
+# ---- Text metrics (Phase 1) ----
+register_metric("text", Metric("jaccard", jaccard_metric,  ("tokens",), COST_LIGHT))
+register_metric("text", Metric("lcs",     text_lcs_metric, ("tokens",), COST_HEAVY))
+register_metric("text", Metric("cosine",  cosine_metric,   ("clean",),  COST_HEAVY))
+
+# ---- Code metrics (Phase 2) ----
+register_metric("code", Metric("winnowing", winnowing_metric, ("tokens",),        COST_HEAVY))
+register_metric("code", Metric("lcs",       code_lcs_metric,  ("tokens",),        COST_HEAVY))
+register_metric("code", Metric("ast",       ast_metric,       ("code", "lang"),   COST_HEAVY))
+register_metric("code", Metric("bytecode",  bytecode_metric,  ("code", "lang"),   COST_HEAVY))
+register_metric("code", Metric(
+    "function_matches", function_matches_metric, ("code", "lang", "template_flags"), COST_HEAVY
+))
+register_metric("code", Metric(
+    "semantic", semantic_metric, ("code", "filtered_code"), COST_MODEL,
+    enabled=lambda options: options.get("use_semantic")
+))
@@ -0,0 +1,245 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from Phase2_Code.utils.language_detector import language_from_filename
+from Phase3_Unified.engine.unified_analyzer import analyze_submission
+from Phase3_Unified.engine.stage_timer import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key (and stored on each report): bump it whenever a
+# change to preprocessing, a metric or the aggregation can change scores,
+# so results computed by older code are never served again.
+ALGORITHM_VERSION = "1.2.8"
+
+LOCAL_CACHE_SIZE = 256
+SHARED_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+# ---- Tiers ----
+
+class LocalTier:
+    """In-process LRU of result dicts; safe to share between threads."""
+
+    def __init__(self, maxsize: int = LOCAL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def set(self, key: str, result: dict) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RedisTier:
+    """
+    Shared tier across workers. client is a redis.Redis (or anything with
+    get(key) and set(key, value, ex=ttl)); results are stored as JSON.
+    Redis errors are logged and treated as misses: the cache never fails
+    an analysis.
+    """
+
+    def __init__(self, client, prefix: str = "analysis-result:", ttl: int = SHARED_CACHE_TTL_SECONDS):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning("Shared result cache read failed: %s", e)
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, result: dict) -> None:
+        try:
+            self.client.set(self.prefix + key, json.dumps(result), ex=self.ttl)
+        except Exception as e:
+            logger.warning("Shared result cache write failed: %s", e)
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.Redis (tests, local runs). TTL is ignored."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+
+# ---- Keys ----
+
+def _sha256(value) -> str:
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+def cache_key(
+    input1: str,
+    input2: str,
+    mode: str,
+    lang1_override: str = None,
+    lang2_override: str = None,
+    use_semantic: bool = False,
+    template_filter = None,
+    filename1: str = None,
+    filename2: str = None
+) -> tuple:
+    """
+    Returns (key, swapped). Each side is (content hash, language override,
+    language implied by the filename); the two sides are sorted so (a, b)
+    and (b, a) share one entry, and swapped says this call is the mirror
+    of the stored order.
+    """
+    side1 = [_sha256(input1), (lang1_override or "").lower(), language_from_filename(filename1) or ""]
+    side2 = [_sha256(input2), (lang2_override or "").lower(), language_from_filename(filename2) or ""]
+    swapped = side1 > side2
+    if swapped:
+        side1, side2 = side2, side1
+
+    template = _sha256(template_filter.to_bytes()) if template_filter is not None else ""
+    material = [ALGORITHM_VERSION, mode, bool(use_semantic), template, side1, side2]
+    return _sha256(json.dumps(material)), swapped
+
+
+def mirror_result(result: dict) -> dict:
+    """The same result seen from the other file's side (file a <-> file b)."""
+    result = copy.deepcopy(result)
+
+    langs = result.get("language", "").split("/")
+    if len(langs) == 2:
+        result["language"] = f"{langs[1]}/{langs[0]}"
+
+    if "function_matches" in result:
+        result["function_matches"] = [
+            {
+                "score":           m["score"],
+                "file_a_function": m["file_b_function"],
+                "file_a_region":   m["file_b_region"],
+                "file_b_function": m["file_a_function"],
+                "file_b_region":   m["file_a_region"],
+            }
+            for m in result["function_matches"]
+        ]
+
+    excluded = result.get("template_excluded")
+    if excluded:
+        result["template_excluded"] = {name: list(reversed(pair)) for name, pair in excluded.items()}
+
+    return result
+
+
+# ---- Cache ----
+
+class ResultCache:
+    """
+    Memoises analyze_submission: a local LRU tier in front of an optional
+    shared tier (RedisTier). Results carry a "cache" block:
+    {"hit", "tier" ('local' | 'shared' | None), "hits", "misses"} with
+    this cache's running counters.
+    """
+
+    def __init__(self, local_size: int = LOCAL_CACHE_SIZE, shared=None):
+        self.local = LocalTier(local_size)
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool) -> tuple:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return self.hits, self.misses
+
+    def _lookup(self, key: str) -> tuple:
+        result = self.local.get(key)
+        if result is not None:
+            return result, "local"
+        if self.shared is not None:
+            result = self.shared.get(key)
+            if result is not None:
+                self.local.set(key, result)
+                return result, "shared"
+        return None, None
+
+    def analyze_submission(
+        self,
+        input1: str,
+        input2: str,
+        mode: str,
+        lang1_override: str = None,
+        lang2_override: str = None,
+        use_semantic:   bool = False,
+        template_filter = None,
+        filename1:      str = None,
+        filename2:      str = None,
+        timings:        bool = False,
+        trace_memory:   bool = False,
+        prepared1:      dict = None,
+        prepared2:      dict = None,
+        completed_metrics: dict = None,
+        on_metric       = None
+    ) -> dict:
+        """
+        Same arguments and result as unified_analyzer.analyze_submission, plus
+        "cache". Prepared files and completed metrics only save work on a miss
+        (the key is the content). Timings are never cached: on a hit, the timings block only
+        has the cache_lookup stage.
+        """
+        timer = StageTimer(trace_memory) if timings else None
+        with timer.stage("cache_lookup") if timer is not None else nullcontext():
+            key, swapped = cache_key(
+                input1, input2, mode, lang1_override, lang2_override,
+                use_semantic, template_filter, filename1, filename2
+            )
+            stored, tier = self._lookup(key)
+
+        if stored is not None:
+            result = mirror_result(stored) if swapped else copy.deepcopy(stored)
+            if timer is not None:
+                result["timings"] = timer.as_dict()
+        else:
+            result = analyze_submission(
+                input1, input2, mode,
+                lang1_override=lang1_override, lang2_override=lang2_override,
+                use_semantic=use_semantic, template_filter=template_filter,
+                filename1=filename1, filename2=filename2,
+                timings=timings, trace_memory=trace_memory,
+                prepared1=prepared1, prepared2=prepared2,
+                completed_metrics=completed_metrics, on_metric=on_metric
+            )
+            # Stored in the canonical (sorted) order, without this run's timings
+            stored = mirror_result(result) if swapped else copy.deepcopy(result)
+            stored.pop("timings", None)
+            self.local.set(key, stored)
+            if self.shared is not None:
+                self.shared.set(key, stored)
+
+        hits, misses = self._count(tier is not None)
+        result["cache"] = {"hit": tier is not None, "tier": tier, "hits": hits, "misses": misses}
+        return result
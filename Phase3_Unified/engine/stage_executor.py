@@ -0,0 +1,113 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from contextlib import nullcontext
+
+from Phase3_Unified.engine.metric_registry import COST_HEAVY, get_metric
+from Phase3_Unified.engine.stage_timer import measured
+
+logger = logging.getLogger(__name__)
+
+# Below this combined input size (characters) every metric runs inline:
+# shipping inputs to another process costs more than the metric itself.
+PARALLEL_MIN_CHARS = 20_000
+
+MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+_pool = None
+
+
+def can_use_process_pool() -> bool:
+    """
+    Daemonic processes (e.g. Celery prefork children) are not allowed to
+    have children, so they always run inline.
+    """
+    return MAX_WORKERS > 1 and not multiprocessing.current_process().daemon
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The pool is created on first use and reused for the process lifetime."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _run_metric(mode: str, name: str, inputs1: dict, inputs2: dict, timed: bool, trace_memory: bool):
+    # Runs in a worker: the registry is looked up there, only inputs are pickled.
+    # Returns (value, measurement or None): the parent's timer can't see in here.
+    func = get_metric(mode, name).func
+    if not timed:
+        return func(inputs1, inputs2), None
+    with measured(trace_memory) as m:
+        value = func(inputs1, inputs2)
+    return value, m
+
+
+def _stage(timer, name):
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def run_metrics(mode: str, metrics: list, prep1: dict, prep2: dict, input_size: int,
+                timer=None, completed: dict = None, on_result=None) -> dict:
+    """
+    Runs every metric over the two prepared documents; returns {name: value}.
+    With input_size >= PARALLEL_MIN_CHARS and more than one heavy metric, the
+    heavy ones go to the process pool while the rest run inline meanwhile.
+    timer (StageTimer) gets one stage per metric, measured where it ran.
+    completed ({name: value}, e.g. checkpointed by an earlier attempt) is
+    used as is; on_result(name, value) is called as each other metric finishes.
+    """
+    completed = completed or {}
+    timed = timer is not None
+    trace_memory = timed and timer.trace_memory
+    metrics = [m for m in metrics if m.name not in completed]
+    heavy = [m for m in metrics if m.cost == COST_HEAVY]
+    futures = {}
+
+    if len(heavy) > 1 and input_size >= PARALLEL_MIN_CHARS and can_use_process_pool():
+        try:
+            pool = get_process_pool()
+            for metric in heavy:
+                futures[metric.name] = pool.submit(
+                    _run_metric, mode, metric.name, metric.select(prep1), metric.select(prep2),
+                    timed, trace_memory
+                )
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.warning("Process pool unavailable, running metrics inline: %s", e)
+            shutdown_process_pool()
+            futures = {}
+
+    results = dict(completed)
+    for metric in metrics:
+        if metric.name not in futures:
+            with _stage(timer, metric.name):
+                results[metric.name] = metric.func(prep1, prep2)
+            if on_result is not None:
+                on_result(metric.name, results[metric.name])
+
+    for name, future in futures.items():
+        try:
+            results[name], m = future.result()
+            if m is not None:
+                timer.record(name, m["seconds"], m["peak_bytes"])
+        except BrokenProcessPool as e:
+            # A worker died (OOM kill, ...): redo this metric here
+            logger.warning("Metric %s lost its worker, re-running inline: %s", name, e)
+            shutdown_process_pool()
+            with _stage(timer, name):
+                results[name] = get_metric(mode, name).func(prep1, prep2)
+        if on_result is not None:
+            on_result(name, results[name])
+
+    return results
@@ -0,0 +1,65 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Collects wall time (and optionally tracemalloc peak memory) per named
+    stage of one analysis. Stages with the same name (e.g. 'clean' for both
+    files) are summed; their peak is the larger of the two.
+
+    Engines take timer=None and skip instrumentation entirely without one,
+    so a run that doesn't ask for timings pays nothing.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        with measured(self.trace_memory) as m:
+            yield
+        self.record(name, m["seconds"], m["peak_bytes"])
+
+    def record(self, name: str, seconds: float, peak_bytes: int = None) -> None:
+        """Adds a measurement taken elsewhere (e.g. in a worker process)."""
+        entry = self.stages.setdefault(name, {"ms": 0.0})
+        entry["ms"] += seconds * 1000
+        if peak_bytes is not None:
+            entry["peak_kb"] = max(entry.get("peak_kb", 0), peak_bytes // 1024)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "stages": {
+                name: {key: round(value, 2) for key, value in entry.items()}
+                for name, entry in self.stages.items()
+            },
+        }
+
+
+@contextmanager
+def measured(trace_memory: bool):
+    """
+    For code that can't hold a StageTimer (metrics in a worker process):
+    yields a dict that holds "seconds" and "peak_bytes" once the block exits.
+    """
+    out = {}
+    started_tracing = False
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    if trace_memory:
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    try:
+        yield out
+    finally:
+        out["seconds"] = time.perf_counter() - start
+        out["peak_bytes"] = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if started_tracing:
+            tracemalloc.stop()
@@ -1,9 +1,16 @@
 import logging
+from contextlib import nullcontext
 
-from Phase1_Text.engine.text_similarity import compare_texts
+from Phase1_Text.engine.text_similarity import prepare_text, build_text_result
 from Phase2_Code.utils.language_detector import detect_language
-from Phase2_Code.engine.code_similarity_engine import compare_code
+from Phase2_Code.code_preprocess.lexer_registry import resolve_language
+from Phase2_Code.engine.code_similarity_engine import prepare_code, build_code_result
+from Phase1_Text.scoring.aggregate import TEXT_WEIGHTS
+from Phase2_Code.scoring.code_aggregate import code_score_weights
 from Phase3_Unified.engine.risk_classifier import classify_risk
+from Phase3_Unified.engine.metric_registry import get_metrics
+from Phase3_Unified.engine.stage_executor import run_metrics
+from Phase3_Unified.engine.stage_timer import StageTimer
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +20,17 @@ def analyze_submission(
     input2: str,
     mode: str,
     lang1_override: str = None,
-    lang2_override: str = None
+    lang2_override: str = None,
+    use_semantic:   bool = False,
+    template_filter = None,
+    filename1:      str = None,
+    filename2:      str = None,
+    timings:        bool = False,
+    trace_memory:   bool = False,
+    prepared1:      dict = None,
+    prepared2:      dict = None,
+    completed_metrics: dict = None,
+    on_metric       = None
 ) -> dict:
     """
     Unified entry point for plagiarism analysis.
@@ -22,56 +39,199 @@ def analyze_submission(
         input1:         Raw text or source code of file 1
         input2:         Raw text or source code of file 2
         mode:           'text' or 'code'
-        lang1_override: Optional. Force language for file 1 ('python', 'java', 'cpp').
+        lang1_override: Optional. Force language for file 1 ('python', 'java', 'cpp',
+                        or any other lexer_registry language, e.g. 'go').
                         If None, auto-detection is used.
-        lang2_override: Optional. Force language for file 2 ('python', 'java', 'cpp').
+        lang2_override: Optional. Force language for file 2 (same choices).
                         If None, auto-detection is used.
+        use_semantic:   Optional. Code mode only — adds the embedding metric.
+                        The model is loaded lazily, once per process.
+        template_filter: Optional. Code mode only — TemplateFilter with the
+                        assignment's starter code, excluded before scoring.
+        filename1:      Optional. Uploaded name of file 1; its extension decides
+                        the language when auto-detection has low confidence.
+        filename2:      Optional. Same for file 2.
+        timings:        Optional. Adds a timings block: total_ms and per-stage
+                        ms (clean, tokenize, normalize, each metric, aggregate).
+        trace_memory:   Optional. With timings, also samples tracemalloc peak
+                        memory (peak_kb) per stage. Slows the run down noticeably.
+        prepared1:      Optional. File 1 already prepared (prepare_text / prepare_code
+                        output, e.g. loaded from a cache); used instead of preparing
+                        input1 again when it matches this run's language and no
+                        template filter is given.
+        prepared2:      Optional. Same for file 2.
+        completed_metrics: Optional. {metric name: output} already computed for
+                        this pair (e.g. checkpointed by a failed attempt); those
+                        metrics are not run again.
+        on_metric:      Optional. on_metric(name, output) is called as each
+                        metric finishes, so a caller can checkpoint it.
 
     Returns:
         dict with keys: mode, language, scores, final_similarity, risk_level
+        (code mode also has function_matches: copied functions with line regions,
+        and algorithm_plan: which LCS and AST edit-distance variants ran and
+        whether they are approximate)
+
+    Metrics come from metric_registry; on large inputs the heavy ones run
+    in parallel worker processes (see stage_executor).
     """
+    input_size = len(input1) + len(input2)
+    timer      = StageTimer(trace_memory) if timings else None
 
     if mode == "text":
-        result      = compare_texts(input1, input2)
-        final_score = result["final_similarity"]
-
-        return {
-            "mode":     "text",
-            "language": "english",
-            "scores": {
-                "jaccard":    result.get("jaccard"),
-                "cosine":     result.get("cosine"),
-                "winnowing":  None,
-                "lcs":        result.get("lcs"),
-                "ast":        None
-            },
-            "final_similarity": final_score,
-            "risk_level":       classify_risk(final_score)
-        }
+        prep1   = prepared1 or prepare_text(input1, timer)
+        prep2   = prepared2 or prepare_text(input2, timer)
+        metrics = run_metrics(
+            "text", get_metrics("text"), prep1, prep2, input_size, timer, completed_metrics, on_metric
+        )
+
+        with _stage(timer, "aggregate"):
+            response = build_text_response(metrics)
 
     elif mode == "code":
         # Use override if provided, otherwise auto-detect
-        lang1 = lang1_override.lower() if lang1_override else detect_language(input1)
-        lang2 = lang2_override.lower() if lang2_override else detect_language(input2)
+        with _stage(timer, "detect_language"):
+            lang1 = _pick_language(input1, lang1_override, filename1, prepared1)
+            lang2 = _pick_language(input2, lang2_override, filename2, prepared2)
 
         logger.info("Code comparison — detected/overridden languages: %s | %s", lang1, lang2)
 
-        result      = compare_code(input1, input2, lang1=lang1, lang2=lang2)
-        final_score = result["final_code_similarity"]
-
-        return {
-            "mode":     "code",
-            "language": f"{lang1}/{lang2}" if lang1 != lang2 else lang1,
-            "scores": {
-                "jaccard":   None,
-                "cosine":    None,
-                "winnowing": result.get("winnowing"),
-                "lcs":       result.get("lcs"),
-                "ast":       result.get("ast")
-            },
-            "final_similarity": final_score,
-            "risk_level":       classify_risk(final_score)
-        }
+        prep1   = _reuse(prepared1, lang1, template_filter) or prepare_code(input1, lang1, template_filter, timer)
+        prep2   = _reuse(prepared2, lang2, template_filter) or prepare_code(input2, lang2, template_filter, timer)
+        metrics = run_metrics(
+            "code", get_metrics("code", use_semantic=use_semantic), prep1, prep2, input_size, timer,
+            completed_metrics, on_metric
+        )
+
+        with _stage(timer, "aggregate"):
+            response = build_code_response(metrics, prep1, prep2)
+
+    else:
+        raise ValueError(f"Invalid mode '{mode}'. Must be 'text' or 'code'.")
+
+    if timer is not None:
+        response["timings"] = timer.as_dict()
+    return response
+
+
+def _stage(timer, name):
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def _pick_language(code: str, override: str, filename: str, prepared: dict) -> str:
+    if override:
+        return resolve_language(override)
+    if prepared is not None:
+        return prepared["lang"]     # detected when it was prepared
+    return detect_language(code, filename)
+
+
+def _reuse(prepared: dict, lang: str, template_filter) -> dict:
+    # Template exclusion changes the tokens: prepared files never include it
+    if prepared is not None and prepared["lang"] == lang and template_filter is None:
+        return prepared
+    return None
+
+
+def build_text_response(metrics: dict) -> dict:
+    """Text-mode response from the text metric outputs (see metric_registry)."""
+    result      = build_text_result(metrics["jaccard"], metrics["lcs"], metrics["cosine"])
+    final_score = result["final_similarity"]
+
+    return {
+        "mode":     "text",
+        "language": "english",
+        "scores": {
+            "jaccard":    result.get("jaccard"),
+            "cosine":     result.get("cosine"),
+            "winnowing":  None,
+            "lcs":        result.get("lcs"),
+            "ast":        None,
+            "semantic":   None,
+            "bytecode":   None
+        },
+        "final_similarity": final_score,
+        "risk_level":       classify_risk(final_score)
+    }
 
+
+def build_code_response(metrics: dict, prep1: dict, prep2: dict) -> dict:
+    """Code-mode response from the code metric outputs and the two prepared files."""
+    lang1, lang2 = prep1["lang"], prep2["lang"]
+
+    result      = build_code_result(metrics, prep1, prep2)
+    final_score = result["final_code_similarity"]
+
+    response = {
+        "mode":     "code",
+        "language": f"{lang1}/{lang2}" if lang1 != lang2 else lang1,
+        "scores": {
+            "jaccard":   None,
+            "cosine":    None,
+            "winnowing": result.get("winnowing"),
+            "lcs":       result.get("lcs"),
+            "ast":       result.get("ast"),
+            "semantic":  result.get("semantic"),
+            "bytecode":  result.get("bytecode")
+        },
+        "final_similarity": final_score,
+        "risk_level":       classify_risk(final_score),
+        "function_matches": result.get("function_matches", [])
+    }
+    for key in ("algorithm_plan", "semantic_stats", "template_excluded"):
+        if key in result:
+            response[key] = result[key]
+
+    return response
+
+
+def build_partial_response(mode: str, metrics: dict, lang1: str = None, lang2: str = None,
+                           use_semantic: bool = False) -> dict:
+    """
+    Best-effort response from the metrics that finished before an analysis
+    had to stop: their scores, final_similarity as the average of the
+    aggregated ones re-weighted from the full aggregation's rules (text
+    weights; same- or cross-language code weights, semantic blend),
+    partial=True and the missing metric names.
+
+    Raises:
+        ValueError: if none of the aggregated metrics finished.
+    """
+    scores = {name: None for name in ("jaccard", "cosine", "winnowing", "lcs", "ast", "semantic", "bytecode")}
+    raw = {}
+    for name, value in metrics.items():
+        if name not in scores:
+            continue                # function_matches: reported as is
+        if isinstance(value, (list, tuple)):
+            value = value[0]        # code lcs, ast: (score, plan); semantic: (score, stats)
+        if value is not None:
+            raw[name] = float(value)
+            scores[name] = round(raw[name], 4)
+
+    if mode == "text":
+        full_weights = TEXT_WEIGHTS
     else:
-        raise ValueError(f"Invalid mode '{mode}'. Must be 'text' or 'code'.")
\ No newline at end of file
+        # A finished AST of None (no structure to compare) aggregates like a cross-language pair
+        same_language = lang1 == lang2 and not ("ast" in metrics and metrics["ast"][0] is None)
+        full_weights = code_score_weights(same_language=same_language, use_semantic=use_semantic)
+    weights = {name: w for name, w in full_weights.items() if name in raw}
+    if not weights:
+        raise ValueError("No aggregated metric finished: nothing to report.")
+    final_score = round(sum(w * raw[name] for name, w in weights.items()) / sum(weights.values()), 4)
+
+    if mode == "text":
+        language = "english"
+    else:
+        language = f"{lang1}/{lang2}" if lang1 != lang2 else lang1
+
+    enabled = [m.name for m in get_metrics(mode, use_semantic=use_semantic)]
+    return {
+        "mode":             mode,
+        "language":         language,
+        "scores":           scores,
+        "final_similarity": final_score,
+        "risk_level":       classify_risk(final_score),
+        "function_matches": metrics.get("function_matches", []),
+        "partial":          True,
+        "missing_metrics":  [name for name in enabled if name not in metrics],
+    }
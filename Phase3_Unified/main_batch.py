@@ -0,0 +1,415 @@
+"""
+Batch plagiarism check over a folder of submissions.
+
+    python -m Phase3_Unified.main_batch submissions/ -o results.jsonl
+    python -m Phase3_Unified.main_batch "hw3/*.py" -o results.csv --top-k 3 --workers 8
+
+Every file is compared with every other file of the same mode (code or
+text). Results are written as they complete; completed pairs are also
+appended to a checkpoint file, so an interrupted run started again with
+the same command only computes the missing pairs. The checkpoint records
+a digest of the inputs (file names and contents) and options; a rerun over
+different files or options ignores it and starts over.
+
+    python -m Phase3_Unified.main_batch submissions/ -o results.jsonl --cache hw3.cache --watch
+
+With --cache, prepared files and pair results are kept in an on-disk
+artefact cache keyed by content hash: a rerun only prepares new or edited
+files and only compares pairs involving them. --watch repeats the run
+whenever a file is added, removed or modified.
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+
+from Phase2_Code.code_preprocess.lexer_registry import EXTENSION_LANGUAGES
+from Phase3_Unified.engine.batch_analyzer import analyze_many, prepare_documents, top_k_per_document
+from Phase3_Unified.engine.artefacts import ArtefactStore
+from Phase3_Unified.engine.result_cache import ALGORITHM_VERSION, mirror_result
+
+TEXT_EXTENSIONS = {".txt", ".md"}
+
+CSV_FIELDS = [
+    "doc_a", "doc_b", "mode", "language", "final_similarity", "risk_level",
+    "jaccard", "cosine", "winnowing", "lcs", "ast", "semantic", "bytecode",
+]
+
+
+# ---------- Input ----------
+def collect_files(inputs: list) -> list:
+    """Directories are walked recursively; anything else is a path or glob."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                paths.update(os.path.join(root, name) for name in names)
+        else:
+            paths.update(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+    return sorted(paths)
+
+
+def file_mode(path: str, forced: str) -> str:
+    """'code', 'text' or None (skipped) for one file."""
+    ext = os.path.splitext(path)[1].lower()
+    if forced != "auto":
+        return forced
+    if ext in EXTENSION_LANGUAGES:
+        return "code"
+    if ext in TEXT_EXTENSIONS:
+        return "text"
+    return None
+
+
+def classify_files(paths: list, forced_mode: str) -> dict:
+    """{mode: {doc_id: path}}; doc ids are paths relative to the common root."""
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else ""
+    groups = {"code": {}, "text": {}}
+    for path in paths:
+        mode = file_mode(path, forced_mode)
+        if mode is None:
+            print(f"Skipping {path}: unknown extension (use --mode to force)", file=sys.stderr)
+            continue
+        if os.path.getsize(path) == 0:
+            print(f"Skipping {path}: empty", file=sys.stderr)
+            continue
+        groups[mode][os.path.relpath(os.path.abspath(path), root)] = path
+    return groups
+
+
+def read_file(path: str) -> str:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def load_documents(paths: list, forced_mode: str) -> dict:
+    """{mode: {doc_id: content}}"""
+    groups = {}
+    for mode, files in classify_files(paths, forced_mode).items():
+        groups[mode] = {}
+        for doc_id, path in files.items():
+            content = read_file(path)
+            if not content.strip():
+                print(f"Skipping {path}: empty", file=sys.stderr)
+                continue
+            groups[mode][doc_id] = content
+    return groups
+
+
+# ---------- Checkpoint ----------
+def pair_key(doc_a: str, doc_b: str) -> tuple:
+    return tuple(sorted((doc_a, doc_b)))
+
+
+def input_digest(groups: dict, use_semantic: bool) -> str:
+    """Identifies a run's inputs: every document id and content, and the options."""
+    digest = hashlib.sha256(json.dumps([ALGORITHM_VERSION, bool(use_semantic)]).encode("utf-8"))
+    for mode in sorted(groups):
+        for doc_id in sorted(groups[mode]):
+            content = hashlib.sha256(groups[mode][doc_id].encode("utf-8")).hexdigest()
+            digest.update(json.dumps([mode, doc_id, content]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: str, digest: str) -> list:
+    """
+    Results already computed by an earlier run over the same inputs
+    (see input_digest). A checkpoint written for other inputs is discarded
+    and the file restarted with this run's header. A torn last line
+    (killed mid-write) is cut off so new lines are appended after valid ones.
+    """
+    header = json.dumps({"inputs": digest}) + "\n"
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            first = f.readline()
+        if first.decode("utf-8", "replace") != header:
+            print(f"Ignoring {path}: written for other files or options", file=sys.stderr)
+            os.remove(path)
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(header)
+        return []
+
+    results = []
+    valid_bytes = len(header.encode("utf-8"))
+    with open(path, "rb") as f:
+        f.readline()
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            valid_bytes += len(line)
+    if valid_bytes < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return results
+
+
+# ---------- Output ----------
+class ResultWriter:
+    """Streams results to JSONL (full result per line) or CSV (scores only)."""
+
+    def __init__(self, path: str, fmt: str):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, result: dict) -> None:
+        if self.fmt == "csv":
+            self.csv.writerow({**result, **result["scores"]})
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def print_progress(done: int, total: int, resumed: int, started: float) -> None:
+    elapsed = time.time() - started
+    # Rate of this run only: resumed pairs took no time here
+    rate = (done - resumed) / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else 0.0
+    print(f"\r[{done}/{total}] pairs | {elapsed:.0f}s elapsed | ETA {eta:.0f}s ",
+          end="", file=sys.stderr, flush=True)
+
+
+# ---------- Run ----------
+def run(args) -> int:
+    paths = collect_files(args.inputs)
+    groups = load_documents(paths, args.mode)
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint"
+
+    # Only pairs of files still in the input count, whatever the file holds
+    done = [
+        r for r in load_checkpoint(checkpoint_path, input_digest(groups, args.semantic))
+        if r["doc_a"] in groups.get(r["mode"], {}) and r["doc_b"] in groups.get(r["mode"], {})
+    ]
+    done_keys = {pair_key(r["doc_a"], r["doc_b"]) for r in done}
+
+    todo = {}
+    for mode, documents in groups.items():
+        todo[mode] = [
+            (a, b) for a, b in itertools.combinations(documents, 2)
+            if pair_key(a, b) not in done_keys
+        ]
+    total = len(done) + sum(len(pairs) for pairs in todo.values())
+    if done:
+        print(f"Resuming: {len(done)} of {total} pairs already in {checkpoint_path}", file=sys.stderr)
+
+    # The output is rebuilt from the checkpoint, so it never holds a pair
+    # twice or misses one, however the previous run ended
+    writer = ResultWriter(args.output, fmt)
+    if args.top_k is None:
+        for result in done:
+            writer.write(result)
+
+    results = list(done) if args.top_k is not None else None
+    started = time.time()
+    count = len(done)
+    try:
+        with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            for mode, pairs in todo.items():
+                if not pairs:
+                    continue
+                for result in analyze_many(groups[mode], pairs=pairs, mode=mode,
+                                           use_semantic=args.semantic, workers=args.workers):
+                    checkpoint.write(json.dumps(result) + "\n")
+                    checkpoint.flush()
+                    if results is not None:
+                        results.append(result)
+                    else:
+                        writer.write(result)
+                    count += 1
+                    print_progress(count, total, len(done), started)
+    except KeyboardInterrupt:
+        writer.close()
+        print(f"\nInterrupted after {count}/{total} pairs; run the same command to resume.",
+              file=sys.stderr)
+        return 130
+
+    if results is not None:
+        for result in top_k_per_document(results, args.top_k):
+            writer.write(result)
+    writer.close()
+
+    print(f"\nDone: {count} pairs -> {args.output}", file=sys.stderr)
+    return 0
+
+
+# ---------- Incremental ----------
+def content_pairs(docs: dict, first: str, second: str):
+    """(doc_a, doc_b) for every pair of files whose document keys are first and second."""
+    if first == second:
+        return itertools.combinations(docs[first], 2)
+    return itertools.product(docs[first], docs[second])
+
+
+def run_incremental_pass(args, store: ArtefactStore) -> int:
+    """
+    One pass over the files with the artefact cache: unchanged files are
+    neither read nor prepared, cached pairs stream from one query per mode,
+    and only pairs involving a new or edited file are compared.
+    """
+    groups = classify_files(collect_files(args.inputs), args.mode)
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+    writer = ResultWriter(args.output, fmt)
+    results = [] if args.top_k is not None else None
+
+    def emit(result: dict) -> None:
+        if results is None:
+            writer.write(result)
+        else:
+            results.append(result)
+
+    todo = {}       # mode -> ([(doc_a, doc_b)], {doc_id: sha256}, {doc_id: document key})
+    changed = cached = 0
+    for mode, files in groups.items():
+        shas, keys = {}, {}
+        docs = {}   # document key -> doc ids with that content, in input order
+        for doc_id, path in files.items():
+            shas[doc_id], is_changed = store.file_digest(path)
+            keys[doc_id] = store.document_key(shas[doc_id], os.path.splitext(doc_id)[1].lower())
+            docs.setdefault(keys[doc_id], []).append(doc_id)
+            changed += is_changed
+        store.commit()
+        order = {doc_id: i for i, doc_id in enumerate(files)}
+
+        found = dict.fromkeys(docs, 0)
+        for first, second, stored in store.iter_results(docs, mode, args.semantic):
+            found[first] += 1
+            found[second] += first != second
+            mirrored = mirror_result(stored) if first != second else stored
+            for a, b in content_pairs(docs, first, second):
+                if order[a] < order[b]:
+                    emit({"doc_a": a, "doc_b": b, **stored})
+                else:
+                    emit({"doc_a": b, "doc_b": a, **mirrored})
+                cached += 1
+
+        # A key pairs with every other key, and with itself when two files
+        # share it; only keys short of that (new, edited, or cut off by an
+        # interrupted pass) have pairs left to compare
+        missing_keys = set()
+        for key, count in found.items():
+            if count == len(docs) - (len(docs[key]) == 1):
+                continue
+            have = store.partners(key, mode, args.semantic)
+            for other in docs:
+                if other not in have and (other != key or len(docs[key]) > 1):
+                    missing_keys.add((min(key, other), max(key, other)))
+        pairs = []
+        for first, second in missing_keys:
+            for a, b in content_pairs(docs, first, second):
+                pairs.append((a, b) if order[a] < order[b] else (b, a))
+        todo[mode] = (sorted(pairs, key=lambda p: (order[p[0]], order[p[1]])), shas, keys)
+
+    total = cached + sum(len(pairs) for pairs, _, _ in todo.values())
+    print(f"{changed} new/changed files | {cached} cached pairs | "
+          f"{total - cached} pairs to compare", file=sys.stderr)
+
+    started = time.time()
+    count = cached
+    try:
+        for mode, (pairs, shas, keys) in todo.items():
+            if not pairs:
+                continue
+            files = groups[mode]
+            involved = {doc for pair in pairs for doc in pair}
+
+            # Prepared artefacts come from the cache; only the rest is prepared now
+            prepared = {}
+            for doc_id in involved:
+                cached_prep = store.get_prepared(shas[doc_id], mode, os.path.splitext(doc_id)[1].lower())
+                if cached_prep is not None:
+                    prepared[doc_id] = cached_prep
+            documents = {doc_id: read_file(files[doc_id]) for doc_id in involved}
+            missing = {d: c for d, c in documents.items() if d not in prepared}
+            for doc_id, prep in prepare_documents(missing, mode, filenames=files).items():
+                store.put_prepared(shas[doc_id], mode, os.path.splitext(doc_id)[1].lower(), prep)
+                prepared[doc_id] = prep
+            store.commit()
+
+            for result in analyze_many(documents, pairs=pairs, mode=mode, filenames=files,
+                                       use_semantic=args.semantic, workers=args.workers,
+                                       prepared=prepared):
+                store.put_result(keys[result["doc_a"]], keys[result["doc_b"]], mode, args.semantic, result)
+                store.commit()
+                emit(result)
+                count += 1
+                print_progress(count, total, cached, started)
+    finally:
+        if results is not None:
+            for result in top_k_per_document(results, args.top_k):
+                writer.write(result)
+        writer.close()
+
+    print(f"\nDone: {count} pairs -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def snapshot(args) -> dict:
+    """{path: (mtime_ns, size)} of the input files, to notice changes."""
+    state = {}
+    for path in collect_files(args.inputs):
+        st = os.stat(path)
+        state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def run_incremental(args) -> int:
+    store = ArtefactStore(args.cache)
+    try:
+        state = snapshot(args)
+        run_incremental_pass(args, store)
+        while args.watch:
+            time.sleep(args.interval)
+            current = snapshot(args)
+            if current != state:
+                state = current
+                run_incremental_pass(args, store)
+    except KeyboardInterrupt:
+        print("\nStopped; finished pairs are in the cache.", file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="All-pairs plagiarism check over a set of files.")
+    parser.add_argument("inputs", nargs="+", help="directories, files or glob patterns")
+    parser.add_argument("-o", "--output", required=True, help="results file (.jsonl or .csv)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="default: from the output extension")
+    parser.add_argument("--mode", choices=("auto", "code", "text"), default="auto",
+                        help="auto: code by source extension, text for .txt/.md")
+    parser.add_argument("--top-k", type=int, help="keep only the k most similar pairs per file")
+    parser.add_argument("--workers", type=int, help="process pool size (1 = no pool)")
+    parser.add_argument("--semantic", action="store_true", help="add the embedding metric (code)")
+    parser.add_argument("--checkpoint", help="completed-pairs file (default: <output>.checkpoint)")
+    parser.add_argument("--cache", help="artefact cache file: enables incremental runs")
+    parser.add_argument("--watch", action="store_true", help="with --cache: rerun on file changes")
+    parser.add_argument("--interval", type=float, default=5.0, help="--watch polling interval (seconds)")
+    args = parser.parse_args(argv)
+    if args.watch and not args.cache:
+        parser.error("--watch needs --cache")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    return run_incremental(args) if args.cache else run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+from Phase3_Unified.engine.batch_analyzer import analyze_many
+
+documents = {
+    "alice": "def add(a,b): return a+b",
+    "bob":   "def add(x,y): return x+y",
+    "carol": "class Stack:\n    def __init__(self):\n        self.items = []\n",
+}
+
+# -------- ALL PAIRS --------
+print("----- ALL PAIRS -----")
+for res in analyze_many(documents, mode="code"):
+    print(res["doc_a"], res["doc_b"], res["final_similarity"], res["risk_level"])
+
+# -------- TOP-1 PER DOCUMENT --------
+print("\n----- TOP-1 PER DOCUMENT -----")
+for res in analyze_many(documents, mode="code", top_k=1):
+    print(res["doc_a"], res["doc_b"], res["final_similarity"])
+
+# -------- EXPLICIT PAIRS (TEXT) --------
+print("\n----- EXPLICIT PAIRS (TEXT) -----")
+texts = {"a": "Plagiarism detection system", "b": "Plagiarism detection system"}
+for res in analyze_many(texts, pairs=[("a", "b")], mode="text"):
+    print(res["doc_a"], res["doc_b"], res["final_similarity"])
+
+# -------- ARTEFACT CACHE --------
+print("\n----- ARTEFACT CACHE -----")
+from Phase3_Unified.engine.artefacts import ArtefactStore
+from Phase3_Unified.engine.batch_analyzer import prepare_documents
+
+store = ArtefactStore(":memory:")
+prepared = prepare_documents(documents, "code")
+store.put_prepared("sha-alice", "code", ".py", prepared["alice"])
+print("Prepared round trip:", store.get_prepared("sha-alice", "code", ".py") == prepared["alice"])
+
+res = next(analyze_many(documents, pairs=[("alice", "bob")], mode="code", prepared=prepared))
+alice, bob = store.document_key("sha-alice", ".py"), store.document_key("sha-bob", ".py")
+store.put_result(alice, bob, "code", False, res)
+print("Same key either order:", store.pair_key(alice, bob)[:2] == store.pair_key(bob, alice)[:2])
+print("Cached score:", store.get_result(bob, alice, "code", False)["final_similarity"], res["final_similarity"])
+# Same bytes as C and C++ are different documents
+print("Other extension misses:", store.get_result(store.document_key("sha-alice", ".c"), bob, "code", False))
+store.close()
+
+# -------- CHECKPOINT FROM OTHER INPUTS --------
+print("\n----- CHECKPOINT FROM OTHER INPUTS -----")
+import json
+import os
+import tempfile
+from Phase3_Unified.main_batch import main, load_checkpoint
+
+with tempfile.TemporaryDirectory() as tmp:
+    folder = os.path.join(tmp, "hw")
+    os.mkdir(folder)
+    for name, code in documents.items():
+        with open(os.path.join(folder, name + ".py"), "w") as f:
+            f.write(code)
+    output = os.path.join(tmp, "results.jsonl")
+    main([folder, "-o", output, "--workers", "1"])
+
+    # carol.py replaced by dave.py: the old checkpoint must not leak carol's pairs
+    os.remove(os.path.join(folder, "carol.py"))
+    with open(os.path.join(folder, "dave.py"), "w") as f:
+        f.write("def mul(a,b): return a*b")
+    main([folder, "-o", output, "--workers", "1"])
+    with open(output) as f:
+        pairs = [tuple(sorted((r["doc_a"], r["doc_b"]))) for r in map(json.loads, f)]
+    print("Pairs:", sorted(pairs))  # Expect alice/bob, alice/dave, bob/dave only
+    assert not any("carol.py" in pair for pair in pairs) and len(pairs) == 3
+
+# -------- INCREMENTAL PASS --------
+print("\n----- INCREMENTAL PASS -----")
+import contextlib
+import io
+
+with tempfile.TemporaryDirectory() as tmp:
+    folder = os.path.join(tmp, "hw")
+    os.mkdir(folder)
+    for name, code in documents.items():
+        with open(os.path.join(folder, name + ".py"), "w") as f:
+            f.write(code)
+    output = os.path.join(tmp, "results.jsonl")
+    cache = os.path.join(tmp, "hw.cache")
+
+    def incremental_pass():
+        log = io.StringIO()
+        with contextlib.redirect_stderr(log):
+            main([folder, "-o", output, "--cache", cache, "--workers", "1"])
+        with open(output) as f:
+            rows = {(r["doc_a"], r["doc_b"]): r["final_similarity"] for r in map(json.loads, f)}
+        return log.getvalue().splitlines()[0], rows
+
+    print(incremental_pass()[0])  # Expect 3 pairs to compare
+    with open(os.path.join(folder, "carol.py"), "w") as f:
+        f.write("def mul(a,b): return a*b")
+    summary, rows = incremental_pass()
+    print(summary)  # Expect 1 cached pair, 2 pairs to compare
+    assert "1 cached pairs | 2 pairs to compare" in summary and len(rows) == 3
+
+    # A copy of a known file is compared with nothing new but its original
+    with open(os.path.join(folder, "zed.py"), "w") as f:
+        f.write(documents["alice"])
+    summary, rows = incremental_pass()
+    print(summary)  # Expect 5 cached pairs, 1 pair to compare
+    assert "5 cached pairs | 1 pairs to compare" in summary and len(rows) == 6
+    assert rows[("alice.py", "carol.py")] == rows[("carol.py", "zed.py")]
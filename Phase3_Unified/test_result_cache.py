@@ -0,0 +1,26 @@
+from Phase3_Unified.engine.result_cache import ResultCache, RedisTier, FakeRedis
+
+code1 = "def add(a,b): return a+b"
+code2 = "public class A { int add(int a, int b) { return a+b; } }"
+
+shared = RedisTier(FakeRedis())
+cache  = ResultCache(shared=shared)
+
+# -------- MISS, THEN LOCAL HIT --------
+print("----- MISS, THEN LOCAL HIT -----")
+print(cache.analyze_submission(code1, code2, mode="code")["cache"])
+print(cache.analyze_submission(code1, code2, mode="code")["cache"])
+
+# -------- SWAPPED ORDER HITS THE SAME ENTRY --------
+print("\n----- SWAPPED ORDER -----")
+res = cache.analyze_submission(code2, code1, mode="code")
+print(res["language"], res["cache"])
+
+# -------- SHARED TIER (another worker) --------
+print("\n----- SHARED TIER -----")
+other = ResultCache(shared=shared)
+print(other.analyze_submission(code1, code2, mode="code")["cache"])
+
+# -------- DIFFERENT OPTIONS MISS --------
+print("\n----- DIFFERENT OPTIONS -----")
+print(cache.analyze_submission(code1, code2, mode="code", lang1_override="java")["cache"])
@@ -20,3 +20,41 @@ res_code = analyze_submission(
     mode="code"
 )
 print(res_code)
+
+# -------- LANGUAGE ALIAS --------
+print("\n----- LANGUAGE ALIAS -----")
+res_alias = analyze_submission(code1, code2, mode="code", lang1_override="py")
+print(res_alias["language"], res_alias["scores"]["ast"])
+assert res_alias["scores"]["ast"] is not None
+assert res_alias == res_code
+
+# -------- RESUMED FROM COMPLETED METRICS --------
+print("\n----- RESUMED -----")
+from Phase3_Unified.engine.unified_analyzer import build_partial_response
+
+finished = {}
+analyze_submission(code1, code2, mode="code", on_metric=lambda name, value: finished.setdefault(name, value))
+print(sorted(finished))
+
+ran = []
+completed = {name: finished[name] for name in ("winnowing", "lcs")}
+res_resumed = analyze_submission(
+    code1, code2, mode="code",
+    completed_metrics=completed, on_metric=lambda name, value: ran.append(name)
+)
+print("re-ran:", sorted(ran), "| same result:", res_resumed == res_code)
+
+# -------- PARTIAL REPORT --------
+print("\n----- PARTIAL -----")
+print(build_partial_response("code", completed, "python", "python"))
+
+# -------- PARTIAL REPORT, CROSS-LANGUAGE --------
+print("\n----- PARTIAL, CROSS-LANGUAGE -----")
+java = "class A { static int add(int x, int y) { return x + y; } }"
+finished = {}
+res_cross = analyze_submission(code1, java, mode="code", lang2_override="java", on_metric=lambda name, value: finished.setdefault(name, value))
+del finished["bytecode"]         # as if the analysis stopped before it
+partial = build_partial_response("code", finished, "python", "java")
+print(partial["language"], partial["final_similarity"], "| full run:", res_cross["final_similarity"])
+assert partial["final_similarity"] == res_cross["final_similarity"]
+assert partial["missing_metrics"] == ["bytecode"]
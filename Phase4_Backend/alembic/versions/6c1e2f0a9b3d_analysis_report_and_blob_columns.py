@@ -0,0 +1,80 @@
+"""report semantic score, partial reports and timings; deduplicated uploads
+
+Tables have so far been created by Base.metadata.create_all on startup,
+which never alters a table that already exists. This adds what the models
+gained since: reports.semantic_score / partial / missing_metrics / timings,
+submissions.file1_sha256 / file2_sha256 and the stored_blobs table.
+Anything already there (a database created from the current models) is
+left alone, so the revision applies to both kinds of database.
+
+Revision ID: 6c1e2f0a9b3d
+Revises:
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "6c1e2f0a9b3d"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _report_columns() -> list:
+    return [
+        sa.Column("semantic_score", sa.Float(), nullable=True),
+        sa.Column("partial", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("missing_metrics", sa.JSON(), nullable=True),
+        sa.Column("timings", sa.JSON(), nullable=True),
+    ]
+
+
+def _submission_columns() -> list:
+    return [
+        sa.Column("file1_sha256", sa.String(64), nullable=True),
+        sa.Column("file2_sha256", sa.String(64), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for table, columns in (("reports", _report_columns()), ("submissions", _submission_columns())):
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+    indexes = {i["name"] for i in inspector.get_indexes("submissions")}
+    for column in ("file1_sha256", "file2_sha256"):
+        if f"ix_submissions_{column}" not in indexes:
+            op.create_index(f"ix_submissions_{column}", "submissions", [column])
+
+    if not inspector.has_table("stored_blobs"):
+        op.create_table(
+            "stored_blobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sha256", sa.String(64), nullable=False),
+            sa.Column("object_key", sa.String(512), nullable=False),
+            sa.Column("size", sa.BigInteger(), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_stored_blobs_id", "stored_blobs", ["id"])
+        op.create_index("ix_stored_blobs_sha256", "stored_blobs", ["sha256"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stored_blobs_sha256", table_name="stored_blobs")
+    op.drop_index("ix_stored_blobs_id", table_name="stored_blobs")
+    op.drop_table("stored_blobs")
+
+    op.drop_index("ix_submissions_file2_sha256", table_name="submissions")
+    op.drop_index("ix_submissions_file1_sha256", table_name="submissions")
+    with op.batch_alter_table("submissions") as batch:
+        for column in _submission_columns():
+            batch.drop_column(column.name)
+    with op.batch_alter_table("reports") as batch:
+        for column in _report_columns():
+            batch.drop_column(column.name)
@@ -14,8 +14,11 @@ from app.schemas.submission import (
     UploadResponse, StatusResponse, SubmissionDetailResponse,
     HistoryResponse, SubmissionListItem
 )
-from app.services.file_service import validate_file, upload_file_to_storage, delete_file_from_storage
-from app.workers.tasks import run_plagiarism_analysis
+from app.services.file_service import validate_file, delete_files_from_storage_async, run_storage_io
+from app.services.blob_store import store_uploads, release_blob
+from app.services.sidecars import delete_sidecars
+from app.services.checkpoints import clear_checkpoints
+from app.workers.tasks import run_plagiarism_analysis, prepare_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/submissions", tags=["Submissions"])
@@ -56,7 +59,7 @@ async def upload_submission(
     file1:         UploadFile      = File(..., description="First file for comparison"),
     file2:         UploadFile      = File(..., description="Second file for comparison"),
     mode:          str             = Form(..., description="'text' or 'code'"),
-    lang_override: Optional[str]   = Form(None, description="Optional: force language ('python', 'java', 'cpp')"),
+    lang_override: Optional[str]   = Form(None, description="Optional: force language ('python', 'java', 'cpp', 'c', 'javascript', 'typescript', 'csharp', 'go', 'ruby')"),
     db:            AsyncSession    = Depends(get_db),
     current_user:  User            = Depends(get_current_verified_user),
 ):
@@ -64,7 +67,7 @@ async def upload_submission(
     Upload two files for plagiarism analysis.
 
     - Validates file types and sizes
-    - Uploads to MinIO/S3 storage
+    - Stores files in MinIO/S3, once per unique content
     - Creates a Submission record in DB
     - Dispatches a Celery background task
     - Returns submission_id immediately (non-blocking)
@@ -85,37 +88,51 @@ async def upload_submission(
     ext1 = validate_file(file1, mode)
     ext2 = validate_file(file2, mode)
 
-    # Upload both files to storage
-    file1_path, _ = await upload_file_to_storage(file1, current_user.id)
-    file2_path, _ = await upload_file_to_storage(file2, current_user.id)
-
-    # Create submission record
-    submission = Submission(
-        user_id           = current_user.id,
-        mode              = SubmissionMode(mode),
-        file1_name        = file1.filename,
-        file2_name        = file2.filename,
-        file1_path        = file1_path,
-        file2_path        = file2_path,
-        language_override = lang_override,
-        status            = SubmissionStatus.PENDING,
-    )
-    db.add(submission)
-    await db.flush()    # get submission.id
-
-    # Dispatch Celery task
-    task = run_plagiarism_analysis.delay(
-        submission_id  = submission.id,
-        file1_path     = file1_path,
-        file2_path     = file2_path,
-        mode           = mode,
-        lang1_override = lang_override,
-        lang2_override = lang_override,
-    )
+    # Store both files content-addressed: known contents are not uploaded again
+    stored = await store_uploads(db, [file1, file2])
+    (file1_path, file1_sha, _), (file2_path, file2_sha, _) = stored
+
+    try:
+        # Create submission record
+        submission = Submission(
+            user_id           = current_user.id,
+            mode              = SubmissionMode(mode),
+            file1_name        = file1.filename,
+            file2_name        = file2.filename,
+            file1_path        = file1_path,
+            file2_path        = file2_path,
+            file1_sha256      = file1_sha,
+            file2_sha256      = file2_sha,
+            language_override = lang_override,
+            status            = SubmissionStatus.PENDING,
+        )
+        db.add(submission)
+        await db.flush()    # get submission.id
+
+        # New contents get extracted + prepared once, ahead of the analysis
+        if settings.SIDECARS_ENABLED:
+            for (key, sha, created), file in zip(stored, (file1, file2)):
+                if created:
+                    prepare_upload.delay(key, sha, file.filename, mode, lang_override)
+
+        # Dispatch Celery task
+        task = run_plagiarism_analysis.delay(
+            submission_id  = submission.id,
+            file1_path     = file1_path,
+            file2_path     = file2_path,
+            mode           = mode,
+            lang1_override = lang_override,
+            lang2_override = lang_override,
+        )
 
-    # Store Celery task ID for tracking
-    submission.celery_task_id = task.id
-    await db.flush()
+        # Store Celery task ID for tracking
+        submission.celery_task_id = task.id
+        await db.flush()
+    except Exception:
+        # The submission row and blob references are rolled back: delete the
+        # objects this request created so they aren't orphaned
+        await delete_files_from_storage_async([key for key, _, created in stored if created])
+        raise
 
     logger.info(
         "Submission created: id=%d user=%d mode=%s task_id=%s",
@@ -155,11 +172,14 @@ async def get_submission_status(
         SubmissionStatus.COMPLETED:  "Analysis complete. Your report is ready.",
         SubmissionStatus.FAILED:     f"Analysis failed: {submission.error_message or 'Unknown error'}",
     }
+    message = status_messages[submission.status]
+    if submission.report is not None and submission.report.partial:
+        message = "Analysis could not finish every metric. A partial report is ready."
 
     return StatusResponse(
         submission_id = submission.id,
         status        = submission.status,
-        message       = status_messages[submission.status],
+        message       = message,
     )
 
 
@@ -287,11 +307,25 @@ async def delete_submission(
             detail="Submission not found"
         )
 
-    # Delete files from storage
-    delete_file_from_storage(submission.file1_path)
-    delete_file_from_storage(submission.file2_path)
-
-    # Delete DB record (cascade deletes the report too)
+    # Drop the submission's blob references; objects go once unreferenced.
+    # Older submissions (no hashes) own their objects outright.
+    released = []
+    if submission.file1_sha256:
+        for sha in (submission.file1_sha256, submission.file2_sha256):
+            key = await release_blob(db, sha)
+            if key:
+                released.append((sha, key))
+        to_delete = [key for _, key in released]
+    else:
+        to_delete = [submission.file1_path, submission.file2_path]
+
+    # Delete DB record (cascade deletes the report too), then the objects:
+    # only once the commit succeeded, so a rollback never loses a file
     await db.delete(submission)
+    await db.commit()
+    await delete_files_from_storage_async(to_delete)
+    for sha, _ in released:
+        await run_storage_io(delete_sidecars, sha)
+    await run_storage_io(clear_checkpoints, submission_id)     # left by an unfinished analysis
 
     logger.info("Submission deleted: id=%d user=%d", submission_id, current_user.id)
\ No newline at end of file
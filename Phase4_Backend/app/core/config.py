@@ -23,6 +23,10 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
+    WORKER_DB_POOL_SIZE: int = 0               # 0 = sized to the tasks a worker process runs at once
+    WORKER_DB_MAX_OVERFLOW: int = 2            # extra connections beyond the pool under bursts
+    WORKER_PRELOAD: bool = True                # load + warm the engine in the worker parent, before forking
+    WORKER_MAX_TASKS_PER_CHILD: int = 0        # recycle pool processes after N tasks (0 = never)
 
     # File Storage
     STORAGE_ENDPOINT: str = "http://localhost:9000"
@@ -30,6 +34,8 @@ class Settings(BaseSettings):
     STORAGE_SECRET_KEY: str
     STORAGE_BUCKET_NAME: str = "turnitin-submissions"
     STORAGE_USE_SSL: bool = False
+    STORAGE_MAX_POOL_CONNECTIONS: int = 32     # HTTP connections kept by the shared S3 client
+    STORAGE_IO_THREADS: int = 16               # threads running storage calls for async routes
 
     # Google OAuth
     GOOGLE_CLIENT_ID: str
@@ -48,8 +54,23 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 20
     MAX_FILE_SIZE_MB: int = 10
+    PDF_EXTRACT_WORKERS: int = 0               # processes for large PDFs (0 = CPU count, max 8)
+    PDF_PAGE_TIME_BUDGET_SECONDS: float = 5.0  # a slower page is skipped (0 = no limit)
     MAX_SUBMISSIONS_PER_DAY_FREE: int = 5
 
+    # Engine
+    ENABLE_SEMANTIC_SIMILARITY: bool = False   # embedding metric for code mode (needs model files locally)
+    RESULT_CACHE_ENABLED: bool = True          # reuse results of identical (content, options) pairs
+    RESULT_CACHE_LOCAL_SIZE: int = 256         # per-worker LRU entries
+    RESULT_CACHE_TTL_SECONDS: int = 604800     # shared (Redis) entries live one week
+    ENGINE_TIMINGS: bool = True                # per-stage timings stored on each report
+    ENGINE_TRACE_MEMORY: bool = False          # + tracemalloc peak per stage (slow, for diagnosis)
+    SIDECARS_ENABLED: bool = True              # extract + prepare each unique upload once, cached in storage
+    DOWNLOAD_CACHE_DIR: str = "/tmp/turnitin-download-cache"   # worker-local originals, shared by a node's processes
+    DOWNLOAD_CACHE_MAX_MB: int = 2048          # LRU eviction above this total (0 = no cache)
+    DOWNLOAD_MMAP_MIN_MB: int = 8              # cached files this large are memory-mapped, not read
+    ANALYSIS_CHECKPOINTS_ENABLED: bool = True  # retries resume from the last completed stage
+
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
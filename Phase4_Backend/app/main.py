@@ -50,8 +50,8 @@ async def lifespan(app: FastAPI):
 
     # Ensure MinIO bucket exists (safe to call every time)
     try:
-        from app.services.file_service import ensure_bucket_exists
-        ensure_bucket_exists()
+        from app.services.file_service import ensure_bucket_exists, run_storage_io
+        await run_storage_io(ensure_bucket_exists)
     except Exception as e:
         logger.warning("Storage bucket check failed (MinIO may not be running): %s", e)
 
@@ -61,6 +61,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down — disposing DB engine")
     await engine.dispose()
 
+    from app.services.file_service import shutdown_storage_io
+    shutdown_storage_io()
+
 
 # ── FastAPI App ───────────────────────────────────────────────────────────────
 app = FastAPI(
@@ -1,9 +1,11 @@
 from app.models.user import User, UserPlan, AuthProvider
 from app.models.submission import Submission, SubmissionMode, SubmissionStatus
 from app.models.report import Report, RiskLevel
+from app.models.stored_blob import StoredBlob
 
 __all__ = [
     "User", "UserPlan", "AuthProvider",
     "Submission", "SubmissionMode", "SubmissionStatus",
     "Report", "RiskLevel",
+    "StoredBlob",
 ]
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, JSON, Enum as SAEnum
+from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, DateTime, JSON, Enum as SAEnum
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 import enum
 
 from app.core.database import Base
@@ -27,14 +27,24 @@ class Report(Base):
     lcs_score       = Column(Float, nullable=True)     # both modes
     winnowing_score = Column(Float, nullable=True)     # code mode only
     ast_score       = Column(Float, nullable=True)     # code mode, same-language only
+    semantic_score  = Column(Float, nullable=True)     # code mode, only when the embedding metric is enabled
 
     # Final aggregated score and risk
     final_similarity = Column(Float, nullable=False)
     risk_level       = Column(SAEnum(RiskLevel), nullable=False)
 
+    # Partial report: the analysis couldn't finish (out of retries), final_similarity
+    # is re-weighted over the metrics that did; missing_metrics lists the others
+    partial          = Column(Boolean, nullable=False, default=False, server_default=false())
+    missing_metrics  = Column(JSON, nullable=True)
+
     # Processing time in milliseconds
     processing_time_ms = Column(Integer, nullable=True)
 
+    # Per-stage breakdown: {"total_ms": ..., "stages": {name: {"ms": ..., "peak_kb": ...}}}
+    # covering download, extraction and every engine stage
+    timings            = Column(JSON, nullable=True)
+
     # Algorithm version tag — useful for reproducibility tracking
     algorithm_version  = Column(String(20), nullable=True, default="1.0.0")
 
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class StoredBlob(Base):
+    """
+    One stored object per unique upload content. Submissions reference blobs
+    by SHA-256 (file1_sha256 / file2_sha256); ref_count is the number of
+    those references, and the object is deleted when it drops to zero.
+    """
+    __tablename__ = "stored_blobs"
+
+    id          = Column(Integer, primary_key=True, index=True)
+    sha256      = Column(String(64), unique=True, index=True, nullable=False)
+
+    # Storage object key: blobs/{sha[:2]}/{sha}/{uuid}
+    object_key  = Column(String(512), nullable=False)
+    size        = Column(BigInteger, nullable=False)
+
+    # Number of submission files pointing at this blob
+    ref_count   = Column(Integer, nullable=False, default=1)
+
+    # Timestamps
+    created_at  = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<StoredBlob sha256={self.sha256[:12]} refs={self.ref_count}>"
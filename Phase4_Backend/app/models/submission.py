@@ -33,6 +33,11 @@ class Submission(Base):
     file1_path       = Column(String(512), nullable=False)   # storage object key
     file2_path       = Column(String(512), nullable=False)
 
+    # Content hashes: the files are StoredBlob references (see blob_store).
+    # NULL for submissions stored before deduplication, which own their objects.
+    file1_sha256     = Column(String(64), nullable=True, index=True)
+    file2_sha256     = Column(String(64), nullable=True, index=True)
+
     # Optional manual language override (for code mode)
     # If None, auto-detection was used
     language_override = Column(String(20), nullable=True)
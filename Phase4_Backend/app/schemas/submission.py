@@ -15,6 +15,7 @@ class ScoresSchema(BaseModel):
     lcs:       Optional[float] = None
     winnowing: Optional[float] = None
     ast:       Optional[float] = None
+    semantic:  Optional[float] = None
 
 
 # ── Report (nested inside SubmissionDetailResponse) ──────────────────────────
@@ -25,7 +26,10 @@ class ReportSchema(BaseModel):
     scores:             ScoresSchema
     final_similarity:   float
     risk_level:         str  # Or RiskLevel if it's an Enum
+    partial:            bool = False
+    missing_metrics:    Optional[list[str]] = None
     processing_time_ms: Optional[int]
+    timings:            Optional[dict] = None
     algorithm_version:  Optional[str]
     created_at:         datetime
 
@@ -42,7 +46,10 @@ class ReportSchema(BaseModel):
                 "language": data.language,
                 "final_similarity": data.final_similarity,
                 "risk_level": data.risk_level,
+                "partial": bool(data.partial),
+                "missing_metrics": data.missing_metrics,
                 "processing_time_ms": data.processing_time_ms,
+                "timings": data.timings,
                 "algorithm_version": data.algorithm_version,
                 "created_at": data.created_at,
                 "scores": {
@@ -51,6 +58,7 @@ class ReportSchema(BaseModel):
                     "lcs": data.lcs_score,
                     "winnowing": data.winnowing_score,
                     "ast": data.ast_score,
+                    "semantic": data.semantic_score,
                 }
             }
         # If it's already a dict, just return it
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from fastapi import UploadFile
+from sqlalchemy import update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stored_blob import StoredBlob
+from app.services.file_service import hash_upload, store_upload, delete_files_from_storage_async
+
+logger = logging.getLogger(__name__)
+
+
+# ── Content-addressed upload storage ──────────────────────────────────────────
+# Every unique upload content is stored once, as a StoredBlob whose ref_count
+# counts the submission files pointing at it. A hash hit skips the upload.
+#
+# Reference changes run in the request's DB transaction, so a failed request
+# rolls its increments back; only objects written by the request itself need
+# compensating deletes. Object keys carry a uuid: a blob deleted while the
+# same content is uploaded again never shares an object with the new blob.
+
+def blob_object_key(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256}/{uuid.uuid4().hex}"
+
+
+async def acquire_blob(db: AsyncSession, sha256: str) -> Optional[str]:
+    """Takes a reference on an existing blob; returns its object key, or None on a miss."""
+    result = await db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(ref_count=StoredBlob.ref_count + 1)
+        .returning(StoredBlob.object_key)
+    )
+    return result.scalar_one_or_none()
+
+
+async def register_blob(db: AsyncSession, sha256: str, size: int, object_key: str) -> str:
+    """
+    Records a newly stored object as the blob for sha256 (one reference).
+    If another request registered the same content first, takes a reference
+    on that blob instead and returns its key — the caller's object is then
+    redundant.
+    """
+    try:
+        async with db.begin_nested():
+            db.add(StoredBlob(sha256=sha256, object_key=object_key, size=size, ref_count=1))
+    except IntegrityError:
+        return await acquire_blob(db, sha256)
+    return object_key
+
+
+async def release_blob(db: AsyncSession, sha256: str) -> Optional[str]:
+    """
+    Drops one reference. Returns the object key to delete when it was the
+    last one (delete it after the transaction commits), else None.
+    """
+    result = await db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(ref_count=StoredBlob.ref_count - 1)
+        .returning(StoredBlob.ref_count, StoredBlob.object_key)
+    )
+    row = result.first()
+    if row is None or row.ref_count > 0:
+        return None
+    await db.execute(delete(StoredBlob).where(StoredBlob.sha256 == sha256).where(StoredBlob.ref_count <= 0))
+    return row.object_key
+
+
+async def store_uploads(db: AsyncSession, files: list[UploadFile]) -> list[tuple[str, str, bool]]:
+    """
+    Stores uploads content-addressed: all files are size-checked and hashed
+    concurrently, known contents just gain a reference, and only new
+    contents are uploaded (concurrently). All or nothing — if an upload
+    fails, the objects this call wrote are deleted and the error is raised.
+
+    Returns:
+        [(object_key, sha256_hex, created)] in the order of `files`;
+        created is True when this call wrote the object (the caller must
+        delete it if its transaction fails).
+    """
+    hashes = await asyncio.gather(*(hash_upload(file) for file in files))
+
+    # One session: reference updates run one after another
+    keys = [await acquire_blob(db, sha256) for sha256, _ in hashes]
+    misses   = [i for i, key in enumerate(keys) if key is None]
+    new_keys = {i: blob_object_key(hashes[i][0]) for i in misses}
+
+    results = await asyncio.gather(
+        *(store_upload(files[i], new_keys[i]) for i in misses), return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        stored = [new_keys[i] for i, r in zip(misses, results) if not isinstance(r, BaseException)]
+        await delete_files_from_storage_async(stored)
+        raise errors[0]
+
+    redundant = []
+    for i in misses:
+        sha256, size = hashes[i]
+        keys[i] = await register_blob(db, sha256, size, new_keys[i])
+        if keys[i] != new_keys[i]:
+            redundant.append(new_keys[i])
+    await delete_files_from_storage_async(redundant)
+
+    if len(misses) < len(files):
+        logger.info("Deduplicated %d of %d uploaded files", len(files) - len(misses), len(files))
+    return [(keys[i], hashes[i][0], i in misses and keys[i] == new_keys[i]) for i in range(len(files))]
@@ -0,0 +1,77 @@
+import gzip
+import json
+import logging
+from typing import Optional
+
+from app.services.file_service import read_from_storage, put_bytes_to_storage, delete_prefix_from_storage
+
+logger = logging.getLogger(__name__)
+
+
+# ── Analysis checkpoints ──────────────────────────────────────────────────────
+# Intermediate results of one submission's analysis, so a retry resumes from
+# the last completed stage instead of starting over:
+#   checkpoints/{submission_id}/extracted-{ALGORITHM_VERSION}.json.gz    both texts
+#   checkpoints/{submission_id}/prepared-{ALGORITHM_VERSION}.json.gz     both prepared files
+#   checkpoints/{submission_id}/metrics-{ALGORITHM_VERSION}.json.gz      {metric: output} so far
+# Deduplicated uploads skip the first two: their sidecars already are them.
+# Checkpoints are removed once the submission reaches a final state.
+
+STAGE_EXTRACTED = "extracted"
+STAGE_PREPARED  = "prepared"
+STAGE_METRICS   = "metrics"
+
+
+def checkpoint_prefix(submission_id: int) -> str:
+    return f"checkpoints/{submission_id}/"
+
+
+def checkpoint_key(submission_id: int, stage: str) -> str:
+    from app.services.engine_bridge import ALGORITHM_VERSION
+
+    return f"{checkpoint_prefix(submission_id)}{stage}-{ALGORITHM_VERSION}.json.gz"
+
+
+def _jsonable(value):
+    # numpy scalars (e.g. from the embedding metric)
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def load_checkpoint(submission_id: int, stage: str) -> Optional[dict]:
+    """The stage's saved data, or None if it hasn't completed (or can't be read)."""
+    try:
+        data = read_from_storage(checkpoint_key(submission_id, stage))
+    except Exception as e:
+        logger.warning("Could not read checkpoint %s of submission %d: %s", stage, submission_id, e)
+        return None
+    return None if data is None else json.loads(gzip.decompress(data))
+
+
+def save_checkpoint(submission_id: int, stage: str, data: dict) -> None:
+    # A lost checkpoint only costs a retry the work it would have saved
+    try:
+        raw = json.dumps(data, default=_jsonable).encode("utf-8")
+        put_bytes_to_storage(checkpoint_key(submission_id, stage), gzip.compress(raw, compresslevel=6), "application/json")
+    except Exception as e:
+        logger.warning("Could not save checkpoint %s of submission %d: %s", stage, submission_id, e)
+
+
+def clear_checkpoints(submission_id: int) -> None:
+    """Removes every checkpoint of the submission; best effort."""
+    try:
+        delete_prefix_from_storage(checkpoint_prefix(submission_id))
+    except Exception as e:
+        logger.warning("Could not remove checkpoints of submission %d: %s", submission_id, e)
+
+
+def strip_code(prepared: Optional[dict]) -> Optional[dict]:
+    """A prepared file without its code (it's the extracted text), as stored."""
+    return None if prepared is None else {k: v for k, v in prepared.items() if k != "code"}
+
+
+def restore_code(prepared: Optional[dict], text: str, mode: str) -> Optional[dict]:
+    if prepared is not None and mode == "code":
+        prepared["code"] = text
+    return prepared
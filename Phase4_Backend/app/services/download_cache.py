@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.services.file_service import download_file_from_storage, get_storage_client
+
+logger = logging.getLogger(__name__)
+
+
+# ── Worker-local download cache ───────────────────────────────────────────────
+# Originals fetched by the worker are streamed to a content-addressed
+# directory on local disk (keyed by the upload's SHA-256, or by the object
+# key for submissions stored before deduplication), so repeated and retried
+# tasks on the same node skip the network. Least recently used files are
+# evicted once the directory exceeds DOWNLOAD_CACHE_MAX_MB. Every process of
+# the node shares the directory: files appear by atomic rename only.
+
+class DownloadCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root      = root
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.misses    = 0
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached file, marked as just used; None on a miss."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, fill) -> str:
+        """Writes a new entry with fill(file_object) and returns its path."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                fill(f)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: str = None) -> None:
+        """Removes least recently used entries until the total fits max_bytes."""
+        entries = []
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, full))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if full == keep:
+                continue
+            try:
+                os.remove(full)     # a reader with the file open/mapped keeps its copy
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache        = None
+_cache_pid    = None
+_executor     = None
+_executor_pid = None
+_lock         = threading.Lock()
+
+
+def get_download_cache() -> Optional[DownloadCache]:
+    """This process's cache, or None when DOWNLOAD_CACHE_MAX_MB is 0."""
+    global _cache, _cache_pid
+    if settings.DOWNLOAD_CACHE_MAX_MB <= 0:
+        return None
+    if _cache is None or _cache_pid != os.getpid():
+        with _lock:
+            if _cache is None or _cache_pid != os.getpid():
+                _cache     = DownloadCache(settings.DOWNLOAD_CACHE_DIR, settings.DOWNLOAD_CACHE_MAX_MB * 1024 * 1024)
+                _cache_pid = os.getpid()
+    return _cache
+
+
+def _read(path: str) -> Union[bytes, mmap.mmap]:
+    # Large files are mapped read-only instead of copied into memory; the
+    # mapping stays valid even if the file is evicted meanwhile
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= settings.DOWNLOAD_MMAP_MIN_MB * 1024 * 1024:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+
+def fetch(object_key: str, sha256: str = None) -> Union[bytes, mmap.mmap]:
+    """
+    The stored object's content, from the local cache when possible. Misses
+    are streamed to disk in chunks, not read into memory first. Returns
+    bytes, or a read-only mmap for files of DOWNLOAD_MMAP_MIN_MB and more
+    (extract_text accepts both).
+    """
+    cache = get_download_cache()
+    if cache is None:
+        return download_file_from_storage(object_key)
+
+    key  = sha256 or hashlib.sha256(object_key.encode("utf-8")).hexdigest()
+    path = cache.get(key)
+    if path is None:
+        def download(f):
+            try:
+                get_storage_client().download_fileobj(settings.STORAGE_BUCKET_NAME, object_key, f)
+            except ClientError as e:
+                logger.error("Storage download failed for key=%s: %s", object_key, e)
+                raise RuntimeError(f"Could not retrieve file from storage: {object_key}")
+        path = cache.put(key, download)
+    return _read(path)
+
+
+def run_concurrently(calls: list) -> list:
+    """
+    Runs [(func, *args)] on this process's download threads and returns
+    the results in order (the first exception is raised).
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor     = ThreadPoolExecutor(max_workers=4, thread_name_prefix="download")
+                _executor_pid = os.getpid()
+    futures = [_executor.submit(func, *args) for func, *args in calls]
+    return [future.result() for future in futures]
@@ -3,6 +3,8 @@ import sys
 import os
 from typing import Optional
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +31,10 @@ _ensure_root_on_path()
 # These imports will only succeed if the root path setup above worked correctly
 
 try:
-    from Phase3_Unified.engine.unified_analyzer import analyze_submission
+    from Phase3_Unified.engine.unified_analyzer import analyze_submission, build_partial_response
+    from Phase3_Unified.engine.batch_analyzer import prepare_documents
+    from Phase3_Unified.engine.result_cache import ALGORITHM_VERSION, ResultCache, RedisTier
+    from Phase3_Unified.engine.stage_timer import StageTimer
     logger.info("Successfully imported Phase3 unified engine")
 except ImportError as e:
     logger.critical(
@@ -40,6 +45,27 @@ except ImportError as e:
     raise
 
 
+# ── Result Cache ──────────────────────────────────────────────────────────────
+_result_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Per-process cache: a local LRU in front of Redis (shared by all workers).
+    Created on first use, so a forked worker builds its own Redis connection.
+    """
+    global _result_cache
+    if _result_cache is None:
+        import redis
+
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        _result_cache = ResultCache(
+            local_size = settings.RESULT_CACHE_LOCAL_SIZE,
+            shared     = RedisTier(client, ttl=settings.RESULT_CACHE_TTL_SECONDS),
+        )
+    return _result_cache
+
+
 # ── Bridge Function ───────────────────────────────────────────────────────────
 def run_analysis(
     text1:          str,
@@ -47,10 +73,21 @@ def run_analysis(
     mode:           str,
     lang1_override: Optional[str] = None,
     lang2_override: Optional[str] = None,
+    use_semantic:   bool          = False,
+    filename1:      Optional[str] = None,
+    filename2:      Optional[str] = None,
+    timings:        bool          = False,
+    trace_memory:   bool          = False,
+    prepared1:      Optional[dict] = None,
+    prepared2:      Optional[dict] = None,
+    completed_metrics: Optional[dict] = None,
+    on_metric       = None,
 ) -> dict:
     """
     Thin wrapper around Phase3's analyze_submission().
     Called by the Celery worker — runs synchronously in the worker process.
+    With RESULT_CACHE_ENABLED, identical pairs (same contents and options,
+    in either order) are served from the result cache.
 
     Args:
         text1:          Extracted text/code content of file 1
@@ -58,10 +95,21 @@ def run_analysis(
         mode:           'text' or 'code'
         lang1_override: Optional forced language for file 1
         lang2_override: Optional forced language for file 2
+        use_semantic:   Add the embedding metric (code mode only)
+        filename1:      Uploaded name of file 1 (extension fallback for language detection)
+        filename2:      Uploaded name of file 2
+        timings:        Return per-stage timings (timings block)
+        trace_memory:   Also sample tracemalloc peak memory per stage
+        prepared1:      Optional prepared file 1 (see prepare_document), e.g. from a sidecar
+        prepared2:      Optional prepared file 2
+        completed_metrics: Optional {metric: output} from an earlier attempt (not re-run)
+        on_metric:      Optional on_metric(name, output) callback as each metric finishes
 
     Returns:
         dict with keys:
             mode, language, scores (dict), final_similarity, risk_level
+            (plus cache: hit, tier, hits, misses when the cache is enabled,
+            and timings when requested)
 
     Raises:
         ValueError: if mode is invalid
@@ -81,17 +129,94 @@ def run_analysis(
         mode, lang1_override, lang2_override, len(text1), len(text2)
     )
 
-    result = analyze_submission(
+    if settings.RESULT_CACHE_ENABLED:
+        analyze = get_result_cache().analyze_submission
+    else:
+        analyze = analyze_submission
+
+    result = analyze(
         input1         = text1,
         input2         = text2,
         mode           = mode,
         lang1_override = lang1_override,
         lang2_override = lang2_override,
+        use_semantic   = use_semantic,
+        filename1      = filename1,
+        filename2      = filename2,
+        timings        = timings,
+        trace_memory   = trace_memory,
+        prepared1      = prepared1,
+        prepared2      = prepared2,
+        completed_metrics = completed_metrics,
+        on_metric      = on_metric,
     )
 
     logger.info(
-        "Analysis complete — final_similarity=%.4f | risk=%s",
-        result["final_similarity"], result["risk_level"]
+        "Analysis complete — final_similarity=%.4f | risk=%s | cache=%s",
+        result["final_similarity"], result["risk_level"], result.get("cache", {}).get("tier")
     )
 
-    return result
\ No newline at end of file
+    return result
+
+
+def prepare_document(
+    text:          str,
+    mode:          str,
+    lang_override: Optional[str] = None,
+    filename:      Optional[str] = None,
+) -> dict:
+    """
+    The engine's per-file preparation (clean, tokenize, normalize; language
+    detection in code mode), as analyze_submission would do it for this file.
+    """
+    languages = {"doc": lang_override} if lang_override else None
+    return prepare_documents({"doc": text}, mode, languages=languages, filenames={"doc": filename})["doc"]
+
+
+# ── Worker Warm-up ────────────────────────────────────────────────────────────
+WARM_UP_TEXTS = (
+    "The students compared several sorting algorithms and measured their running times.",
+    "Several sorting algorithms were compared by the students, who measured running times.",
+)
+WARM_UP_CODE = (
+    "def total(values):\n    result = 0\n    for v in values:\n        result += v\n    return result\n",
+    "def sum_all(items):\n    acc = 0\n    for item in items:\n        acc += item\n    return acc\n",
+)
+
+
+def warm_up_engine() -> dict:
+    """
+    Loads what the first analysis would otherwise load lazily: the WordNet
+    corpus (stopwords load on import), every lexer's token regex, and the
+    scikit-learn / AST / bytecode code paths, via one tiny text and one
+    tiny Python comparison (inline: too small for the metric process pool).
+    Returns the StageTimer timings.
+    """
+    from Phase1_Text.algorithms.cosine import lemmatizer
+    from Phase2_Code.code_preprocess.lexer_registry import LEXERS, token_regex
+
+    timer = StageTimer()
+    with timer.stage("corpora"):
+        lemmatizer.lemmatize("warming")
+    with timer.stage("lexers"):
+        for lang in LEXERS:
+            token_regex(lang)
+    with timer.stage("warm_up_text"):
+        analyze_submission(*WARM_UP_TEXTS, mode="text")
+    with timer.stage("warm_up_code"):
+        analyze_submission(*WARM_UP_CODE, mode="code", filename1="a.py", filename2="b.py")
+    return timer.as_dict()
+
+
+def warm_up_semantic_model() -> None:
+    """
+    Loads the embedding model into this process ahead of the first task.
+    Falls back cleanly (metric reported as None) if the model isn't on disk.
+    """
+    from Phase2_Code.algorithms.semantic_embedding import warm_up
+
+    stats = warm_up()
+    if stats["available"]:
+        logger.info("Semantic model warmed up in %.0fms", stats["model_load_ms"])
+    else:
+        logger.warning("Semantic model not available locally — metric will be skipped")
@@ -1,13 +1,21 @@
 import io
-import uuid
+import os
+import hashlib
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from fastapi import UploadFile, HTTPException, status
-from pypdf import PdfReader
 from docx import Document
 
 from app.core.config import settings
+from app.services.pdf_extraction import extract_pdf_pages
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +24,37 @@ ALLOWED_TEXT_EXTENSIONS = {".txt", ".pdf", ".docx"}
 ALLOWED_CODE_EXTENSIONS = {".py", ".java", ".cpp", ".c", ".js", ".ts", ".cs", ".go", ".rb"}
 ALL_ALLOWED_EXTENSIONS  = ALLOWED_TEXT_EXTENSIONS | ALLOWED_CODE_EXTENSIONS
 
+# Uploads are read (size check + hash) and sent to storage in chunks of this size
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Files above the threshold go to storage as an S3 multipart upload, one
+# part at a time (the call already runs on a storage thread)
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold = 8 * 1024 * 1024,
+    multipart_chunksize = 8 * 1024 * 1024,
+    use_threads         = False,
+)
+
 
 # ── S3 / MinIO Client ─────────────────────────────────────────────────────────
-def get_storage_client():
-    """
-    Returns a boto3 S3 client configured for either MinIO (local)
-    or AWS S3 (production) based on settings.
-    """
+# Building a boto3 client (endpoint resolution, credential chain, service
+# model loading) costs tens of milliseconds and a few MB, so each process
+# keeps one. Clients are thread-safe; the cache is keyed by PID so a forked
+# Celery child builds its own instead of sharing the parent's sockets.
+_client      = None
+_client_pid  = None
+_client_lock = threading.Lock()
+
+
+def _build_storage_client():
     kwargs = dict(
         aws_access_key_id     = settings.STORAGE_ACCESS_KEY,
         aws_secret_access_key = settings.STORAGE_SECRET_KEY,
         use_ssl               = settings.STORAGE_USE_SSL,
+        config                = Config(
+            max_pool_connections = settings.STORAGE_MAX_POOL_CONNECTIONS,
+            retries              = {"max_attempts": 3, "mode": "standard"},
+        ),
     )
     # If STORAGE_ENDPOINT is set, we're using MinIO
     if settings.STORAGE_ENDPOINT:
@@ -35,6 +63,56 @@ def get_storage_client():
     return boto3.client("s3", **kwargs)
 
 
+def get_storage_client():
+    """
+    Returns this process's boto3 S3 client, configured for either MinIO
+    (local) or AWS S3 (production) based on settings. Created on first use,
+    with a connection pool of STORAGE_MAX_POOL_CONNECTIONS.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client     = _build_storage_client()
+                _client_pid = os.getpid()
+    return _client
+
+
+# ── Non-blocking storage I/O ──────────────────────────────────────────────────
+# boto3 is blocking: async routes hand storage calls to this bounded pool so
+# a slow MinIO/S3 request never stalls the event loop. The pool is no larger
+# than the client's connection pool, so threads never wait on a connection.
+_io_executor      = None
+_io_executor_lock = threading.Lock()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers        = min(settings.STORAGE_IO_THREADS, settings.STORAGE_MAX_POOL_CONNECTIONS),
+                    thread_name_prefix = "storage-io",
+                )
+    return _io_executor
+
+
+async def run_storage_io(func, *args):
+    """Awaits func(*args) on the storage thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_executor(), func, *args)
+
+
+def shutdown_storage_io() -> None:
+    """Waits for in-flight storage calls; called on app shutdown."""
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=True)
+            _io_executor = None
+
+
 def ensure_bucket_exists():
     """Creates the storage bucket if it doesn't exist (MinIO only)."""
     client = get_storage_client()
@@ -52,7 +130,6 @@ def validate_file(file: UploadFile, mode: str) -> str:
     Returns the file extension on success.
     Raises HTTPException on failure.
     """
-    import os
     ext = os.path.splitext(file.filename or "")[1].lower()
 
     if mode == "text" and ext not in ALLOWED_TEXT_EXTENSIONS:
@@ -71,24 +148,43 @@ def validate_file(file: UploadFile, mode: str) -> str:
 
 
 # ── Text Extraction ───────────────────────────────────────────────────────────
+# Bump when extract_text's output changes: cached extractions (sidecars) of
+# older versions are then ignored and files are extracted again
+EXTRACTOR_VERSION = "1"
+
+
 def extract_text_from_pdf(content: bytes) -> str:
-    """Extracts plain text from a PDF file's bytes."""
+    """
+    Extracts plain text from a PDF file's bytes, page ranges in parallel for
+    large documents (see pdf_extraction). Unreadable, image-only or too slow
+    pages are skipped; only a file that isn't a PDF at all fails.
+    """
+    return extract_pdf_with_report(content)[0]
+
+
+def extract_pdf_with_report(content) -> tuple[str, dict]:
+    """extract_text_from_pdf, plus pdf_extraction's page report."""
     try:
-        reader = PdfReader(io.BytesIO(content))
-        text   = "\n".join(page.extract_text() or "" for page in reader.pages)
-        return text.strip()
+        text, report = extract_pdf_pages(content)
     except Exception as e:
         logger.error("PDF extraction failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Could not extract text from the PDF."
         )
+    logger.info(
+        "PDF extracted: %d pages in %.2fs (%.1f pages/s, %d workers) | "
+        "skipped: %d image-only, %d over budget, %d failed",
+        report["pages"], report["seconds"], report["pages_per_second"] or 0, report["workers"],
+        report["image_only"], report["timeout"], report["error"]
+    )
+    return text.strip(), report
 
 
-def extract_text_from_docx(content: bytes) -> str:
-    """Extracts plain text from a DOCX file's bytes."""
+def extract_text_from_docx(content) -> str:
+    """Extracts plain text from a DOCX file's bytes (or read-only mmap)."""
     try:
-        doc  = Document(io.BytesIO(content))
+        doc  = Document(io.BytesIO(content))    # zipfile needs seekable(), which mmap lacks
         text = "\n".join(para.text for para in doc.paragraphs)
         return text.strip()
     except Exception as e:
@@ -99,10 +195,10 @@ def extract_text_from_docx(content: bytes) -> str:
         )
 
 
-def extract_text(content: bytes, extension: str) -> str:
+def extract_text(content, extension: str) -> str:
     """
-    Dispatcher: extracts raw text from uploaded file bytes
-    based on file extension.
+    Dispatcher: extracts raw text from uploaded file bytes (or a read-only
+    mmap of them, see download_cache) based on file extension.
     """
     if extension == ".pdf":
         return extract_text_from_pdf(content)
@@ -111,40 +207,57 @@ def extract_text(content: bytes, extension: str) -> str:
     else:
         # .txt or any code file — decode as UTF-8
         try:
-            return content.decode("utf-8")
+            return str(content, "utf-8")
         except UnicodeDecodeError:
-            return content.decode("latin-1")
+            return str(content, "latin-1")
+
+
+def extract_text_with_report(content, extension: str) -> tuple[str, Optional[dict]]:
+    """extract_text, plus the PDF page report (None for other file types)."""
+    if extension == ".pdf":
+        return extract_pdf_with_report(content)
+    return extract_text(content, extension), None
+
+
+def is_complete_extraction(report: Optional[dict]) -> bool:
+    """
+    False when pages were dropped for running over the time budget (which
+    depends on the machine's load) or failing: such text may be analysed,
+    but must not be cached as the file's extraction (sidecar, checkpoint).
+    """
+    return report is None or not (report["timeout"] or report["error"])
 
 
 # ── Upload to Storage ─────────────────────────────────────────────────────────
-async def upload_file_to_storage(file: UploadFile, user_id: int) -> tuple[str, bytes]:
+async def hash_upload(file: UploadFile) -> tuple[str, int]:
     """
-    Reads the uploaded file, validates size, uploads to MinIO/S3.
+    One pass over the upload in fixed-size chunks, without holding it in
+    memory: enforces the size limit (rejecting as soon as the running count
+    exceeds it) and computes the SHA-256. Rewinds the file afterwards.
 
     Returns:
-        (object_key, file_content_bytes)
-        object_key is the path inside the bucket — used to retrieve later.
+        (sha256_hex, size_in_bytes)
     """
-    content = await file.read()
+    # Starlette usually knows the size already: reject without reading
+    if file.size is not None and file.size > settings.max_file_size_bytes:
+        raise _file_too_large()
 
-    # Size check
-    if len(content) > settings.max_file_size_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File exceeds maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB"
-        )
+    digest = hashlib.sha256()
+    size   = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > settings.max_file_size_bytes:
+            raise _file_too_large()
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
 
-    # Generate a unique object key: users/{user_id}/{uuid}_{original_filename}
-    unique_id  = uuid.uuid4().hex
-    object_key = f"users/{user_id}/{unique_id}_{file.filename}"
 
+async def store_upload(file: UploadFile, object_key: str) -> None:
+    """Sends the upload to MinIO/S3 under object_key, from its spooled copy."""
     try:
-        client = get_storage_client()
-        client.put_object(
-            Bucket      = settings.STORAGE_BUCKET_NAME,
-            Key         = object_key,
-            Body        = content,
-            ContentType = file.content_type or "application/octet-stream",
+        await run_storage_io(
+            put_file_to_storage, object_key, file.file, file.content_type or "application/octet-stream"
         )
         logger.info("Uploaded file to storage: %s", object_key)
     except ClientError as e:
@@ -154,7 +267,27 @@ async def upload_file_to_storage(file: UploadFile, user_id: int) -> tuple[str, b
             detail="File storage service is unavailable. Please try again later."
         )
 
-    return object_key, content
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB"
+    )
+
+
+def put_file_to_storage(object_key: str, fileobj, content_type: str) -> None:
+    """
+    Blocking chunked upload from a file object (multipart above
+    UPLOAD_TRANSFER_CONFIG's threshold); async code goes through
+    store_upload.
+    """
+    get_storage_client().upload_fileobj(
+        fileobj,
+        settings.STORAGE_BUCKET_NAME,
+        object_key,
+        ExtraArgs = {"ContentType": content_type},
+        Config    = UPLOAD_TRANSFER_CONFIG,
+    )
 
 
 def download_file_from_storage(object_key: str) -> bytes:
@@ -171,6 +304,41 @@ def download_file_from_storage(object_key: str) -> bytes:
         raise RuntimeError(f"Could not retrieve file from storage: {object_key}")
 
 
+def read_from_storage(object_key: str) -> Optional[bytes]:
+    """Like download_file_from_storage, but None when the object doesn't exist."""
+    try:
+        response = get_storage_client().get_object(Bucket=settings.STORAGE_BUCKET_NAME, Key=object_key)
+        return response["Body"].read()
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return None
+        logger.error("Storage download failed for key=%s: %s", object_key, e)
+        raise RuntimeError(f"Could not retrieve file from storage: {object_key}")
+
+
+def put_bytes_to_storage(object_key: str, data: bytes, content_type: str) -> None:
+    """Blocking put of a small in-memory object (e.g. a sidecar)."""
+    get_storage_client().put_object(
+        Bucket      = settings.STORAGE_BUCKET_NAME,
+        Key         = object_key,
+        Body        = data,
+        ContentType = content_type,
+    )
+
+
+def delete_prefix_from_storage(prefix: str) -> None:
+    """Deletes every object whose key starts with prefix."""
+    client    = get_storage_client()
+    paginator = client.get_paginator("list_objects_v2")
+    try:
+        for page in paginator.paginate(Bucket=settings.STORAGE_BUCKET_NAME, Prefix=prefix):
+            keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if keys:
+                client.delete_objects(Bucket=settings.STORAGE_BUCKET_NAME, Delete={"Objects": keys})
+    except ClientError as e:
+        logger.warning("Storage delete failed for prefix=%s: %s", prefix, e)
+
+
 def delete_file_from_storage(object_key: str) -> None:
     """Deletes a file from MinIO/S3. Called when user deletes a submission."""
     try:
@@ -178,4 +346,14 @@ def delete_file_from_storage(object_key: str) -> None:
         client.delete_object(Bucket=settings.STORAGE_BUCKET_NAME, Key=object_key)
         logger.info("Deleted file from storage: %s", object_key)
     except ClientError as e:
-        logger.warning("Storage delete failed for key=%s: %s", object_key, e)
\ No newline at end of file
+        logger.warning("Storage delete failed for key=%s: %s", object_key, e)
+
+
+async def delete_file_from_storage_async(object_key: str) -> None:
+    """delete_file_from_storage for async routes (runs on the storage pool)."""
+    await run_storage_io(delete_file_from_storage, object_key)
+
+
+async def delete_files_from_storage_async(object_keys: list) -> None:
+    """Concurrent delete_file_from_storage_async; used to clean up after failures."""
+    await asyncio.gather(*(delete_file_from_storage_async(key) for key in object_keys))
\ No newline at end of file
@@ -0,0 +1,204 @@
+import io
+import logging
+import mmap
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import billiard
+from pypdf import PdfReader
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ── Page-level PDF extraction ─────────────────────────────────────────────────
+# Large PDFs are split into page ranges extracted in a process pool (pypdf is
+# pure Python, so threads wouldn't help) and reassembled in page order.
+# Image-only pages are skipped without running the text extractor, and no
+# single page may take longer than PDF_PAGE_TIME_BUDGET_SECONDS.
+
+# Below this many pages the pool's start-up costs more than it saves
+PDF_PARALLEL_MIN_PAGES = 24
+
+# Pages per pool task: small enough to balance uneven pages over the workers
+PDF_BATCH_PAGES = 8
+
+MAX_WORKERS = settings.PDF_EXTRACT_WORKERS or min(os.cpu_count() or 1, 8)
+
+# Page outcomes, counted in the extraction report
+PAGE_OK         = "ok"
+PAGE_IMAGE_ONLY = "image_only"
+PAGE_TIMEOUT    = "timeout"
+PAGE_ERROR      = "error"
+
+# Set in each pool worker by _init_pdf_worker
+_worker_reader = None
+
+
+class PageTimeout(Exception):
+    pass
+
+
+def can_use_process_pool() -> bool:
+    return MAX_WORKERS > 1
+
+
+def _pool_context():
+    """
+    multiprocessing won't start children from a daemonic process, and every
+    Celery prefork child is one; billiard (Celery's fork of multiprocessing)
+    has no such rule, so the pool's workers are started through it there.
+    """
+    if multiprocessing.current_process().daemon:
+        return billiard.get_context()
+    return None
+
+
+def _on_alarm(signum, frame):
+    raise PageTimeout()
+
+
+@contextmanager
+def _time_budget(seconds: float):
+    """
+    Interrupts the block after `seconds` with PageTimeout. Needs SIGALRM, so
+    only in a main thread (pool workers, Celery prefork / solo); elsewhere
+    the page runs unbounded.
+    """
+    if seconds <= 0 or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def is_image_only(page) -> bool:
+    """
+    True when the page can't draw any text: no fonts and no form XObjects
+    (which carry their own resources) — scanned pages, figures.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return True
+    resources = resources.get_object()
+    if "/Font" in resources:
+        return False
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        for xobject in xobjects.get_object().values():
+            if xobject.get_object().get("/Subtype") == "/Form":
+                return False
+    return True
+
+
+def _extract_range(reader: PdfReader, start: int, stop: int, budget: float) -> list:
+    """[(page_text, outcome)] for pages start..stop-1."""
+    pages = []
+    for i in range(start, stop):
+        try:
+            page = reader.pages[i]
+            if is_image_only(page):
+                pages.append(("", PAGE_IMAGE_ONLY))
+                continue
+            with _time_budget(budget):
+                text = page.extract_text() or ""
+            pages.append((text, PAGE_OK))
+        except PageTimeout:
+            logger.warning("PDF page %d exceeded the %.1fs budget, skipped", i + 1, budget)
+            pages.append(("", PAGE_TIMEOUT))
+        except Exception as e:
+            logger.warning("PDF page %d could not be extracted: %s", i + 1, e)
+            pages.append(("", PAGE_ERROR))
+    return pages
+
+
+def _init_pdf_worker(content: bytes) -> None:
+    # The PDF is sent and parsed once per worker, not once per page range
+    global _worker_reader
+    _worker_reader = PdfReader(io.BytesIO(content))
+
+
+def _extract_batch(start: int, stop: int, budget: float) -> tuple:
+    return start, _extract_range(_worker_reader, start, stop, budget)
+
+
+def _open(content) -> PdfReader:
+    # An mmap is read in place; bytes need a file object around them
+    return PdfReader(content if isinstance(content, mmap.mmap) else io.BytesIO(content))
+
+
+def _extract_parallel(content, reader: PdfReader, num_pages: int, budget: float) -> list:
+    ranges  = [(s, min(s + PDF_BATCH_PAGES, num_pages)) for s in range(0, num_pages, PDF_BATCH_PAGES)]
+    batches = {}
+    pool = ProcessPoolExecutor(
+        max_workers = min(MAX_WORKERS, len(ranges)),
+        mp_context  = _pool_context(),
+        initializer = _init_pdf_worker,
+        initargs    = (bytes(content),),    # an mmap can't be pickled
+    )
+    try:
+        futures = [pool.submit(_extract_batch, start, stop, budget) for start, stop in ranges]
+        for future in as_completed(futures):
+            start, pages = future.result()
+            batches[start] = pages
+    except BrokenProcessPool as e:
+        logger.warning("PDF worker pool broke, extracting the rest serially: %s", e)
+    finally:
+        # Joined, not left to exit on their own: workers still running when
+        # this process ends (a recycled Celery child) would be orphaned
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    # Reassemble in page order; ranges lost with a broken pool run here
+    pages = []
+    for start, stop in ranges:
+        pages.extend(batches[start] if start in batches else _extract_range(reader, start, stop, budget))
+    return pages
+
+
+def extract_pdf_pages(content) -> tuple[str, dict]:
+    """
+    Extracts a PDF's text page by page, from bytes or a read-only mmap.
+
+    Returns:
+        (text, report) where report has pages, seconds, pages_per_second,
+        workers, and the count of image_only / timeout / error pages
+
+    Raises:
+        Exception from pypdf if the file can't be opened as a PDF at all.
+    """
+    started   = time.perf_counter()
+    reader    = _open(content)
+    num_pages = len(reader.pages)
+    budget    = settings.PDF_PAGE_TIME_BUDGET_SECONDS
+
+    if num_pages >= PDF_PARALLEL_MIN_PAGES and can_use_process_pool():
+        workers = min(MAX_WORKERS, -(-num_pages // PDF_BATCH_PAGES))
+        pages   = _extract_parallel(content, reader, num_pages, budget)
+    else:
+        workers = 1
+        pages   = _extract_range(reader, 0, num_pages, budget)
+
+    seconds = time.perf_counter() - started
+    report  = {
+        "pages":            num_pages,
+        "seconds":          round(seconds, 3),
+        "pages_per_second": round(num_pages / seconds, 1) if seconds > 0 else None,
+        "workers":          workers,
+    }
+    for outcome in (PAGE_IMAGE_ONLY, PAGE_TIMEOUT, PAGE_ERROR):
+        report[outcome] = sum(1 for _, o in pages if o == outcome)
+
+    return "\n".join(text for text, _ in pages), report
@@ -0,0 +1,145 @@
+import gzip
+import json
+import logging
+import os
+from typing import Optional
+
+from app.services.file_service import (
+    EXTRACTOR_VERSION, extract_text_with_report, is_complete_extraction,
+    read_from_storage, put_bytes_to_storage, delete_prefix_from_storage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ── Sidecar artefacts ─────────────────────────────────────────────────────────
+# Per unique upload (SHA-256), gzip-compressed objects next to the blob:
+#   sidecars/{sha}/text-{ext}-x{EXTRACTOR_VERSION}.txt.gz
+#       extracted UTF-8 text
+#   sidecars/{sha}/prepared-{mode}-{ext}-{lang}-{ALGORITHM_VERSION}.json.gz
+#       the engine's prepared file (tokens etc.; the code itself is the text sidecar)
+# The versions are part of the key: a new extractor or engine version simply
+# misses and rebuilds, old sidecars go when the blob does.
+# The engine is imported lazily: the API only deletes sidecars.
+
+def sidecar_prefix(sha256: str) -> str:
+    return f"sidecars/{sha256}/"
+
+
+def text_sidecar_key(sha256: str, ext: str) -> str:
+    return f"{sidecar_prefix(sha256)}text-{ext.lstrip('.') or 'none'}-x{EXTRACTOR_VERSION}.txt.gz"
+
+
+def prepared_sidecar_key(sha256: str, ext: str, mode: str, lang_override: Optional[str]) -> str:
+    from app.services.engine_bridge import ALGORITHM_VERSION
+
+    lang = (lang_override or "auto").lower()
+    return f"{sidecar_prefix(sha256)}prepared-{mode}-{ext.lstrip('.') or 'none'}-{lang}-{ALGORITHM_VERSION}.json.gz"
+
+
+def _load(key: str) -> Optional[bytes]:
+    data = read_from_storage(key)
+    return None if data is None else gzip.decompress(data)
+
+
+def _store(key: str, data: bytes, content_type: str) -> None:
+    # A failed sidecar write only costs the next run a re-extraction
+    try:
+        put_bytes_to_storage(key, gzip.compress(data, compresslevel=6), content_type)
+    except Exception as e:
+        logger.warning("Could not store sidecar %s: %s", key, e)
+
+
+def fetch_inputs(
+    object_key:    str,
+    sha256:        str,
+    filename:      str,
+    mode:          str,
+    lang_override: Optional[str] = None,
+) -> dict:
+    """
+    The I/O half of load_or_prepare (safe to run in a thread): the text and
+    prepared sidecars that exist, and the original (via the worker's
+    download cache) when the text sidecar doesn't.
+    """
+    ext    = os.path.splitext(filename or "")[1].lower()
+    inputs = {"ext": ext, "text": None, "prepared": None, "content": None, "complete": True}
+
+    raw = _load(text_sidecar_key(sha256, ext))
+    if raw is not None:
+        inputs["text"] = raw.decode("utf-8")
+    else:
+        from app.services.download_cache import fetch
+
+        inputs["content"] = fetch(object_key, sha256)
+
+    raw = _load(prepared_sidecar_key(sha256, ext, mode, lang_override))
+    if raw is not None:
+        inputs["prepared"] = json.loads(raw)
+    return inputs
+
+
+def finish_inputs(
+    inputs:        dict,
+    sha256:        str,
+    filename:      str,
+    mode:          str,
+    lang_override: Optional[str] = None,
+) -> tuple[str, Optional[dict]]:
+    """
+    The CPU half: extracts / prepares whatever fetch_inputs found no sidecar
+    for, and writes those sidecars. Run in the main thread (the PDF page
+    time budget needs it). An incomplete extraction (pages skipped for time
+    or errors) is used for this analysis but not stored; inputs["complete"]
+    then is False.
+    """
+    ext      = inputs["ext"]
+    text     = inputs["text"]
+    complete = True
+    if text is None:
+        text, report = extract_text_with_report(inputs["content"], ext)
+        complete     = inputs["complete"] = is_complete_extraction(report)
+        if complete:
+            _store(text_sidecar_key(sha256, ext), text.encode("utf-8"), "text/plain; charset=utf-8")
+        else:
+            logger.warning("Extraction of %s skipped pages, its sidecars aren't stored", sha256)
+
+    if not text.strip():
+        return text, None
+
+    prepared = inputs["prepared"]
+    if prepared is not None:
+        if mode == "code":
+            prepared["code"] = text
+        return text, prepared
+
+    from app.services.engine_bridge import prepare_document
+
+    prepared = prepare_document(text, mode, lang_override, filename)
+    if not complete:
+        return text, prepared
+    stored   = {k: v for k, v in prepared.items() if k != "code"}
+    _store(prepared_sidecar_key(sha256, ext, mode, lang_override), json.dumps(stored).encode("utf-8"), "application/json")
+    return text, prepared
+
+
+def load_or_prepare(
+    object_key:    str,
+    sha256:        str,
+    filename:      str,
+    mode:          str,
+    lang_override: Optional[str] = None,
+) -> tuple[str, Optional[dict]]:
+    """
+    (text, prepared) for one stored upload, from its sidecars when they
+    exist for the current extractor / engine versions; otherwise the
+    original is downloaded, extracted and prepared, and the sidecars written.
+    prepared is None for empty text (the analysis rejects it anyway).
+    """
+    inputs = fetch_inputs(object_key, sha256, filename, mode, lang_override)
+    return finish_inputs(inputs, sha256, filename, mode, lang_override)
+
+
+def delete_sidecars(sha256: str) -> None:
+    """Removes every sidecar of a blob (all versions); called when the blob goes."""
+    delete_prefix_from_storage(sidecar_prefix(sha256))
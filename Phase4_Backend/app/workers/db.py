@@ -0,0 +1,94 @@
+import logging
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ── Worker-lifetime sync engine ───────────────────────────────────────────────
+# Celery runs synchronously, so we use psycopg2 (sync) not asyncpg.
+# One engine (and connection pool) per worker process, created after fork
+# by init_worker_engine and disposed at shutdown: tasks check a pooled
+# connection out instead of opening a new TCP + auth handshake each time.
+_engine       = None
+_SessionLocal = None
+_connects     = 0           # physical connections opened by this process
+_lock         = threading.Lock()
+
+
+def init_worker_engine(concurrency: int, url: str = None, **engine_kwargs) -> None:
+    """
+    Creates this process's engine, with a pool sized for `concurrency` tasks
+    running at once (1 for a prefork child, N for a thread pool).
+    settings.WORKER_DB_POOL_SIZE overrides the size when set.
+    """
+    with _lock:
+        _create_engine(concurrency, url, **engine_kwargs)
+
+
+def _create_engine(concurrency: int, url: str = None, **engine_kwargs) -> None:
+    # Caller holds _lock
+    global _engine, _SessionLocal, _connects
+    if _engine is not None:
+        _engine.dispose()
+
+    pool_size = settings.WORKER_DB_POOL_SIZE or max(concurrency, 1)
+    _engine = create_engine(
+        url or settings.SYNC_DATABASE_URL,
+        pool_pre_ping = True,
+        pool_size     = pool_size,
+        max_overflow  = settings.WORKER_DB_MAX_OVERFLOW,
+        **engine_kwargs,
+    )
+    _connects = 0
+    event.listen(_engine, "connect", _count_connect)
+    _SessionLocal = sessionmaker(bind=_engine)
+    logger.info("Worker DB engine ready (pool_size=%d)", pool_size)
+
+
+def _count_connect(dbapi_connection, connection_record) -> None:
+    global _connects
+    _connects += 1
+
+
+def dispose_worker_engine() -> None:
+    """Closes every pooled connection; called when the worker process exits."""
+    global _engine, _SessionLocal
+    with _lock:
+        if _engine is None:
+            return
+        logger.info("Disposing worker DB engine: %s", pool_stats())
+        _engine.dispose()
+        _engine = None
+        _SessionLocal = None
+
+
+def get_sync_session(concurrency: int = 1):
+    """
+    Session bound to the worker engine. Pools that don't run
+    worker_process_init (solo, threads) create the engine on first use.
+    """
+    if _SessionLocal is None:
+        with _lock:
+            if _SessionLocal is None:
+                _create_engine(concurrency)
+    return _SessionLocal()
+
+
+def pool_stats() -> dict:
+    """Pool counters for this process, e.g. for logs or health checks."""
+    if _engine is None:
+        return {"initialized": False}
+    pool = _engine.pool
+    return {
+        "initialized": True,
+        "pool_size":   pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in":  pool.checkedin(),
+        "overflow":    pool.overflow(),
+        "connects":    _connects,
+    }
@@ -1,11 +1,12 @@
+import gc
 import logging
 import time
 from datetime import datetime, timezone
 from celery import Celery
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
 
 from app.core.config import settings
+from app.workers import db as worker_db
 
 logger = logging.getLogger(__name__)
 
@@ -26,18 +27,110 @@ celery_app.conf.update(
     task_acks_late         = True,      # only ack after task completes (safer)
     worker_prefetch_multiplier = 1,     # one task per worker at a time (CPU heavy)
     result_expires         = 86400,     # results expire after 24 hours
+    worker_max_tasks_per_child = settings.WORKER_MAX_TASKS_PER_CHILD or None,
 )
 
 
 # ── Sync DB setup for Celery worker ──────────────────────────────────────────
-# Celery runs synchronously, so we use psycopg2 (sync) not asyncpg
+# See app.workers.db: one pooled engine per worker process
 def get_sync_session():
-    engine  = create_engine(settings.SYNC_DATABASE_URL, pool_pre_ping=True)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    # Solo / thread pools have no worker_process_init: size for their concurrency
+    return worker_db.get_sync_session(celery_app.conf.worker_concurrency or 1)
+
+
+# ── Worker Bootstrap ──────────────────────────────────────────────────────────
+# The engine (scikit-learn, NLTK corpora, lexers) is imported and warmed up
+# once in the worker's parent process, before the pool starts: prefork
+# children, including the ones replacing recycled children, are forked
+# already warm and share those pages copy-on-write. gc.freeze() keeps the
+# collector from writing to (and so un-sharing) them in every child.
+_preloaded = False
+
+
+def preload_engine(freeze: bool = False) -> None:
+    """Imports and warms up the engine in this process (once), logging the timings."""
+    global _preloaded
+    if _preloaded or not settings.WORKER_PRELOAD:
+        return
+
+    started = time.perf_counter()
+    from app.services import engine_bridge     # all three engines, scikit-learn, NLTK stopwords
+    import_ms = (time.perf_counter() - started) * 1000
+
+    timings = engine_bridge.warm_up_engine()
+    _preloaded = True
+    if freeze:
+        gc.freeze()
+
+    stages = {"import_engine": round(import_ms, 2)}
+    stages.update({name: stage["ms"] for name, stage in timings["stages"].items()})
+    logger.info(
+        "Engine preloaded in %.0fms: %s",
+        (time.perf_counter() - started) * 1000,
+        ", ".join(f"{name}={ms:.0f}ms" for name, ms in stages.items()),
+    )
+
+
+@worker_init.connect
+def preload_worker_parent(**kwargs):
+    """Runs in the worker's main process before the pool starts (every pool type)."""
+    preload_engine(freeze=True)
+
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """
+    Runs once in every worker process (after fork for prefork pools).
+    Creates the process's DB engine (a prefork child runs one task at a time)
+    and loads the optional embedding model so the first task doesn't pay for
+    them. The model stays per child: its native thread pools aren't fork-safe.
+    """
+    worker_db.init_worker_engine(concurrency=1)
+    preload_engine()        # no-op when forked from a preloaded parent
+    if settings.ENABLE_SEMANTIC_SIMILARITY:
+        from app.services.engine_bridge import warm_up_semantic_model
+        warm_up_semantic_model()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_worker_db(**kwargs):
+    worker_db.dispose_worker_engine()
+
+
+# ── Upload Preparation Task ───────────────────────────────────────────────────
+@celery_app.task(
+    name            = "tasks.prepare_upload",
+    ignore_result   = True,
+    soft_time_limit = 120,
+    time_limit      = 150,
+)
+def prepare_upload(
+    object_key:    str,
+    sha256:        str,
+    filename:      str,
+    mode:          str,
+    lang_override: str = None,
+):
+    """
+    Celery task: extracts and prepares a newly stored upload once and writes
+    its sidecars, so analyses (of any submission using this content) load
+    them instead. Best effort — the analysis task prepares anything missing.
+    """
+    from app.services.sidecars import load_or_prepare
+
+    try:
+        load_or_prepare(object_key, sha256, filename, mode, lang_override)
+        logger.info("Prepared sidecars for %s", object_key)
+    except Exception as exc:
+        logger.warning("Preparing %s failed (the analysis will retry): %s", object_key, exc)
 
 
 # ── Main Analysis Task ────────────────────────────────────────────────────────
+# The task runs in stages (extracted, prepared, each metric, report) whose
+# results are checkpointed per submission (see app.services.checkpoints):
+# a retry resumes from the last completed stage, and when the last attempt
+# fails too, the metrics that did finish are saved as a partial report.
 @celery_app.task(
     bind                = True,
     name                = "tasks.run_plagiarism_analysis",
@@ -60,16 +153,26 @@ def run_plagiarism_analysis(
     saves the report to DB, updates submission status.
 
     This task is dispatched by the submission API endpoint and runs
-    completely asynchronously in the Celery worker process.
+    completely asynchronously in the Celery worker process. It is
+    idempotent: a redelivered task for a submission with a report does nothing.
     """
     from app.models.submission import Submission, SubmissionStatus
-    from app.models.report import Report, RiskLevel
-    from app.services.file_service import download_file_from_storage, extract_text
-    from app.services.engine_bridge import run_analysis
+    from app.services.file_service import extract_text_with_report, is_complete_extraction
+    from app.services.engine_bridge import run_analysis, prepare_document
+    from app.services.download_cache import fetch, run_concurrently
+    from app.services.sidecars import fetch_inputs, finish_inputs
+    from app.services.checkpoints import (
+        STAGE_EXTRACTED, STAGE_PREPARED, STAGE_METRICS,
+        load_checkpoint, save_checkpoint, clear_checkpoints, strip_code, restore_code,
+    )
     import os
 
     db = get_sync_session()
-    start_time = time.time()
+    start_time  = time.time()
+    checkpoints = settings.ANALYSIS_CHECKPOINTS_ENABLED
+    metrics     = {}        # metric outputs so far: checkpointed + this attempt's
+    complete    = True      # False when extraction dropped pages: nothing is checkpointed
+    prep1 = prep2 = None
 
     try:
         # ── 1. Mark as PROCESSING ─────────────────────────────────────────────
@@ -77,54 +180,127 @@ def run_plagiarism_analysis(
         if not submission:
             logger.error("Submission %d not found in DB", submission_id)
             return
+        if submission.report is not None:
+            # Redelivered after the report was saved (acks_late): nothing left to do
+            logger.info("Submission %d already has a report, skipping", submission_id)
+            return
+
+        if submission.status != SubmissionStatus.PROCESSING:
+            submission.status = SubmissionStatus.PROCESSING
+            db.commit()
+        logger.info("Task started for submission_id=%d (attempt %d)", submission_id, self.request.retries + 1)
 
-        submission.status = SubmissionStatus.PROCESSING
-        db.commit()
-        logger.info("Task started for submission_id=%d", submission_id)
+        # ── 2+3. Download files and extract text ─────────────────────────────
+        # Both files are fetched concurrently: sidecars (extracted text and
+        # prepared files of deduplicated uploads), or originals through the
+        # node's download cache. Extraction / preparation of anything without
+        # a sidecar then runs here, in the main thread.
+        stages  = {}
+        resumed = []
+        if settings.SIDECARS_ENABLED and submission.file1_sha256:
+            sides = [
+                (file1_path, submission.file1_sha256, submission.file1_name, lang1_override),
+                (file2_path, submission.file2_sha256, submission.file2_name, lang2_override),
+            ]
+            stage_start = time.perf_counter()
+            inputs = run_concurrently([
+                (fetch_inputs, key, sha, name, mode, lang) for key, sha, name, lang in sides
+            ])
+            stages["sidecars"] = (time.perf_counter() - stage_start) * 1000
 
-        # ── 2. Download files from storage ────────────────────────────────────
-        file1_bytes = download_file_from_storage(file1_path)
-        file2_bytes = download_file_from_storage(file2_path)
+            stage_start = time.perf_counter()
+            (text1, prep1), (text2, prep2) = [
+                finish_inputs(side_inputs, sha, name, mode, lang)
+                for side_inputs, (_, sha, name, lang) in zip(inputs, sides)
+            ]
+            stages["prepare_missing"] = (time.perf_counter() - stage_start) * 1000
+            complete = all(side_inputs["complete"] for side_inputs in inputs)
+        else:
+            # Older submissions have no sidecars: their own checkpoints instead
+            saved = load_checkpoint(submission_id, STAGE_PREPARED) if checkpoints else None
+            if saved is not None:
+                text1, text2 = saved["texts"]
+                prep1 = restore_code(saved["prepared"][0], text1, mode)
+                prep2 = restore_code(saved["prepared"][1], text2, mode)
+                resumed.append(STAGE_PREPARED)
+            else:
+                saved = load_checkpoint(submission_id, STAGE_EXTRACTED) if checkpoints else None
+                if saved is not None:
+                    text1, text2 = saved["texts"]
+                    resumed.append(STAGE_EXTRACTED)
+                else:
+                    stage_start = time.perf_counter()
+                    file1_bytes, file2_bytes = run_concurrently([(fetch, file1_path), (fetch, file2_path)])
+                    stages["download"] = (time.perf_counter() - stage_start) * 1000
 
-        # ── 3. Extract text ───────────────────────────────────────────────────
-        ext1  = os.path.splitext(submission.file1_name)[1].lower()
-        ext2  = os.path.splitext(submission.file2_name)[1].lower()
-        text1 = extract_text(file1_bytes, ext1)
-        text2 = extract_text(file2_bytes, ext2)
+                    stage_start = time.perf_counter()
+                    ext1  = os.path.splitext(submission.file1_name)[1].lower()
+                    ext2  = os.path.splitext(submission.file2_name)[1].lower()
+                    text1, report1 = extract_text_with_report(file1_bytes, ext1)
+                    text2, report2 = extract_text_with_report(file2_bytes, ext2)
+                    stages["extract"] = (time.perf_counter() - stage_start) * 1000
+                    # Text missing pages (time budget, errors) is never checkpointed:
+                    # a retry extracts again rather than keep the truncated text
+                    complete = is_complete_extraction(report1) and is_complete_extraction(report2)
+                    if checkpoints and complete:
+                        save_checkpoint(submission_id, STAGE_EXTRACTED, {"texts": [text1, text2]})
+
+                if checkpoints and complete and text1.strip() and text2.strip():
+                    stage_start = time.perf_counter()
+                    prep1 = prepare_document(text1, mode, lang1_override, submission.file1_name)
+                    prep2 = prepare_document(text2, mode, lang2_override, submission.file2_name)
+                    stages["prepare"] = (time.perf_counter() - stage_start) * 1000
+                    save_checkpoint(submission_id, STAGE_PREPARED, {
+                        "texts":    [text1, text2],
+                        "prepared": [strip_code(prep1), strip_code(prep2)],
+                    })
 
         # ── 4. Run engine ─────────────────────────────────────────────────────
+        # Metrics finished by an earlier attempt aren't run again; each new
+        # one is checkpointed as soon as it finishes (not for truncated text)
+        resumable = checkpoints and complete
+        if resumable:
+            metrics = load_checkpoint(submission_id, STAGE_METRICS) or {}
+            if metrics:
+                resumed.append(f"{STAGE_METRICS} ({', '.join(sorted(metrics))})")
+        if resumed:
+            logger.info("Submission %d resumed from checkpoints: %s", submission_id, "; ".join(resumed))
+
+        def checkpoint_metric(name, output):
+            metrics[name] = output
+            if resumable:
+                save_checkpoint(submission_id, STAGE_METRICS, metrics)
+
         result = run_analysis(
             text1          = text1,
             text2          = text2,
             mode           = mode,
             lang1_override = lang1_override,
             lang2_override = lang2_override,
+            use_semantic   = settings.ENABLE_SEMANTIC_SIMILARITY,
+            filename1      = submission.file1_name,
+            filename2      = submission.file2_name,
+            timings        = settings.ENGINE_TIMINGS,
+            trace_memory   = settings.ENGINE_TRACE_MEMORY,
+            prepared1      = prep1,
+            prepared2      = prep2,
+            completed_metrics = dict(metrics) or None,
+            on_metric      = checkpoint_metric,
         )
 
         # ── 5. Calculate processing time ──────────────────────────────────────
         processing_ms = int((time.time() - start_time) * 1000)
 
-        # ── 6. Save report ────────────────────────────────────────────────────
-        scores = result.get("scores", {})
-        report = Report(
-            submission_id      = submission_id,
-            language           = result.get("language"),
-            jaccard_score      = scores.get("jaccard"),
-            cosine_score       = scores.get("cosine"),
-            lcs_score          = scores.get("lcs"),
-            winnowing_score    = scores.get("winnowing"),
-            ast_score          = scores.get("ast"),
-            final_similarity   = result["final_similarity"],
-            risk_level         = result["risk_level"],
-            processing_time_ms = processing_ms,
-            algorithm_version  = "1.0.0",
-        )
-        db.add(report)
+        timings = result.get("timings")
+        if timings is not None:
+            # Engine stages plus the worker's own I/O stages
+            for name, ms in stages.items():
+                timings["stages"][name] = {"ms": round(ms, 2)}
 
-        # ── 7. Mark submission COMPLETED ──────────────────────────────────────
-        submission.status       = SubmissionStatus.COMPLETED
-        submission.completed_at = datetime.now(timezone.utc)
-        db.commit()
+        # ── 6+7. Save report, mark submission COMPLETED ──────────────────────
+        _save_report(db, submission, result, processing_ms, timings)
+        if checkpoints:
+            clear_checkpoints(submission_id)
 
         logger.info(
             "Analysis complete for submission_id=%d | "
@@ -136,6 +312,18 @@ def run_plagiarism_analysis(
     except Exception as exc:
         db.rollback()
         logger.exception("Task failed for submission_id=%d: %s", submission_id, exc)
+        last_attempt = self.request.retries >= self.max_retries
+
+        # Out of retries: whatever metrics finished still make a (partial) report
+        if last_attempt and metrics:
+            langs = [
+                prep["lang"] if prep is not None and "lang" in prep else (lang or "").lower() or None
+                for prep, lang in ((prep1, lang1_override), (prep2, lang2_override))
+            ]
+            if _save_partial_report(db, submission_id, mode, metrics, langs, start_time, exc):
+                if checkpoints:
+                    clear_checkpoints(submission_id)
+                return
 
         # Mark submission as FAILED
         try:
@@ -147,8 +335,75 @@ def run_plagiarism_analysis(
         except Exception as db_exc:
             logger.error("Failed to update submission status to FAILED: %s", db_exc)
 
+        if last_attempt and checkpoints:
+            clear_checkpoints(submission_id)
+
         # Retry if we haven't exceeded max_retries
         raise self.retry(exc=exc)
 
     finally:
-        db.close()
\ No newline at end of file
+        db.close()     # returns the connection to the worker's pool
+        logger.debug("Worker DB pool: %s", worker_db.pool_stats())
+
+
+def _save_report(db, submission, result: dict, processing_ms: int, timings: dict = None) -> None:
+    """Saves the report for an engine result (full or partial) and completes the submission."""
+    from app.models.submission import SubmissionStatus
+    from app.models.report import Report
+    from Phase3_Unified.engine.result_cache import ALGORITHM_VERSION
+
+    scores = result.get("scores", {})
+    report = Report(
+        submission_id      = submission.id,
+        language           = result.get("language"),
+        jaccard_score      = scores.get("jaccard"),
+        cosine_score       = scores.get("cosine"),
+        lcs_score          = scores.get("lcs"),
+        winnowing_score    = scores.get("winnowing"),
+        ast_score          = scores.get("ast"),
+        semantic_score     = scores.get("semantic"),
+        final_similarity   = result["final_similarity"],
+        risk_level         = result["risk_level"],
+        partial            = result.get("partial", False),
+        missing_metrics    = result.get("missing_metrics"),
+        processing_time_ms = processing_ms,
+        timings            = timings,
+        algorithm_version  = ALGORITHM_VERSION,
+    )
+    db.add(report)
+
+    submission.status       = SubmissionStatus.COMPLETED
+    submission.completed_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def _save_partial_report(db, submission_id: int, mode: str, metrics: dict, langs: list,
+                         start_time: float, exc: Exception) -> bool:
+    """
+    Saves a partial report from the finished metrics; the error stays on the
+    submission. False when there's nothing to report or it couldn't be saved.
+    """
+    from app.models.submission import Submission
+    from app.services.engine_bridge import build_partial_response
+
+    try:
+        result = build_partial_response(mode, metrics, *langs, use_semantic=settings.ENABLE_SEMANTIC_SIMILARITY)
+    except ValueError:
+        return False
+
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        if submission is None or submission.report is not None:
+            return False
+        submission.error_message = str(exc)[:1024]
+        _save_report(db, submission, result, int((time.time() - start_time) * 1000))
+    except Exception as db_exc:
+        db.rollback()
+        logger.error("Failed to save the partial report: %s", db_exc)
+        return False
+
+    logger.warning(
+        "Saved a partial report for submission_id=%d | similarity=%.4f | missing=%s",
+        submission_id, result["final_similarity"], result["missing_metrics"]
+    )
+    return True
@@ -0,0 +1,113 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.core.database import Base
+from app.models.stored_blob import StoredBlob
+from app.services.blob_store import store_uploads, release_blob
+from conftest import PUT_DELAY
+
+
+def upload(content: bytes, name: str = "main.py") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=name)
+
+
+@pytest.fixture
+def run_db(tmp_path):
+    """run_db(fn) runs `await fn(session)` in one committed transaction."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'blobs.db'}"
+
+    def run(fn):
+        async def scenario():
+            engine = create_async_engine(url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            try:
+                async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                    try:
+                        result = await fn(session)
+                        await session.commit()
+                        return result
+                    except Exception:
+                        await session.rollback()
+                        raise
+            finally:
+                await engine.dispose()
+        return asyncio.run(scenario())
+
+    return run
+
+
+async def blobs(session) -> list:
+    return (await session.execute(select(StoredBlob))).scalars().all()
+
+
+def test_duplicate_content_is_stored_once(s3, run_db):
+    first  = run_db(lambda db: store_uploads(db, [upload(b"starter code")]))
+    second = run_db(lambda db: store_uploads(db, [upload(b"starter code", "other.py")]))
+
+    assert s3.puts == 1
+    assert first[0][0] == second[0][0]
+    assert (first[0][2], second[0][2]) == (True, False)
+    [blob] = run_db(blobs)
+    assert blob.ref_count == 2
+
+
+def test_same_content_twice_in_one_request(s3, run_db):
+    stored = run_db(lambda db: store_uploads(db, [upload(b"same"), upload(b"same")]))
+
+    assert stored[0][0] == stored[1][0]
+    assert len(s3.objects) == 1          # the redundant copy was deleted
+    [blob] = run_db(blobs)
+    assert blob.ref_count == 2
+
+
+def test_release_deletes_only_at_zero(s3, run_db):
+    [(key, sha, _)] = run_db(lambda db: store_uploads(db, [upload(b"shared")]))
+    run_db(lambda db: store_uploads(db, [upload(b"shared")]))
+
+    assert run_db(lambda db: release_blob(db, sha)) is None
+    assert run_db(lambda db: release_blob(db, sha)) == key
+    assert run_db(blobs) == []
+
+
+def test_both_files_upload_concurrently(s3, run_db):
+    def sequential(db):
+        async def go():
+            start = time.perf_counter()
+            for _ in range(2):
+                await store_uploads(db, [upload(os.urandom(1000))])
+            return time.perf_counter() - start
+        return go()
+
+    def concurrent(db):
+        async def go():
+            start = time.perf_counter()
+            await store_uploads(db, [upload(os.urandom(1000)), upload(os.urandom(1000))])
+            return time.perf_counter() - start
+        return go()
+
+    # Warm the client and its connections first, then best of 3
+    run_db(concurrent)
+    before = min(run_db(sequential) for _ in range(3))
+    after  = min(run_db(concurrent) for _ in range(3))
+    print(f"two uploads: sequential {before * 1000:.0f} ms, concurrent {after * 1000:.0f} ms")
+
+    assert before >= 2 * PUT_DELAY
+    assert after < 1.5 * PUT_DELAY
+
+
+def test_failed_upload_cleans_up_the_other(s3, run_db):
+    with pytest.raises(HTTPException) as exc:
+        run_db(lambda db: store_uploads(db, [upload(b"ok", "good.py"), upload(b"reject me", "bad.py")]))
+
+    assert exc.value.status_code == 503
+    # good.py was stored, then deleted by the compensating delete
+    assert s3.objects == {}
+    assert run_db(blobs) == []
@@ -0,0 +1,98 @@
+import pytest
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Submission, SubmissionMode, SubmissionStatus, User, Report
+from app.services import file_service
+from app.workers import db as worker_db
+from app.workers.tasks import run_plagiarism_analysis
+from Phase3_Unified.engine.metric_registry import get_metric
+
+CODE1 = b"def add(a, b):\n    return a + b\n\nprint(add(1, 2))\n"
+CODE2 = b"def add(x, y):\n    return x + y\n\nprint(add(3, 4))\n"
+
+
+@pytest.fixture
+def database(s3, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "SIDECARS_ENABLED", False)
+    worker_db.init_worker_engine(concurrency=1, url=f"sqlite:///{tmp_path / 'worker.db'}")
+    Base.metadata.create_all(worker_db._engine, tables=[User.__table__, Submission.__table__, Report.__table__])
+
+    file_service.put_bytes_to_storage("uploads/a.py", CODE1, "text/x-python")
+    file_service.put_bytes_to_storage("uploads/b.py", CODE2, "text/x-python")
+    db = worker_db.get_sync_session()
+    db.add(Submission(
+        id=1, user_id=1, mode=SubmissionMode.CODE, status=SubmissionStatus.PENDING,
+        file1_name="a.py", file2_name="b.py", file1_path="uploads/a.py", file2_path="uploads/b.py",
+    ))
+    db.commit()
+    db.close()
+    yield
+    worker_db.dispose_worker_engine()
+
+
+def count_calls(monkeypatch, name: str, fail_times: int = 0) -> list:
+    """Wraps a code metric: records each call, raising for the first fail_times."""
+    metric = get_metric("code", name)
+    original = metric.func
+    calls = []
+
+    def wrapped(prep1, prep2):
+        calls.append(name)
+        if len(calls) <= fail_times:
+            raise RuntimeError(f"{name} crashed")
+        return original(prep1, prep2)
+
+    monkeypatch.setattr(metric, "func", wrapped)
+    return calls
+
+
+def analyze():
+    run_plagiarism_analysis.apply(args=(1, "uploads/a.py", "uploads/b.py", "code"))
+    db = worker_db.get_sync_session()
+    submission = db.query(Submission).filter(Submission.id == 1).first()
+    return db, submission
+
+
+def original_reads(s3) -> int:
+    return sum(1 for path in s3.gets if path.startswith(f"/{settings.STORAGE_BUCKET_NAME}/uploads/"))
+
+
+def test_retry_resumes_after_the_last_completed_stage(s3, database, monkeypatch):
+    winnowing = count_calls(monkeypatch, "winnowing")
+    ast       = count_calls(monkeypatch, "ast", fail_times=1)
+
+    db, submission = analyze()
+    assert submission.status == SubmissionStatus.COMPLETED
+    assert submission.report.partial is False
+    assert submission.report.ast_score is not None
+    # The retry loaded the prepared files and winnowing's score instead of redoing them
+    assert original_reads(s3) == 2
+    assert (len(winnowing), len(ast)) == (1, 2)
+    assert [k for k in s3.objects if "/checkpoints/" in k] == []
+    db.close()
+
+
+def test_last_attempt_saves_a_partial_report(s3, database, monkeypatch):
+    count_calls(monkeypatch, "ast", fail_times=99)
+
+    db, submission = analyze()
+    assert submission.status == SubmissionStatus.COMPLETED
+    assert "ast crashed" in submission.error_message
+    report = submission.report
+    assert report.partial is True
+    assert report.missing_metrics == ["ast", "bytecode", "function_matches"]
+    assert report.winnowing_score is not None and report.ast_score is None
+    assert [k for k in s3.objects if "/checkpoints/" in k] == []
+    db.close()
+
+
+def test_redelivered_task_does_nothing(s3, database, monkeypatch):
+    analyze()[0].close()
+    reads = original_reads(s3)
+
+    db, submission = analyze()
+    assert original_reads(s3) == reads
+    assert db.query(Report).count() == 1
+    db.close()
@@ -0,0 +1,92 @@
+import io
+import mmap
+import os
+import time
+
+import pytest
+from docx import Document
+
+from app.core.config import settings
+from app.services import download_cache, file_service
+from tests.test_pdf_extraction import make_pdf
+
+SHA = "cd" * 32
+
+
+@pytest.fixture
+def cache(s3, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DOWNLOAD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DOWNLOAD_CACHE_MAX_MB", 1)
+    download_cache._cache = None
+    yield download_cache.get_download_cache()
+    download_cache._cache = None
+
+
+def reads(s3, key: str) -> int:
+    return sum(1 for path in s3.gets if path.endswith(f"/{key}"))
+
+
+def test_second_fetch_is_served_from_disk(s3, cache):
+    file_service.put_bytes_to_storage("blob.txt", b"hello world", "text/plain")
+
+    assert download_cache.fetch("blob.txt", SHA) == b"hello world"
+    assert download_cache.fetch("blob.txt", SHA) == b"hello world"
+    assert reads(s3, "blob.txt") == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert os.path.exists(cache.path(SHA))
+
+
+def test_legacy_keys_are_cached_by_object_key(s3, cache):
+    file_service.put_bytes_to_storage("uploads/a.txt", b"a", "text/plain")
+    file_service.put_bytes_to_storage("uploads/b.txt", b"b", "text/plain")
+
+    assert download_cache.fetch("uploads/a.txt") == b"a"
+    assert download_cache.fetch("uploads/b.txt") == b"b"
+    assert download_cache.fetch("uploads/a.txt") == b"a"
+    assert reads(s3, "a.txt") == 1
+
+
+def test_least_recently_used_is_evicted(s3, cache):
+    chunk = 400 * 1024                          # three of them exceed 1 MiB
+    for name in ("a", "b", "c"):
+        file_service.put_bytes_to_storage(f"{name}.bin", name.encode() * chunk, "application/octet-stream")
+
+    download_cache.fetch("a.bin", "aa" * 32)
+    download_cache.fetch("b.bin", "bb" * 32)
+    time.sleep(0.01)
+    download_cache.fetch("a.bin", "aa" * 32)    # a is now more recent than b
+    download_cache.fetch("c.bin", "cc" * 32)
+
+    assert os.path.exists(cache.path("aa" * 32))
+    assert not os.path.exists(cache.path("bb" * 32))
+    assert os.path.exists(cache.path("cc" * 32))
+
+
+def test_large_files_are_memory_mapped(s3, cache, monkeypatch):
+    doc = Document()
+    doc.add_paragraph("mapped paragraph")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    file_service.put_bytes_to_storage("doc.docx", buffer.getvalue(), "application/octet-stream")
+    file_service.put_bytes_to_storage("doc.txt", "naïve text".encode(), "text/plain")
+    file_service.put_bytes_to_storage("doc.pdf", make_pdf(2), "application/pdf")
+
+    monkeypatch.setattr(settings, "DOWNLOAD_MMAP_MIN_MB", 0.001)
+    content = download_cache.fetch("doc.docx", "dd" * 32)
+    assert isinstance(content, mmap.mmap)
+    assert file_service.extract_text(content, ".docx").strip() == "mapped paragraph"
+
+    content = download_cache.fetch("doc.txt", "ee" * 32)
+    assert file_service.extract_text(content, ".txt") == "naïve text"
+
+    content = download_cache.fetch("doc.pdf", "ff" * 32)
+    assert isinstance(content, mmap.mmap)
+    assert file_service.extract_text(content, ".pdf") == file_service.extract_text(make_pdf(2), ".pdf")
+
+
+def test_run_concurrently_keeps_order():
+    def slow(value, delay):
+        time.sleep(delay)
+        return value
+
+    assert download_cache.run_concurrently([(slow, 1, 0.05), (slow, 2, 0.0)]) == [1, 2]
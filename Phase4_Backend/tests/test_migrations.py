@@ -0,0 +1,103 @@
+import os
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models import Report, RiskLevel, StoredBlob, Submission, SubmissionMode, User
+from tests.conftest import PHASE4_DIR
+
+
+def alembic_config(url: str, monkeypatch) -> Config:
+    # No ini file: fileConfig would reset the test run's logging
+    monkeypatch.setenv("SYNC_DATABASE_URL", url)
+    config = Config()
+    config.set_main_option("script_location", os.path.join(PHASE4_DIR, "alembic"))
+    return config
+
+
+def create_original_tables(engine) -> None:
+    """The tables as the first release's create_all made them."""
+    metadata = sa.MetaData()
+    sa.Table("users", metadata, sa.Column("id", sa.Integer, primary_key=True), sa.Column("email", sa.String(255)))
+    sa.Table(
+        "submissions", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("mode", sa.Enum("TEXT", "CODE", name="submissionmode"), nullable=False),
+        sa.Column("file1_name", sa.String(255), nullable=False),
+        sa.Column("file2_name", sa.String(255), nullable=False),
+        sa.Column("file1_path", sa.String(512), nullable=False),
+        sa.Column("file2_path", sa.String(512), nullable=False),
+        sa.Column("language_override", sa.String(20)),
+        sa.Column("celery_task_id", sa.String(255)),
+        sa.Column("status", sa.Enum("PENDING", "PROCESSING", "COMPLETED", "FAILED", name="submissionstatus"), nullable=False),
+        sa.Column("error_message", sa.String(1024)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+    )
+    sa.Table(
+        "reports", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("submission_id", sa.Integer, sa.ForeignKey("submissions.id"), unique=True, nullable=False),
+        sa.Column("language", sa.String(50)),
+        *(sa.Column(f"{name}_score", sa.Float) for name in ("jaccard", "cosine", "lcs", "winnowing", "ast")),
+        sa.Column("final_similarity", sa.Float, nullable=False),
+        sa.Column("risk_level", sa.Enum("LOW", "MEDIUM", "HIGH", name="risklevel"), nullable=False),
+        sa.Column("processing_time_ms", sa.Integer),
+        sa.Column("algorithm_version", sa.String(20)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO users (id, email) VALUES (1, 'a@b.c')"))
+        conn.execute(sa.text(
+            "INSERT INTO submissions (id, user_id, mode, file1_name, file2_name, file1_path, file2_path, status) "
+            "VALUES (1, 1, 'CODE', 'a.py', 'b.py', 'uploads/a', 'uploads/b', 'COMPLETED')"
+        ))
+        conn.execute(sa.text(
+            "INSERT INTO reports (id, submission_id, final_similarity, risk_level) VALUES (1, 1, 0.5, 'MEDIUM')"
+        ))
+
+
+def test_upgrade_adds_the_new_columns_to_an_existing_database(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    engine = sa.create_engine(url)
+    create_original_tables(engine)
+
+    command.upgrade(alembic_config(url, monkeypatch), "head")
+
+    with Session(engine) as db:
+        old = db.get(Report, 1)
+        assert old.partial is False and old.timings is None and old.semantic_score is None
+        assert db.get(Submission, 1).file1_sha256 is None
+
+        db.add(Submission(
+            id=2, user_id=1, mode=SubmissionMode.CODE, file1_name="a.py", file2_name="b.py",
+            file1_path="blobs/a", file2_path="blobs/b", file1_sha256="a" * 64, file2_sha256="b" * 64,
+        ))
+        db.add(Report(
+            submission_id=2, final_similarity=0.9, risk_level=RiskLevel.HIGH, semantic_score=0.8,
+            partial=True, missing_metrics=["ast"], timings={"total_ms": 1},
+        ))
+        db.add(StoredBlob(sha256="a" * 64, object_key="blobs/a", size=1))
+        db.commit()
+        assert db.query(Report).filter(Report.partial.is_(True)).one().missing_metrics == ["ast"]
+
+    command.downgrade(alembic_config(url, monkeypatch), "base")
+    assert "stored_blobs" not in sa.inspect(engine).get_table_names()
+    assert "timings" not in {c["name"] for c in sa.inspect(engine).get_columns("reports")}
+    engine.dispose()
+
+
+def test_upgrade_leaves_a_database_created_from_the_models_alone(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'new.db'}"
+    engine = sa.create_engine(url)
+    Base.metadata.create_all(engine, tables=[User.__table__, Submission.__table__, Report.__table__, StoredBlob.__table__])
+
+    command.upgrade(alembic_config(url, monkeypatch), "head")
+
+    assert {c["name"] for c in sa.inspect(engine).get_columns("reports")} >= {"partial", "timings"}
+    engine.dispose()
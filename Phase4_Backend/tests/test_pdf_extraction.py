@@ -0,0 +1,97 @@
+import io
+import os
+
+import billiard
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+from app.core.config import settings
+from app.services import pdf_extraction
+
+
+def make_pdf(num_pages: int, lines_per_page: int = 40, image_only_every: int = 0) -> bytes:
+    """A generated text PDF; every image_only_every-th page has no fonts at all."""
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"):     NameObject("/Font"),
+        NameObject("/Subtype"):  NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    font_ref = writer._add_object(font)
+
+    for n in range(num_pages):
+        page = writer.add_blank_page(width=612, height=792)
+        if image_only_every and n % image_only_every == image_only_every - 1:
+            continue        # no resources, no text: a "scanned" page
+        ops = ["BT /F1 9 Tf 40 760 Td 11 TL"]
+        ops += [f"(page {n} line {i} the quick brown fox jumps over the lazy dog) '" for i in range(lines_per_page)]
+        ops.append("ET")
+        stream = DecodedStreamObject()
+        stream.set_data("\n".join(ops).encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref}),
+            NameObject("/ProcSet"): ArrayObject([NameObject("/PDF"), NameObject("/Text")]),
+        })
+
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def page_numbers(text: str) -> list:
+    return [int(line.split()[1]) for line in text.splitlines() if line.endswith("lazy dog") and " line 0 " in line]
+
+
+def test_small_pdf_serial_in_order():
+    text, report = pdf_extraction.extract_pdf_pages(make_pdf(5))
+    assert report["workers"] == 1
+    assert page_numbers(text) == list(range(5))
+
+
+def test_large_pdf_parallel_reassembled_in_order(monkeypatch):
+    monkeypatch.setattr(pdf_extraction, "MAX_WORKERS", 2)
+    text, report = pdf_extraction.extract_pdf_pages(make_pdf(60, image_only_every=10))
+
+    assert report["workers"] == 2
+    assert report["image_only"] == 6
+    assert page_numbers(text) == [n for n in range(60) if n % 10 != 9]
+
+
+def _extract_in_daemon(content: bytes) -> tuple:
+    pdf_extraction.MAX_WORKERS = 2
+    return pdf_extraction.extract_pdf_pages(content)
+
+
+def test_large_pdf_parallel_inside_celery_prefork_child():
+    # Celery prefork children are daemonic billiard processes
+    pool = billiard.Pool(1)
+    try:
+        text, report = pool.apply(_extract_in_daemon, (make_pdf(40),))
+    finally:
+        pool.terminate()
+
+    assert report["workers"] == 2
+    assert page_numbers(text) == list(range(40))
+
+
+def test_slow_page_is_skipped(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_PAGE_TIME_BUDGET_SECONDS", 0.001)
+    _, report = pdf_extraction.extract_pdf_pages(make_pdf(3, lines_per_page=3000))
+    assert report["timeout"] == 3
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 4, reason="needs 4+ CPUs to show a speed-up")
+def test_benchmark_300_pages(monkeypatch):
+    content = make_pdf(300, lines_per_page=60, image_only_every=25)
+
+    monkeypatch.setattr(pdf_extraction, "MAX_WORKERS", 1)
+    serial_text, serial = pdf_extraction.extract_pdf_pages(content)
+    monkeypatch.setattr(pdf_extraction, "MAX_WORKERS", min(os.cpu_count(), 8))
+    parallel_text, parallel = pdf_extraction.extract_pdf_pages(content)
+
+    print(f"\n300 pages: serial {serial['pages_per_second']} pages/s, "
+          f"{parallel['workers']} workers {parallel['pages_per_second']} pages/s")
+    assert parallel_text == serial_text
+    assert parallel["pages_per_second"] > 1.5 * serial["pages_per_second"]
@@ -0,0 +1,59 @@
+import gzip
+
+from app.core.config import settings
+from app.services import file_service, sidecars
+
+SOURCE = b"def add(a, b):\n    return a + b\n\nprint(add(1, 2))\n"
+SHA    = "ab" * 32
+
+
+def original_reads(s3) -> int:
+    return sum(1 for path in s3.gets if path.endswith("/blob.py"))
+
+
+def test_second_load_uses_sidecars(s3):
+    file_service.put_bytes_to_storage("blob.py", SOURCE, "text/x-python")
+
+    text, prepared = sidecars.load_or_prepare("blob.py", SHA, "main.py", "code")
+    assert text == SOURCE.decode()
+    assert original_reads(s3) == 1
+
+    sidecar_keys = [k for k in s3.objects if "/sidecars/" in k]
+    assert len(sidecar_keys) == 2
+    # Stored compressed; the code itself isn't duplicated in the prepared sidecar
+    prepared_key = next(k for k in sidecar_keys if "prepared-" in k)
+    assert b'"code"' not in gzip.decompress(s3.objects[prepared_key])
+
+    text2, prepared2 = sidecars.load_or_prepare("blob.py", SHA, "main.py", "code")
+    assert original_reads(s3) == 1
+    assert (text2, prepared2) == (text, prepared)
+
+
+def test_new_extractor_version_re_extracts(s3, monkeypatch):
+    file_service.put_bytes_to_storage("blob.py", SOURCE, "text/x-python")
+    sidecars.load_or_prepare("blob.py", SHA, "main.py", "text")
+
+    monkeypatch.setattr(sidecars, "EXTRACTOR_VERSION", "2")
+    sidecars.load_or_prepare("blob.py", SHA, "main.py", "text")
+    assert original_reads(s3) == 2
+
+
+def test_delete_sidecars(s3):
+    file_service.put_bytes_to_storage("blob.py", SOURCE, "text/x-python")
+    sidecars.load_or_prepare("blob.py", SHA, "main.py", "text")
+
+    sidecars.delete_sidecars(SHA)
+    assert [k for k in s3.objects if "/sidecars/" in k] == []
+    assert f"/{settings.STORAGE_BUCKET_NAME}/blob.py" in s3.objects
+
+
+def test_truncated_extraction_is_not_stored(s3, monkeypatch):
+    # A page over the time budget depends on load: its text mustn't be cached
+    report = {"pages": 2, "seconds": 1.0, "pages_per_second": 2.0, "workers": 1,
+              "image_only": 0, "timeout": 1, "error": 0}
+    monkeypatch.setattr(file_service, "extract_pdf_pages", lambda content: ("first page only", report))
+    file_service.put_bytes_to_storage("blob.pdf", b"%PDF-1.4", "application/pdf")
+
+    text, prepared = sidecars.load_or_prepare("blob.pdf", SHA, "essay.pdf", "text")
+    assert text == "first page only" and prepared is not None
+    assert [k for k in s3.objects if "/sidecars/" in k] == []
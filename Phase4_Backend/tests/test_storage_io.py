@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.services import blob_store, file_service
+from conftest import PUT_DELAY
+
+
+async def upload(data: bytes, filename: str) -> tuple[str, str]:
+    """hash_upload then store_upload under a blob key, as blob_store.store_uploads does."""
+    file = UploadFile(file=io.BytesIO(data), filename=filename)
+    sha256, _ = await file_service.hash_upload(file)
+    key = blob_store.blob_object_key(sha256)
+    await file_service.store_upload(file, key)
+    return key, sha256
+
+
+def test_client_is_reused(s3):
+    assert file_service.get_storage_client() is file_service.get_storage_client()
+
+
+def test_concurrent_uploads_do_not_block_event_loop(s3):
+    uploads = 32
+
+    async def scenario():
+        # Ticks every 10 ms; any blocking call on the loop shows up as lag
+        lags = []
+        stop = asyncio.Event()
+
+        async def ticker():
+            while not stop.is_set():
+                before = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - before - 0.01)
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        keys = await asyncio.gather(*(
+            upload(f"print('hello {i}')\n".encode() * 100, f"s{i}.py") for i in range(uploads)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await tick
+        return keys, elapsed, max(lags)
+
+    keys, elapsed, max_lag = asyncio.run(scenario())
+
+    assert len(s3.objects) == uploads
+    assert all(
+        sha == hashlib.sha256(f"print('hello {i}')\n".encode() * 100).hexdigest()
+        for i, (_, sha) in enumerate(keys)
+    )
+    # 32 serial PUTs would take 3.2 s; 8 storage threads take ~0.4 s
+    assert elapsed < uploads * PUT_DELAY / 2
+    assert max_lag < PUT_DELAY / 2
+    # Connections come from the shared client's pool, not one per upload
+    assert len(s3.connections) <= settings.STORAGE_IO_THREADS
+
+
+def test_async_delete(s3):
+    async def scenario():
+        key, _ = await upload(b"x", "a.txt")
+        await file_service.delete_file_from_storage_async(key)
+
+    asyncio.run(scenario())
+    assert s3.objects == {}
+
+
+def test_oversized_upload_rejected_while_streaming(s3, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+    body = io.BytesIO(b"x" * (3 * file_service.UPLOAD_CHUNK_BYTES))
+
+    async def scenario():
+        # size unknown up front: only the running count can catch it
+        file = UploadFile(file=body, filename="big.txt")
+        sha256, _ = await file_service.hash_upload(file)
+        await file_service.store_upload(file, blob_store.blob_object_key(sha256))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(scenario())
+    assert exc.value.status_code == 413
+    # Stopped after the chunk that crossed the limit, nothing stored
+    assert body.tell() == 2 * file_service.UPLOAD_CHUNK_BYTES
+    assert s3.objects == {}
+
+
+def test_upload_streams_chunks_and_hashes(s3):
+    data = os.urandom(3 * file_service.UPLOAD_CHUNK_BYTES + 123)
+
+    async def scenario():
+        return await upload(data, "data.txt")
+
+    key, sha = asyncio.run(scenario())
+    assert sha == hashlib.sha256(data).hexdigest()
+    assert list(s3.objects.values()) == [data]
+    assert key.startswith(f"blobs/{sha[:2]}/{sha}/")
+
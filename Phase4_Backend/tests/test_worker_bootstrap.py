@@ -0,0 +1,42 @@
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.services import engine_bridge
+from app.workers import tasks
+
+
+@pytest.fixture
+def fresh_worker(monkeypatch):
+    monkeypatch.setattr(tasks, "_preloaded", False)
+    frozen = []
+    monkeypatch.setattr(tasks.gc, "freeze", lambda: frozen.append(True))
+    return frozen
+
+
+def test_warm_up_engine_times_each_stage():
+    timings = engine_bridge.warm_up_engine()
+    assert set(timings["stages"]) == {"corpora", "lexers", "warm_up_text", "warm_up_code"}
+
+
+def test_parent_preloads_once_and_freezes(fresh_worker, monkeypatch, caplog):
+    calls = []
+    warm_up = engine_bridge.warm_up_engine
+    monkeypatch.setattr(engine_bridge, "warm_up_engine", lambda: calls.append(1) or warm_up())
+
+    with caplog.at_level(logging.INFO, logger="app.workers.tasks"):
+        tasks.preload_worker_parent()
+    assert calls == [1] and fresh_worker == [True]
+    assert "import_engine=" in caplog.text and "warm_up_code=" in caplog.text
+
+    # A child forked from this parent (or a second signal) finds it done
+    tasks.preload_engine()
+    assert calls == [1]
+
+
+def test_preload_can_be_turned_off(fresh_worker, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_PRELOAD", False)
+    monkeypatch.setattr(engine_bridge, "warm_up_engine", lambda: pytest.fail("preloaded"))
+    tasks.preload_worker_parent()
+    assert tasks._preloaded is False and fresh_worker == []
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+from app.workers import db as worker_db
+
+
+@pytest.fixture
+def database(tmp_path):
+    # A SQLite file stands in for Postgres: it goes through the same QueuePool
+    url = f"sqlite:///{tmp_path / 'worker.db'}"
+    worker_db.init_worker_engine(concurrency=1, url=url)
+    session = worker_db.get_sync_session()
+    session.execute(text("CREATE TABLE reports (id INTEGER PRIMARY KEY, score REAL)"))
+    session.commit()
+    session.close()
+    yield url
+    worker_db.dispose_worker_engine()
+
+
+def fake_task(i: int) -> None:
+    # Same session lifecycle as run_plagiarism_analysis
+    db = worker_db.get_sync_session()
+    try:
+        db.execute(text("INSERT INTO reports (score) VALUES (:score)"), {"score": i / 100})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_sequential_tasks_reuse_one_connection(database):
+    for i in range(200):
+        fake_task(i)
+
+    stats = worker_db.pool_stats()
+    assert stats["connects"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["pool_size"] == 1
+
+    db = worker_db.get_sync_session()
+    assert db.execute(text("SELECT COUNT(*) FROM reports")).scalar() == 200
+    db.close()
+
+
+def test_pool_sized_to_concurrency(database):
+    worker_db.init_worker_engine(concurrency=4, url=database)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(fake_task, range(200)))
+
+    stats = worker_db.pool_stats()
+    assert stats["pool_size"] == 4
+    assert stats["connects"] <= 4 + worker_db.settings.WORKER_DB_MAX_OVERFLOW
+    assert stats["checked_out"] == 0
+
+
+def test_dispose_closes_engine(database):
+    fake_task(0)
+    worker_db.dispose_worker_engine()
+    assert worker_db.pool_stats() == {"initialized": False}